@@ -0,0 +1,50 @@
+"""
+プロセス内の小さな TTL 付き LRU キャッシュ。
+
+外部依存なしで「件数の上限」と「有効期限」の両方を守る。asyncio の
+シングルスレッド前提なのでロックは持たない（await を挟まずに操作する）。
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """predicate(key) が真のエントリを消して件数を返す。"""
+        keys = [k for k in self._data if predicate(k)]
+        for k in keys:
+            del self._data[k]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
@@ -12,6 +12,7 @@ Best-effort email sending.
 import os
 import ssl
 import smtplib
+from abc import ABC, abstractmethod
 from email.message import EmailMessage
 from typing import List, Optional
 
@@ -121,3 +122,69 @@ def send_email(
 
     print(f"[email:skip] No email transport configured. Would send to {recipients}: {subject}")
     return False
+
+
+def email_configured() -> bool:
+    """Resend か SMTP のどちらかが使える設定になっているか。"""
+    return bool((os.getenv("RESEND_API_KEY") and _email_from()) or _smtp_configured())
+
+
+# ----- Outbox 用の送信経路 ---------------------------------------------------
+class EmailTransport(ABC):
+    """
+    app.core.outbox のワーカーが使う送信経路。send は同期（スレッドで実行される）。
+    両方を実装していないサブクラスは作る時点で TypeError になる。
+    """
+
+    @abstractmethod
+    def configured(self) -> bool:
+        ...
+
+    @abstractmethod
+    def send(
+        self, to: List[str], subject: str, body: str, reply_to: Optional[str] = None
+    ) -> bool:
+        ...
+
+
+class DefaultTransport(EmailTransport):
+    """本番用: Resend → SMTP（send_email と同じ経路）。"""
+
+    def configured(self) -> bool:
+        return email_configured()
+
+    def send(
+        self, to: List[str], subject: str, body: str, reply_to: Optional[str] = None
+    ) -> bool:
+        return send_email(to, subject, body, reply_to=reply_to)
+
+
+class FakeTransport(EmailTransport):
+    """
+    ローカル/テスト用: 実際には送らず self.sent に記録する。
+    fail_times 回までは失敗を返すので、リトライの確認にも使える。
+    """
+
+    def __init__(self, fail_times: int = 0):
+        self.fail_times = fail_times
+        self.sent: List[dict] = []
+
+    def configured(self) -> bool:
+        return True
+
+    def send(
+        self, to: List[str], subject: str, body: str, reply_to: Optional[str] = None
+    ) -> bool:
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            return False
+        self.sent.append({"to": list(to), "subject": subject, "body": body, "reply_to": reply_to})
+        print(f"[email:fake] to={to} subject={subject}")
+        return True
+
+
+def get_transport() -> EmailTransport:
+    """EMAIL_TRANSPORT=fake ならフェイク、それ以外は本番経路。"""
+    if os.getenv("EMAIL_TRANSPORT", "default").lower() == "fake":
+        return FakeTransport()
+    return DefaultTransport()
@@ -0,0 +1,150 @@
+"""
+Google ID トークンの検証。
+
+google.oauth2.id_token.verify_oauth2_token はリクエストのたびに署名用の証明書を
+新しい HTTPS 接続で取り直す。ここでは証明書を Cache-Control: max-age の間だけ
+プロセス内に持ち、取得には使い回しの requests.Session を使う。署名の検証は
+手元の証明書で行い、ブロッキング処理はスレッドに逃がす。
+
+設定（環境変数）:
+  GOOGLE_CERTS_URL ......... 証明書の取得先（ローカルの偽エンドポイントに向けてテストできる）
+  GOOGLE_CERTS_DEFAULT_TTL . max-age が無いときに証明書を持つ秒数（既定 300）
+  GOOGLE_CERTS_TIMEOUT ..... 証明書取得のタイムアウト秒（既定 5）
+"""
+import asyncio
+import base64
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional
+
+from app.core.metrics import Counter
+
+GOOGLE_CERTS_URL = os.getenv("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
+GOOGLE_CERTS_DEFAULT_TTL = int(os.getenv("GOOGLE_CERTS_DEFAULT_TTL", "300"))
+GOOGLE_CERTS_TIMEOUT = float(os.getenv("GOOGLE_CERTS_TIMEOUT", "5"))
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_certs_fetches = Counter(
+    "google_certs_fetches_total", "Downloads of Google's token signing certificates.",
+    labelnames=("outcome",),
+)
+_verifications = Counter(
+    "google_token_verifications_total", "Google ID token verifications.",
+    labelnames=("outcome",),
+)
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+# 知らない kid のトークンで取り直すのは、前回の取得からこの秒数が経ってから
+_ROTATION_REFETCH_INTERVAL = 30
+
+
+class GoogleCertsUnavailable(Exception):
+    """証明書を取得できず、手元にも使えるものが無い。"""
+
+
+def _cache_ttl(headers: Mapping[str, str]) -> int:
+    """Cache-Control の max-age（から Age を引いたもの）。無ければ既定値。"""
+    match = _MAX_AGE.search(headers.get("Cache-Control", ""))
+    if not match:
+        return GOOGLE_CERTS_DEFAULT_TTL
+    try:
+        age = int(headers.get("Age", "0"))
+    except ValueError:
+        age = 0
+    return max(int(match.group(1)) - age, 0)
+
+
+def _token_kid(token: str) -> Optional[str]:
+    """署名を検証する前に、ヘッダの kid（どの証明書で署名されたか）だけ読む。"""
+    try:
+        header = token.split(".", 1)[0]
+        header += "=" * (-len(header) % 4)
+        return json.loads(base64.urlsafe_b64decode(header)).get("kid")
+    except Exception:  # noqa: BLE001
+        return None
+
+
+class GoogleTokenVerifier:
+    def __init__(self, certs_url: str = GOOGLE_CERTS_URL, session=None):
+        self.certs_url = certs_url
+        self._session = session
+        self._certs: Optional[Dict[str, str]] = None
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        # verify() はスレッドプールから並行に呼ばれるので、取得は 1 本にまとめる
+        self._lock = threading.Lock()
+
+    def _http(self):
+        if self._session is None:
+            import requests
+
+            self._session = requests.Session()
+        return self._session
+
+    def _fetch(self) -> None:
+        self._fetched_at = time.monotonic()
+        try:
+            response = self._http().get(self.certs_url, timeout=GOOGLE_CERTS_TIMEOUT)
+            response.raise_for_status()
+            certs = response.json()
+        except Exception as ex:  # noqa: BLE001
+            _certs_fetches.inc(outcome="error")
+            if self._certs is None:
+                raise GoogleCertsUnavailable(str(ex)) from ex
+            # 取れなかったら期限切れの証明書で続け、少し待ってから再取得する
+            print(f"[google:certs] fetch failed, keeping cached certs: {ex}")
+            self._expires_at = time.monotonic() + min(GOOGLE_CERTS_DEFAULT_TTL, 60)
+            return
+        _certs_fetches.inc(outcome="ok")
+        self._certs = certs
+        self._expires_at = time.monotonic() + _cache_ttl(response.headers)
+
+    def certs(self, kid: Optional[str] = None) -> Dict[str, str]:
+        """
+        キャッシュした証明書を返す。期限切れ、または kid が見当たらない
+        （鍵のローテーション直後）ときだけ取り直す。後者はでたらめな kid で
+        取得を連発させられないよう、前回の取得から少し空ける。
+        """
+        with self._lock:
+            now = time.monotonic()
+            expired = self._certs is None or now >= self._expires_at
+            rotated = (
+                kid is not None
+                and self._certs is not None
+                and kid not in self._certs
+                and now - self._fetched_at >= _ROTATION_REFETCH_INTERVAL
+            )
+            if expired or rotated:
+                self._fetch()
+            return self._certs
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._expires_at = 0.0
+
+    def verify(self, token: str, audience: Optional[str]) -> Dict[str, Any]:
+        """
+        トークンを検証して claims を返す（ブロッキング）。不正なら ValueError、
+        証明書が取れなければ GoogleCertsUnavailable。
+        """
+        from google.auth import jwt as google_jwt
+
+        certs = self.certs(_token_kid(token))
+        try:
+            idinfo = google_jwt.decode(token, certs=certs, audience=audience)
+            if idinfo.get("iss") not in GOOGLE_ISSUERS:
+                raise ValueError(f"Wrong issuer: {idinfo.get('iss')}")
+        except Exception:
+            _verifications.inc(outcome="invalid")
+            raise
+        _verifications.inc(outcome="ok")
+        return idinfo
+
+    async def verify_async(self, token: str, audience: Optional[str]) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.verify, token, audience)
+
+
+google_verifier = GoogleTokenVerifier()
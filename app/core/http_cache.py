@@ -0,0 +1,131 @@
+"""
+HTTP の条件付き GET（ETag / Last-Modified / 304）まわりの小さな道具。
+
+  - conditional_json(): 組み立てた JSON の本文から ETag を作って返す
+  - Validators + check_not_modified(): 本文を作る前に分かっている検証子
+    （データの版など）で判定し、一致すれば NotModified を投げる。main.py の
+    ハンドラが本文なしの 304 にする
+"""
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+
+def json_bytes(payload: Any) -> bytes:
+    """レスポンス本文用の JSON（FastAPI と同じく jsonable_encoder を通す）。"""
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def etag_for(body: bytes) -> str:
+    """本文から強い ETag を作る。"""
+    return '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match に etag が含まれるか（弱い比較・* も受け付ける）。"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+class Validators:
+    """レスポンスの検証子（ETag と、分かれば Last-Modified）。"""
+
+    __slots__ = ("etag", "last_modified")
+
+    def __init__(self, etag: str, last_modified: Optional[datetime] = None):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def headers(self) -> Dict[str, str]:
+        out = {"ETag": self.etag}
+        if self.last_modified is not None:
+            out["Last-Modified"] = format_datetime(
+                self.last_modified.astimezone(timezone.utc), usegmt=True
+            )
+        return out
+
+    def apply(self, response: Response) -> None:
+        for name, value in self.headers().items():
+            response.headers[name] = value
+
+
+class NotModified(Exception):
+    """304 で返す。headers は 304 にも付ける ETag / Last-Modified。"""
+
+    def __init__(self, headers: Dict[str, str]):
+        super().__init__("not modified")
+        self.headers = headers
+
+
+def _modified_since(request: Request, last_modified: Optional[datetime]) -> bool:
+    header = request.headers.get("if-modified-since")
+    if not header or last_modified is None:
+        return True
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return True
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP の日付は秒単位
+    return last_modified.replace(microsecond=0) > since
+
+
+def check_not_modified(request: Request, validators: Validators) -> None:
+    """
+    If-None-Match（あればこちらを優先）/ If-Modified-Since を見て、変わっていなければ
+    NotModified を投げる。
+    """
+    if request.headers.get("if-none-match") is not None:
+        matched = etag_matches(request, validators.etag)
+    else:
+        matched = not _modified_since(request, validators.last_modified)
+    if matched:
+        raise NotModified(validators.headers())
+
+
+def not_modified(etag: str, cache_control: Optional[str] = None) -> Response:
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return Response(status_code=304, headers=headers)
+
+
+def conditional_json(
+    request: Request,
+    payload: Any,
+    cache_control: str = "no-cache",
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    payload を JSON にして ETag を付けて返す。If-None-Match が一致すれば 304。
+    既定の no-cache は「保存してよいが、使う前に ETag で確認すること」。
+    headers は 200 のときに付け足すヘッダ（X-Next-Cursor など）。
+    """
+    body = json_bytes(payload)
+    etag = etag_for(body)
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={**(headers or {}), "ETag": etag, "Cache-Control": cache_control},
+    )
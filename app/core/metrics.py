@@ -0,0 +1,135 @@
+"""
+Prometheus のテキスト形式で出せる最小限のメトリクス。
+
+prometheus_client を入れずに、カウンタ・ゲージ・サマリ（count/sum）だけを
+プロセス内に持つ。/metrics がこのレジストリを render() して返す。
+"""
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+_REGISTRY: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    inner = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + inner + "}"
+
+
+def _format_value(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        _REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], float]]:
+        return [(self.name, key, v) for key, v in self._values.items()]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for name, key, v in self.samples():
+            lines.append(f"{name}{_format_labels(self.labelnames, key)} {_format_value(v)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        if not self.labelnames:
+            self._values[()] = 0
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """set() で値を置くか、function を渡して render 時に計算させる。"""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        function: Optional[Callable[[], float]] = None,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self._function = function
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], float]]:
+        if self._function is not None:
+            return [(self.name, (), self._function())]
+        return super().samples()
+
+
+class Summary(_Metric):
+    """観測値の件数と合計（_count / _sum）だけを持つ。"""
+
+    kind = "summary"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + 1
+        self._sums[key] = self._sums.get(key, 0) + value
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], float]]:
+        out = []
+        for key, count in self._values.items():
+            out.append((f"{self.name}_count", key, count))
+            out.append((f"{self.name}_sum", key, self._sums.get(key, 0)))
+        return out
+
+
+def ratio(numerator: Counter, denominator_parts: Sequence[Counter]) -> Callable[[], float]:
+    """Gauge(function=...) 用: numerator / sum(parts)。分母 0 なら 0。"""
+
+    def _compute() -> float:
+        total = sum(sum(c._values.values()) for c in denominator_parts)
+        return sum(numerator._values.values()) / total if total else 0.0
+
+    return _compute
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
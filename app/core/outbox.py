@@ -0,0 +1,140 @@
+"""
+メール送信の Outbox。
+
+リクエストハンドラは enqueue_email() で (:OutboxMessage) を保存してすぐ返り、
+送信はバックグラウンドのワーカー（asyncio タスク）が行う。Resend/SMTP の呼び出しは
+ブロッキングなのでスレッドに逃がし、失敗したら指数バックオフ（ジッタ付き）で
+再試行、上限に達したら failed にする。状態は /admin/outbox で確認できる。
+
+設定（環境変数）:
+  OUTBOX_WORKERS ........ 同時に送信するワーカー数（既定 2）
+  OUTBOX_MAX_ATTEMPTS ... 失敗扱いにするまでの試行回数（既定 6）
+  OUTBOX_BACKOFF_BASE ... 1 回目の再試行までの秒数。以降 2 倍ずつ（既定 30）
+  OUTBOX_POLL_INTERVAL .. 新着通知が無いときのポーリング間隔・秒（既定 10）
+  OUTBOX_LEASE .......... sending のまま放置されたものを拾い直すまでの秒数（既定 300）
+  EMAIL_TRANSPORT ....... fake にすると実際には送らない（ローカル/テスト用）
+"""
+import asyncio
+import os
+import random
+from typing import List, Optional
+
+from app.core.email import EmailTransport, get_transport
+from app.core.metrics import Counter
+from app.crud.outbox import OutboxCRUD
+
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", "2"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "6"))
+OUTBOX_BACKOFF_BASE = float(os.getenv("OUTBOX_BACKOFF_BASE", "30"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "10"))
+OUTBOX_LEASE = int(os.getenv("OUTBOX_LEASE", "300"))
+
+_sent = Counter("outbox_sent_total", "Emails delivered by the outbox worker.")
+_retried = Counter("outbox_retries_total", "Outbox delivery attempts scheduled for retry.")
+_failed = Counter("outbox_failed_total", "Outbox messages that exhausted their retries.")
+_skipped = Counter("outbox_skipped_total", "Outbox messages dropped because no transport is configured.")
+
+
+def backoff_delay(attempt: int) -> float:
+    """attempt 回目の失敗後に待つ秒数（±20% のジッタ付き）。"""
+    delay = OUTBOX_BACKOFF_BASE * (2 ** max(attempt - 1, 0))
+    return delay * random.uniform(0.8, 1.2)
+
+
+class OutboxWorker:
+    def __init__(self, transport: Optional[EmailTransport] = None):
+        self.transport = transport or get_transport()
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+    def notify(self) -> None:
+        """新しいメッセージが入ったことをワーカーに知らせる。"""
+        self._wakeup.set()
+
+    def start(self, concurrency: int = OUTBOX_WORKERS) -> None:
+        if self._tasks:
+            return
+        self._stopping = False
+        # Event はループに紐づくので、起動したループ上で作り直す
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run(i)) for i in range(concurrency)]
+
+    async def stop(self) -> None:
+        self._stopping = True
+        self._wakeup.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, index: int) -> None:
+        while not self._stopping:
+            try:
+                processed = await self.process_one()
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:  # noqa: BLE001
+                print(f"[outbox:error] worker {index}: {ex}")
+                processed = False
+            if processed:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=OUTBOX_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def process_one(self) -> bool:
+        """期限の来たメッセージを 1 件処理する。処理対象が無ければ False。"""
+        message = await OutboxCRUD.claim_next(OUTBOX_LEASE)
+        if message is None:
+            return False
+
+        message_id = message["id"]
+        if not self.transport.configured():
+            print(f"[email:skip] No email transport configured. Would send to {message['to']}: {message['subject']}")
+            await OutboxCRUD.mark_skipped(message_id)
+            _skipped.inc()
+            return True
+
+        try:
+            ok = await asyncio.to_thread(
+                self.transport.send,
+                list(message["to"]),
+                message["subject"],
+                message["body"],
+                message.get("reply_to"),
+            )
+            error = None if ok else "transport returned failure"
+        except Exception as ex:  # noqa: BLE001
+            ok, error = False, str(ex)
+
+        if ok:
+            await OutboxCRUD.mark_sent(message_id)
+            _sent.inc()
+        elif message["attempts"] >= OUTBOX_MAX_ATTEMPTS:
+            await OutboxCRUD.mark_failed(message_id, error)
+            _failed.inc()
+        else:
+            await OutboxCRUD.mark_retry(message_id, error, backoff_delay(message["attempts"]))
+            _retried.inc()
+        return True
+
+
+worker = OutboxWorker()
+
+
+async def enqueue_email(
+    to: List[str], subject: str, body: str, reply_to: Optional[str] = None
+) -> Optional[str]:
+    """
+    メールを Outbox に積んで id を返す（送信はワーカーが行う）。
+    宛先が空なら何もせず None。
+    """
+    recipients = [t for t in to if t]
+    if not recipients:
+        return None
+    message_id = await OutboxCRUD.enqueue(recipients, subject, body, reply_to)
+    worker.notify()
+    return message_id
@@ -0,0 +1,179 @@
+"""
+公開一覧 API のレスポンスキャッシュ（stale-while-revalidate）。
+
+シリアライズ済みの JSON バイト列をパス + クエリ文字列ごとに持つので、ヒットすれば
+Cypher もモデル組み立ても JSON 化も走らない。
+
+  - 作ってから RESPONSE_CACHE_TTL 秒は新鮮（そのまま返す）
+  - その後 RESPONSE_CACHE_STALE_TTL 秒は古いまま返しつつ、裏で 1 本だけ作り直す
+  - それも過ぎたら、その場で作り直す
+  - CRUD の create/update/delete は invalidate_responses(名前) で丸ごと捨てる
+    （捨てる前に始まった作り直しの結果は保存しない）
+
+キャッシュはプロセスごと。複数プロセスで動かすと他プロセスの更新は TTL まで見えない。
+RESPONSE_CACHE_TTL=0 で無効（毎回作る）。
+
+設定（環境変数）:
+  RESPONSE_CACHE_TTL ........... 新鮮とみなす秒数（既定 30）
+  RESPONSE_CACHE_STALE_TTL ..... 期限切れ後に古いまま返してよい秒数（既定 300）
+  RESPONSE_CACHE_MAX_ENTRIES ... キャッシュ 1 つあたりの最大件数（既定 256）
+"""
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+
+from app.core.cache import TTLCache
+from app.core.http_cache import Validators, etag_for, etag_matches, json_bytes, not_modified
+from app.core.metrics import Counter
+
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+RESPONSE_CACHE_STALE_TTL = float(os.getenv("RESPONSE_CACHE_STALE_TTL", "300"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+CACHE_STATUS_HEADER = "X-Cache"
+
+_requests = Counter(
+    "response_cache_requests_total", "Cached endpoint requests by cache and result.",
+    labelnames=("cache", "result"),
+)
+_refresh_errors = Counter(
+    "response_cache_refresh_errors_total", "Background refreshes that raised.",
+    labelnames=("cache",),
+)
+_invalidations = Counter(
+    "response_cache_invalidations_total", "Explicit invalidations from CRUD writes.",
+    labelnames=("cache",),
+)
+
+
+class CachedResponse:
+    """保存する 1 レスポンス分（本文・追加ヘッダ・ETag）。"""
+
+    __slots__ = ("body", "headers", "etag", "fresh_until")
+
+    def __init__(self, body: bytes, headers: Optional[Dict[str, str]] = None):
+        self.body = body
+        self.headers = headers or {}
+        self.etag = etag_for(body)
+        self.fresh_until = 0.0
+
+    @classmethod
+    def json(cls, payload: Any, headers: Optional[Dict[str, str]] = None) -> "CachedResponse":
+        return cls(json_bytes(payload), headers)
+
+    def to_response(
+        self, request: Request, cache_status: str, validators: Optional[Validators] = None
+    ) -> Response:
+        if validators is not None:
+            # 版から作った検証子があればそちらを使う（304 の判定は依存関係で済んでいる）
+            response = Response(content=self.body, media_type="application/json")
+            validators.apply(response)
+        elif etag_matches(request, self.etag):
+            response = not_modified(self.etag)
+        else:
+            response = Response(content=self.body, media_type="application/json")
+            response.headers["ETag"] = self.etag
+        for name, value in self.headers.items():
+            response.headers[name] = value
+        response.headers[CACHE_STATUS_HEADER] = cache_status
+        return response
+
+
+Builder = Callable[[], Awaitable[CachedResponse]]
+
+
+def cache_key(request: Request) -> str:
+    """パス + 並べ替えたクエリ（パラメータの順番違いで別エントリにしない）。"""
+    query = urlencode(sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        name: str,
+        ttl: float = RESPONSE_CACHE_TTL,
+        stale_ttl: float = RESPONSE_CACHE_STALE_TTL,
+        maxsize: int = RESPONSE_CACHE_MAX_ENTRIES,
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        # TTLCache の期限は「古いまま返せる」最後の時刻まで
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl + stale_ttl)
+        self._refreshing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._generation = 0
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+        _invalidations.inc(cache=self.name)
+
+    def _store(self, key: str, entry: CachedResponse, generation: int) -> None:
+        if generation != self._generation:
+            return  # 作っている間に invalidate された
+        entry.fresh_until = time.monotonic() + self.ttl
+        self._entries.set(key, entry)
+
+    async def _refresh(self, key: str, build: Builder, generation: int) -> None:
+        try:
+            self._store(key, await build(), generation)
+        except Exception as ex:  # noqa: BLE001
+            _refresh_errors.inc(cache=self.name)
+            print(f"[cache:error] refresh of {self.name} {key} failed: {ex}")
+        finally:
+            self._refreshing.discard(key)
+
+    async def respond(
+        self, request: Request, build: Builder, validators: Optional[Validators] = None
+    ) -> Response:
+        """
+        キャッシュから返す。無ければ build() で作って保存する。build() が
+        HTTPException（404 等）を投げた場合は保存せずにそのまま伝える。
+        validators を渡すと ETag / Last-Modified はそれを付け、キーにも含める。
+        """
+        if self.ttl <= 0:
+            _requests.inc(cache=self.name, result="bypass")
+            return (await build()).to_response(request, "BYPASS", validators)
+
+        key = cache_key(request)
+        if validators is not None:
+            # 版が変わったら別エントリ（古い本文に新しい ETag を付けて返さない）
+            key += "#" + validators.etag
+        entry: Optional[CachedResponse] = self._entries.get(key)
+        if entry is not None and entry.fresh_until > time.monotonic():
+            _requests.inc(cache=self.name, result="hit")
+            return entry.to_response(request, "HIT", validators)
+        if entry is not None:
+            _requests.inc(cache=self.name, result="stale")
+            if key not in self._refreshing:
+                self._refreshing.add(key)
+                task = asyncio.create_task(self._refresh(key, build, self._generation))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return entry.to_response(request, "STALE", validators)
+
+        _requests.inc(cache=self.name, result="miss")
+        generation = self._generation
+        entry = await build()
+        self._store(key, entry, generation)
+        return entry.to_response(request, "MISS", validators)
+
+
+_caches: Dict[str, ResponseCache] = {}
+
+
+def response_cache(name: str) -> ResponseCache:
+    """名前ごとに 1 つのキャッシュ（ルーターと CRUD で同じものを使う）。"""
+    cache = _caches.get(name)
+    if cache is None:
+        cache = _caches[name] = ResponseCache(name)
+    return cache
+
+
+def invalidate_responses(name: str) -> None:
+    response_cache(name).invalidate()
@@ -4,6 +4,8 @@ from fastapi import Depends, HTTPException, status
 from jose import JWTError, jwt
 from fastapi.security import OAuth2PasswordBearer
 from app.core.utils import verify_password, get_password_hash, create_access_token  # utilsからインポート
+from app.core.cache import TTLCache
+from app.core.metrics import Counter, Gauge, ratio
 import os
 
 # OAuth2のスキーマを設定
@@ -15,6 +17,42 @@ oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="token", auto_error=False
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")  # 環境変数から読み込み
 ALGORITHM = "HS256"
 
+# 認証ユーザーのキャッシュ（email + トークン単位）。JWT の sub → User の変換で
+# 毎リクエスト Neo4j に問い合わせないようにする。UserCRUD.update/delete で無効化。
+_user_cache = TTLCache(
+    maxsize=int(os.getenv("AUTH_USER_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("AUTH_USER_CACHE_TTL", "60")),
+)
+_user_cache_hits = Counter("auth_user_cache_hits_total", "Authenticated user cache hits.")
+_user_cache_misses = Counter("auth_user_cache_misses_total", "Authenticated user cache misses.")
+Gauge(
+    "auth_user_cache_hit_ratio",
+    "Hit ratio of the authenticated user cache since process start.",
+    function=ratio(_user_cache_hits, [_user_cache_hits, _user_cache_misses]),
+)
+
+
+def invalidate_user(email: Optional[str]) -> None:
+    """email に紐づくキャッシュ済みユーザーを（全トークン分）破棄する。"""
+    if email:
+        _user_cache.invalidate(lambda key: key[0] == email)
+
+
+async def _load_user(email: str, token: str):
+    user = _user_cache.get((email, token))
+    if user is not None:
+        _user_cache_hits.inc()
+        return user
+    _user_cache_misses.inc()
+
+    from app.crud.users import UserCRUD  # 遅延インポートで循環依存を回避
+
+    user = await UserCRUD.get_by_email(email)
+    if user is not None:
+        _user_cache.set((email, token), user)
+    return user
+
+
 async def decode_token(token: str = Depends(oauth2_scheme)) -> str:
     """
     トークンをデコードしてemailを抽出
@@ -33,13 +71,13 @@ async def decode_token(token: str = Depends(oauth2_scheme)) -> str:
     except JWTError:
         raise credentials_exception
 
-async def get_current_user(email: str = Depends(decode_token)):
+async def get_current_user(
+    email: str = Depends(decode_token), token: str = Depends(oauth2_scheme)
+):
     """
     トークンから取得したemailを利用して、現在のユーザーを取得
     """
-    from app.crud.users import UserCRUD  # 遅延インポートで循環依存を回避
-
-    user = await UserCRUD.get_by_email(email)
+    user = await _load_user(email, token)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -63,9 +101,7 @@ async def get_optional_user(token: Optional[str] = Depends(oauth2_scheme_optiona
             return None
     except JWTError:
         return None
-    from app.crud.users import UserCRUD  # 遅延インポートで循環依存を回避
-
-    return await UserCRUD.get_by_email(email)
+    return await _load_user(email, token)
 
 
 async def get_admin_user(current_user=Depends(get_current_user)):
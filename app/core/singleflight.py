@@ -0,0 +1,69 @@
+"""
+同じ読み取りの同時実行をまとめる（single flight）。
+
+記事がシェアされた直後などに同じ id の GET が一斉に来ると、そのまま同じ Cypher が
+並んで走る。SingleFlight.do(key, fn, ...) は、同じ key の呼び出しが実行中なら
+新しく走らせずにその結果（例外も）を待って共有する。結果を覚えておくことは
+しない（キャッシュではない）ので、終わった後の呼び出しはまた DB を読む。
+
+共有した戻り値は全員に同じオブジェクトが渡るので、呼び出し側で書き換えないこと。
+先に来た呼び出しがキャンセルされても、待っている他の呼び出しは巻き込まない。
+"""
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from app.core.metrics import Counter
+
+_calls = Counter(
+    "singleflight_calls_total", "Calls through a single-flight group.",
+    labelnames=("group",),
+)
+_coalesced = Counter(
+    "singleflight_coalesced_total",
+    "Calls that waited on an identical in-flight call instead of running their own.",
+    labelnames=("group",),
+)
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        _calls.inc(group=self.name)
+        task = self._inflight.get(key)
+        if task is not None:
+            _coalesced.inc(group=self.name)
+        else:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._forget(k, _t))
+        # shield: 待っている 1 人がキャンセルされても本体は止めない
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # 誰も待っていなくても「未取得の例外」警告を出さない
+
+
+def single_flight(name: str):
+    """
+    async 関数を位置引数・キーワード引数が同じ呼び出しごとにまとめるデコレータ。
+    引数はハッシュできること。
+    """
+    group = SingleFlight(name)
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            return await group.do(key, fn, *args, **kwargs)
+
+        wrapper.group = group
+        return wrapper
+
+    return decorator
@@ -0,0 +1,187 @@
+"""
+入力補完（typeahead）用のプロセス内 n-gram 索引。
+
+1 文字ごとに DB へ問い合わせると往復だけで間に合わないので、短い文字列（店名・
+イベント名など）をメモリに持ち、文字の 1-gram / 2-gram から候補を引く。
+
+  - 正規化は NFKC + casefold + カタカナ→ひらがな（「ラーメン」と「らーめん」を同じに扱う）
+  - 部分一致（日本語は語の区切りが無いので前方一致だけでは足りない）。並びは
+    先頭一致 → 語の先頭で一致 → 途中で一致、その中では短い順
+  - 同じ種類・同じ文字列の候補（同じ会社の求人など）は 1 件にまとめる
+  - メモリは max_bytes の目安で打ち切る。超える分は登録せず、rejected で数える
+    （大きさは文字列と posting 数からの概算で、厳密な値ではない）
+
+asyncio のシングルスレッド前提なのでロックは持たない（await を挟まずに操作する）。
+"""
+import heapq
+import sys
+import time
+import unicodedata
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from app.core.metrics import Counter, Gauge, Summary
+
+# posting 1 つ（set の 1 要素）あたりの概算バイト数と、1 エントリの固定分
+_POSTING_BYTES = 40
+_ENTRY_BYTES = 200
+
+_queries = Counter(
+    "typeahead_queries_total", "Typeahead lookups by index.",
+    labelnames=("index",),
+)
+_query_seconds = Summary(
+    "typeahead_query_seconds", "Time spent answering typeahead lookups.",
+    labelnames=("index",),
+)
+_rejected = Counter(
+    "typeahead_rejected_total", "Entries not indexed because the memory budget was reached.",
+    labelnames=("index",),
+)
+
+# ァ(U+30A1)〜ヶ(U+30F6) をひらがなへ
+_KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return " ".join(text.translate(_KATAKANA_TO_HIRAGANA).split())
+
+
+def _grams(norm: str) -> Set[str]:
+    return set(norm) | {norm[i:i + 2] for i in range(len(norm) - 1)}
+
+
+class Match(NamedTuple):
+    kind: str
+    item_id: str
+    field: str
+    text: str
+
+
+class _Entry(NamedTuple):
+    match: Match
+    norm: str
+    grams: Tuple[str, ...]
+    cost: int
+
+
+class TypeaheadIndex:
+    def __init__(self, name: str, max_bytes: int):
+        self.name = name
+        self.max_bytes = max_bytes
+        self._entries: Dict[int, _Entry] = {}
+        self._by_item: Dict[Tuple[str, str], List[int]] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._next = 0
+        self._bytes = 0
+        Gauge(
+            f"{name}_entries", f"Strings held in the {name} typeahead index.",
+            function=lambda: len(self._entries),
+        )
+        Gauge(
+            f"{name}_bytes", f"Approximate memory used by the {name} typeahead index.",
+            function=lambda: self._bytes,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def approx_bytes(self) -> int:
+        return self._bytes
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_item.clear()
+        self._postings.clear()
+        self._bytes = 0
+
+    def add(self, kind: str, item_id: str, field: str, text: Optional[str]) -> bool:
+        """1 つの文字列を登録する。空文字・予算超過なら登録せず False。"""
+        norm = normalize(text)
+        if not norm:
+            return False
+        grams = tuple(_grams(norm))
+        cost = _ENTRY_BYTES + sys.getsizeof(text) + sys.getsizeof(norm) + len(grams) * _POSTING_BYTES
+        if self._bytes + cost > self.max_bytes:
+            _rejected.inc(index=self.name)
+            return False
+        entry_id = self._next
+        self._next += 1
+        self._entries[entry_id] = _Entry(Match(kind, item_id, field, text.strip()), norm, grams, cost)
+        self._by_item.setdefault((kind, item_id), []).append(entry_id)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(entry_id)
+        self._bytes += cost
+        return True
+
+    def remove(self, kind: str, item_id: str) -> None:
+        """その項目の文字列をすべて外す。"""
+        for entry_id in self._by_item.pop((kind, item_id), ()):
+            entry = self._entries.pop(entry_id)
+            for gram in entry.grams:
+                ids = self._postings.get(gram)
+                if ids is not None:
+                    ids.discard(entry_id)
+                    if not ids:
+                        del self._postings[gram]
+            self._bytes -= entry.cost
+
+    def put(self, kind: str, item_id: str, fields: Dict[str, Optional[str]]) -> None:
+        """項目の文字列を入れ替える（作成・更新のどちらでも使う）。"""
+        self.remove(kind, item_id)
+        for field, text in fields.items():
+            self.add(kind, item_id, field, text)
+
+    def _candidates(self, q: str) -> Iterable[int]:
+        grams = _grams(q) if len(q) == 1 else {q[i:i + 2] for i in range(len(q) - 1)}
+        postings = []
+        for gram in grams:
+            ids = self._postings.get(gram)
+            if not ids:
+                return ()
+            postings.append(ids)
+        postings.sort(key=len)
+        # 一番少ない posting から始めて絞る（最後は部分一致で確かめる）
+        return postings[0].intersection(*postings[1:])
+
+    def suggest(
+        self, q: str, kinds: Optional[Iterable[str]] = None, limit: int = 10
+    ) -> List[Match]:
+        started = time.perf_counter()
+        _queries.inc(index=self.name)
+        try:
+            q = normalize(q)
+            if not q:
+                return []
+            wanted = set(kinds) if kinds else None
+            ranked = []
+            for entry_id in self._candidates(q):
+                entry = self._entries[entry_id]
+                if wanted is not None and entry.match.kind not in wanted:
+                    continue
+                pos = entry.norm.find(q)
+                if pos < 0:
+                    continue
+                if pos == 0:
+                    rank = 0
+                elif (" " + entry.norm).find(" " + q) >= 0:
+                    rank = 1
+                else:
+                    rank = 2
+                ranked.append((rank, len(entry.norm), entry.norm, entry_id))
+            out: List[Match] = []
+            seen: Set[Hashable] = set()
+            # 重複をまとめても limit 件残るよう、少し多めに取り出す
+            for _, _, norm, entry_id in heapq.nsmallest(limit * 4, ranked):
+                match = self._entries[entry_id].match
+                key = (match.kind, match.field, norm)
+                if key in seen:
+                    continue
+                seen.add(key)
+                out.append(match)
+                if len(out) >= limit:
+                    break
+            return out
+        finally:
+            _query_seconds.observe(time.perf_counter() - started, index=self.name)
@@ -1,12 +1,46 @@
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from fastapi import HTTPException, status
 from jose import jwt
-from typing import Union
+from typing import Callable, TypeVar, Union
+import asyncio
 import os
+import time
+
+from app.core.metrics import Counter, Gauge, Summary
 
 # パスワードのハッシュ化関連
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt は 1 回数百 ms の CPU を使うので、イベントループではなく専用の
+# スレッドプールで回す（bcrypt は計算中 GIL を手放す）。プールに積まれた件数が
+# PASSWORD_HASH_MAX_PENDING を超えたら 503 で断り、ワーカー全体が詰まるのを防ぐ
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+_hash_pool = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_pending = Gauge(
+    "password_hash_pending", "bcrypt jobs submitted to the pool and not yet finished."
+)
+Gauge(
+    "password_hash_workers", "Size of the bcrypt thread pool.",
+    function=lambda: PASSWORD_HASH_WORKERS,
+)
+_hash_wait = Summary(
+    "password_hash_queue_wait_seconds", "Time bcrypt jobs waited for a free worker.",
+    labelnames=("op",),
+)
+_hash_duration = Summary(
+    "password_hash_duration_seconds", "CPU time spent in bcrypt per job.", labelnames=("op",),
+)
+_hash_rejected = Counter(
+    "password_hash_rejected_total", "bcrypt jobs refused because the pool queue was full.",
+)
+_hash_pending.set(0)
+
+T = TypeVar("T")
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     平文のパスワードがハッシュ化されたパスワードと一致するか検証
@@ -19,6 +53,44 @@ def get_password_hash(password: str) -> str:
     """
     return pwd_context.hash(password)
 
+async def _run_in_hash_pool(op: str, fn: Callable[..., T], *args) -> T:
+    if _hash_pending.value() >= PASSWORD_HASH_MAX_PENDING:
+        _hash_rejected.inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy. Please try again shortly.",
+            headers={"Retry-After": "1"},
+        )
+    submitted = time.perf_counter()
+
+    def job():
+        started = time.perf_counter()
+        value = fn(*args)
+        return value, started, time.perf_counter()
+
+    _hash_pending.inc()
+    try:
+        value, started, finished = await asyncio.get_running_loop().run_in_executor(
+            _hash_pool, job
+        )
+    finally:
+        _hash_pending.dec()
+    _hash_wait.observe(started - submitted, op=op)
+    _hash_duration.observe(finished - started, op=op)
+    return value
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    verify_password を bcrypt 用のスレッドプールで実行（async ハンドラからはこちら）
+    """
+    return await _run_in_hash_pool("verify", verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    get_password_hash を bcrypt 用のスレッドプールで実行（async ハンドラからはこちら）
+    """
+    return await _run_in_hash_pool("hash", get_password_hash, password)
+
 # JWTトークン関連
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")  # 環境変数から読み込み
 ALGORITHM = "HS256"
@@ -0,0 +1,169 @@
+"""
+内見スロットの計算エンジン（プロセス内）。
+
+登録期間 (AvailabilityWindow) を 30 分枠の「位相」（開始時刻を 30 分で割った余り）
+ごとに分け、位相ごとに重なる/接する区間を併合したソート済みリストとして持つ。
+同じ位相の区間どうしなら、併合後の区間から切り出した枠は元の期間ごとに
+切り出した枠の和集合と一致する。予約数は枠の開始時刻ごとのカウンタで持つ。
+
+- 範囲問い合わせ (slots) と 1 枠の検証 (is_available) は二分探索で答える
+- 期間の追加/削除・予約の作成/キャンセルは、その差分だけ反映する
+- 他プロセスでの更新を拾うため、AVAILABILITY_REBUILD_SECONDS ごとに DB から作り直す
+"""
+import asyncio
+import bisect
+import os
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.metrics import Counter
+
+AVAILABILITY_REBUILD_SECONDS = float(os.getenv("AVAILABILITY_REBUILD_SECONDS", "60"))
+
+_rebuilds = Counter("availability_rebuilds_total", "Full rebuilds of the viewing slot engine.")
+
+# (window id, starts_at, ends_at) のリストと、有効予約の開始時刻のリストを返す
+Loader = Callable[[], Awaitable[Tuple[List[Tuple[str, datetime, datetime]], List[datetime]]]]
+
+
+def _ts(dt: datetime) -> int:
+    return int(dt.timestamp())
+
+
+def _dt(ts: int) -> datetime:
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+
+class SlotEngine:
+    def __init__(self, loader: Loader, slot_minutes: int = 30):
+        self._loader = loader
+        self._step = slot_minutes * 60
+        self._windows: Dict[str, Tuple[int, int]] = {}
+        # 位相 -> 併合済み区間 (start, end) の開始順リスト
+        self._merged: Dict[int, List[Tuple[int, int]]] = {}
+        self._counts: Dict[int, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._dirty = False
+        # Lock はループに紐づくので、最初に使うときに作る
+        self._lock: Optional[asyncio.Lock] = None
+
+    # ----- 構築 -------------------------------------------------------------
+    def _merge_phase(self, phase: int) -> None:
+        intervals = sorted(
+            (s, e) for s, e in self._windows.values() if s % self._step == phase
+        )
+        merged: List[Tuple[int, int]] = []
+        for s, e in intervals:
+            if merged and s <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+            else:
+                merged.append((s, e))
+        if merged:
+            self._merged[phase] = merged
+        else:
+            self._merged.pop(phase, None)
+
+    def _fresh(self) -> bool:
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < AVAILABILITY_REBUILD_SECONDS
+        )
+
+    async def ensure_loaded(self) -> None:
+        if self._fresh():
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._fresh():
+                return
+            self._dirty = False
+            windows, bookings = await self._loader()
+            self._windows = {wid: (_ts(s), _ts(e)) for wid, s, e in windows}
+            self._merged = {}
+            for phase in {s % self._step for s, _ in self._windows.values()}:
+                self._merge_phase(phase)
+            self._counts = {}
+            for b in bookings:
+                key = _ts(b)
+                self._counts[key] = self._counts.get(key, 0) + 1
+            # 読み込み中に差分が来た場合、その差分が読み込み結果に含まれたか
+            # 分からないので、次の呼び出しで読み直す
+            self._loaded_at = None if self._dirty else time.monotonic()
+            _rebuilds.inc()
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+    # ----- 差分反映 ---------------------------------------------------------
+    # まだ読み込んでいなければ何もしない（次の ensure_loaded で DB から読む）
+    def add_window(self, window_id: str, starts_at: datetime, ends_at: datetime) -> None:
+        self._dirty = True
+        if self._loaded_at is None:
+            return
+        s, e = _ts(starts_at), _ts(ends_at)
+        self._windows[window_id] = (s, e)
+        self._merge_phase(s % self._step)
+
+    def remove_window(self, window_id: str) -> None:
+        self._dirty = True
+        if self._loaded_at is None:
+            return
+        removed = self._windows.pop(window_id, None)
+        if removed:
+            self._merge_phase(removed[0] % self._step)
+
+    def add_booking(self, starts_at: datetime) -> None:
+        self._dirty = True
+        if self._loaded_at is None:
+            return
+        key = _ts(starts_at)
+        self._counts[key] = self._counts.get(key, 0) + 1
+
+    def remove_booking(self, starts_at: datetime) -> None:
+        self._dirty = True
+        if self._loaded_at is None:
+            return
+        key = _ts(starts_at)
+        if self._counts.get(key, 0) > 1:
+            self._counts[key] -= 1
+        else:
+            self._counts.pop(key, None)
+
+    # ----- 問い合わせ -------------------------------------------------------
+    def is_available(self, starts_at: datetime, now: Optional[datetime] = None) -> bool:
+        """starts_at が現在以降の、いずれかの期間に収まる 30 分枠の開始か。"""
+        s = _ts(starts_at)
+        if s < _ts(now or datetime.now(timezone.utc)):
+            return False
+        intervals = self._merged.get(s % self._step)
+        if not intervals:
+            return False
+        i = bisect.bisect_right(intervals, (s, float("inf"))) - 1
+        return i >= 0 and s + self._step <= intervals[i][1]
+
+    def booking_count(self, starts_at: datetime) -> int:
+        return self._counts.get(_ts(starts_at), 0)
+
+    def slots(
+        self, starts_from: Optional[datetime] = None, starts_to: Optional[datetime] = None
+    ) -> List[Tuple[datetime, int]]:
+        """[starts_from, starts_to) に開始する枠を (開始, 予約数) の昇順で返す。"""
+        lo = _ts(starts_from or datetime.now(timezone.utc))
+        hi = _ts(starts_to) if starts_to else None
+        found: List[int] = []
+        for phase, intervals in self._merged.items():
+            # lo より前に終わる区間は飛ばす
+            i = bisect.bisect_left([e for _, e in intervals], lo + self._step)
+            for s, e in intervals[i:]:
+                if hi is not None and s >= hi:
+                    break
+                # lo 以上で最初の、この位相の枠
+                cur = s if s >= lo else lo + (phase - lo) % self._step
+                while cur + self._step <= e and (hi is None or cur < hi):
+                    found.append(cur)
+                    cur += self._step
+        found.sort()
+        return [(_dt(ts), self._counts.get(ts, 0)) for ts in found]
+
@@ -1,8 +1,11 @@
 from app.crud.database import db
-from fastapi import HTTPException
-from app.models.blog import Blog, BlogCreate
-from typing import List, Optional
-from uuid import uuid4
+from app.crud.pagination import fetch_page, map_projection, publish_sort_at
+from app.crud.creation import create_owned
+from app.crud.sort_at import sort_at_complete
+from app.crud.versions import content_changed
+from app.crud.projection import to_json_values
+from app.models.blog import Blog, BlogCreate, BlogSummary
+from typing import Any, Dict, List, Optional, Tuple
 
 
 def _row_to_blog(blog_data) -> Blog:
@@ -25,64 +28,105 @@ def _row_to_blog(blog_data) -> Blog:
     )
 
 
+# 一覧（サマリ）で読むプロパティ。本文の content は読まない
+_SUMMARY_FIELDS = (
+    "title", "excerpt", "category", "image", "publishDate", "status", "created_at",
+)
+
+
+def _row_to_summary(data) -> BlogSummary:
+    return BlogSummary(**{**to_json_values(dict(data)), "status": data.get("status") or "published"})
+
+
 class BlogCRUD:
     @staticmethod
     async def create(blog: BlogCreate, creator_id: str) -> Blog:
-        with db.get_session() as session:
-            blog_id = str(uuid4())
-            result = session.run(
-                """
-                CREATE (b:Blog {
-                    id: $id,
-                    title: $title,
-                    content: $content,
-                    excerpt: $excerpt,
-                    category: $category,
-                    image: $image,
-                    publishDate: $publishDate,
-                    creator_id: $creator_id,
-                    status: 'published',
-                    created_at: datetime(),
-                    updated_at: datetime()
-                })
-                RETURN b
-                """,
-                id=blog_id,
-                title=blog.title,
-                content=blog.content,
-                excerpt=blog.excerpt,
-                category=blog.category,
-                image=blog.image,
-                publishDate=blog.publishDate,
-                creator_id=creator_id,
+        async with db.write_session() as session:
+            created = await create_owned(
+                session, "Blog",
+                {
+                    "title": blog.title,
+                    "content": blog.content,
+                    "excerpt": blog.excerpt,
+                    "category": blog.category,
+                    "image": blog.image,
+                    "publishDate": blog.publishDate,
+                    "status": "published",
+                },
+                creator_id, _row_to_blog,
+                computed={"sort_at": "coalesce(datetime($sort_at), datetime())"},
+                sort_at=publish_sort_at(blog.publishDate),
             )
-            record = result.single()
-            if not record:
-                raise HTTPException(status_code=500, detail="Failed to create blog.")
+        content_changed("blogs")
+        return created
 
-            session.run(
-                """
-                MATCH (u:User {id: $user_id}), (b:Blog {id: $blog_id})
-                CREATE (u)-[:CREATED]->(b)
-                """,
-                user_id=creator_id,
-                blog_id=blog_id,
-            )
-            return _row_to_blog(record["b"])
+    @staticmethod
+    async def get_all(
+        category: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Blog], Optional[str]]:
+        rows, next_cursor = await BlogCRUD._page(category, status, limit, cursor)
+        return [_row_to_blog(row) for row in rows], next_cursor
 
     @staticmethod
-    async def get_all() -> List[Blog]:
-        with db.get_session() as session:
-            result = session.run(
-                "MATCH (b:Blog) RETURN b ORDER BY coalesce(b.publishDate, toString(b.created_at)) DESC"
+    async def get_summaries(
+        category: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[BlogSummary], Optional[str]]:
+        """get_all と同じ並び・絞り込みで、一覧表示に要るプロパティだけを読む。"""
+        rows, next_cursor = await BlogCRUD._page(
+            category, status, limit, cursor, projection=_SUMMARY_FIELDS
+        )
+        return [_row_to_summary(row) for row in rows], next_cursor
+
+    @staticmethod
+    async def _page(
+        category: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        projection: Tuple[str, ...] = (),
+    ) -> Tuple[List[Any], Optional[str]]:
+        filters, params = [], {}
+        if category is not None:
+            filters.append("b.category = $category")
+            params["category"] = category
+        if status is not None:
+            filters.append("b.status = $status")
+            params["status"] = status
+        async with db.read_session() as session:
+            if await sort_at_complete(session, "Blog"):
+                # sort_at のインデックスを順に読んで LIMIT で止められるよう、NULL を除く条件を付ける
+                filters.append("b.sort_at IS NOT NULL")
+                sort_key = "b.sort_at"
+            else:
+                # v5 の埋め戻しがまだなら、インデックスは使えないが行を落とさずに並べる
+                sort_key = "coalesce(b.sort_at, b.created_at)"
+            records, next_cursor = await fetch_page(
+                session, "MATCH (b:Blog)", "b",
+                filters=filters, params=params, limit=limit, cursor=cursor,
+                sort_key=sort_key, projection=projection,
             )
-            return [_row_to_blog(r["b"]) for r in result]
+            return [r["b"] for r in records], next_cursor
 
     @staticmethod
     async def get_by_id(blog_id: str) -> Optional[Blog]:
-        with db.get_session() as session:
-            result = session.run(
+        async with db.read_session() as session:
+            record = await session.read_one(
                 "MATCH (b:Blog {id: $id}) RETURN b", id=blog_id
             )
-            record = result.single()
             return _row_to_blog(record["b"]) if record else None
+
+    @staticmethod
+    async def get_fields(blog_id: str, fields: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        """?fields= 用。指定したプロパティだけを読む（fields は parse_fields 済みのもの）。"""
+        async with db.read_session() as session:
+            record = await session.read_one(
+                f"MATCH (b:Blog {{id: $id}}) RETURN {map_projection('b', fields)} AS b",
+                id=blog_id,
+            )
+            return to_json_values(dict(record["b"])) if record else None
@@ -1,4 +1,7 @@
+from app.core.singleflight import SingleFlight
+from app.crud.board_counters import reaction_prop
 from app.crud.database import db
+from app.crud.pagination import fetch_page
 from fastapi import HTTPException, status
 from app.models.board import (
     BoardPostSummary,
@@ -8,13 +11,16 @@ from app.models.board import (
     ReactionState,
     ALLOWED_EMOJIS,
 )
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from uuid import uuid4
 
 # リアクション対象として許可するラベル（内部値のみ・ユーザー入力ではない）
 _POST_LABEL = "BoardPost"
 _COMMENT_LABEL = "Comment"
 
+# 未ログインの閲覧者には同じ内容を返すので、同時に来た取得は 1 回にまとめる
+_anonymous_post_reads = SingleFlight("board.get_post")
+
 
 def _iso(dt) -> Optional[str]:
     if dt is None:
@@ -25,24 +31,69 @@ def _iso(dt) -> Optional[str]:
         return str(dt)
 
 
-def _reactions_for(session, label: str, target_id: str) -> List[ReactionCount]:
-    res = session.run(
-        f"MATCH (t:{label} {{id: $id}})<-[r:REACTED]-() "
-        f"RETURN r.emoji AS emoji, count(*) AS c ORDER BY c DESC",
-        id=target_id,
-    )
-    return [ReactionCount(emoji=row["emoji"], count=row["c"]) for row in res]
+def _reaction_counts(node) -> List[ReactionCount]:
+    """ノードに持たせた絵文字ごとのカウンタから、件数の多い順のリストを作る。"""
+    counts = [
+        ReactionCount(emoji=e, count=node.get(reaction_prop(e)) or 0) for e in ALLOWED_EMOJIS
+    ]
+    return sorted((c for c in counts if c.count > 0), key=lambda c: -c.count)
 
 
-def _my_reactions(session, label: str, target_id: str, email: Optional[str]) -> List[str]:
+async def _my_reactions(
+    session, target_ids: List[str], email: Optional[str]
+) -> Dict[str, List[str]]:
+    """閲覧者が付けた絵文字を対象 id ごとに返す（未ログインなら空）。"""
     if not email:
-        return []
-    res = session.run(
-        f"MATCH (:User {{email: $e}})-[r:REACTED]->(t:{label} {{id: $id}}) "
-        f"RETURN collect(r.emoji) AS es",
-        e=email, id=target_id,
-    ).single()
-    return res["es"] if res and res["es"] else []
+        return {}
+    rows = await session.read(
+        """
+        MATCH (:User {email: $e})-[r:REACTED]->(t)
+        WHERE t.id IN $ids
+        RETURN t.id AS target, collect(r.emoji) AS emojis
+        """,
+        e=email, ids=target_ids,
+    )
+    return {row["target"]: row["emojis"] for row in rows}
+
+
+async def _delete_post_tx(tx, post_id: str, email: str, is_admin: bool) -> None:
+    res = await tx.run(
+        "MATCH (p:BoardPost {id: $id}) RETURN p.author_email AS owner", id=post_id
+    )
+    rec = await res.single()
+    if not rec:
+        raise HTTPException(status_code=404, detail="Post not found.")
+    if not (is_admin or rec["owner"] == email):
+        raise HTTPException(status_code=403, detail="Not allowed.")
+    await tx.run(
+        """
+        MATCH (p:BoardPost {id: $id})
+        OPTIONAL MATCH (p)-[:HAS_COMMENT]->(c:Comment)
+        DETACH DELETE c, p
+        """,
+        id=post_id,
+    )
+
+
+async def _delete_comment_tx(tx, comment_id: str, email: str, is_admin: bool) -> None:
+    res = await tx.run(
+        "MATCH (c:Comment {id: $id}) RETURN c.author_email AS owner", id=comment_id
+    )
+    rec = await res.single()
+    if not rec:
+        raise HTTPException(status_code=404, detail="Comment not found.")
+    if not (is_admin or rec["owner"] == email):
+        raise HTTPException(status_code=403, detail="Not allowed.")
+    await tx.run(
+        """
+        MATCH (c:Comment {id: $id})
+        OPTIONAL MATCH (p:BoardPost)-[:HAS_COMMENT]->(c)
+        FOREACH (x IN CASE WHEN p IS NULL THEN [] ELSE [p] END |
+            SET x.comment_count = coalesce(x.comment_count, 1) - 1)
+        DETACH DELETE c
+        """,
+        id=comment_id,
+    )
 
 
 class BoardCRUD:
@@ -53,9 +104,9 @@ class BoardCRUD:
         body = (body or "").strip()
         if not title or not body:
             raise HTTPException(status_code=400, detail="Title and body are required.")
-        with db.get_session() as session:
+        async with db.write_session() as session:
             pid = str(uuid4())
-            rec = session.run(
+            rec = await session.write_one(
                 """
                 CREATE (p:BoardPost {
                     id: $id, title: $title, body: $body,
@@ -65,25 +116,22 @@ class BoardCRUD:
                 RETURN p.id AS id
                 """,
                 id=pid, title=title, body=body, name=author_name, email=author_email,
-            ).single()
+            )
             if not rec:
                 raise HTTPException(status_code=500, detail="Failed to create post.")
             return pid
 
     @staticmethod
-    async def list_posts() -> List[BoardPostSummary]:
-        with db.get_session() as session:
-            res = session.run(
-                """
-                MATCH (p:BoardPost)
-                OPTIONAL MATCH (p)-[:HAS_COMMENT]->(c:Comment)
-                OPTIONAL MATCH (p)<-[r:REACTED]-()
-                RETURN p, count(DISTINCT c) AS comment_count, count(DISTINCT r) AS reaction_total
-                ORDER BY p.created_at DESC
-                """
+    async def list_posts(
+        limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> Tuple[List[BoardPostSummary], Optional[str]]:
+        async with db.read_session() as session:
+            # 件数は投稿ノードのカウンタを読むだけ（コメントやリアクションは辿らない）
+            records, next_cursor = await fetch_page(
+                session, "MATCH (p:BoardPost)", "p", limit=limit, cursor=cursor
             )
             out = []
-            for row in res:
+            for row in records:
                 p = row["p"]
                 out.append(
                     BoardPostSummary(
@@ -91,32 +139,45 @@ class BoardCRUD:
                         title=p["title"],
                         author_name=p.get("author_name") or "匿名",
                         created_at=_iso(p["created_at"]),
-                        comment_count=row["comment_count"],
-                        reaction_total=row["reaction_total"],
+                        comment_count=p.get("comment_count") or 0,
+                        reaction_total=p.get("reaction_total") or 0,
                     )
                 )
-            return out
+            return out, next_cursor
 
     @staticmethod
     async def get_post(post_id: str, email: Optional[str], is_admin: bool) -> BoardPostDetail:
-        with db.get_session() as session:
-            rec = session.run(
-                "MATCH (p:BoardPost {id: $id}) RETURN p", id=post_id
-            ).single()
-            if not rec:
-                raise HTTPException(status_code=404, detail="Post not found.")
-            p = rec["p"]
+        if not email and not is_admin:
+            return await _anonymous_post_reads.do(
+                post_id, BoardCRUD._load_post, post_id, None, False
+            )
+        return await BoardCRUD._load_post(post_id, email, is_admin)
 
-            comments_res = session.run(
+    @staticmethod
+    async def _load_post(post_id: str, email: Optional[str], is_admin: bool) -> BoardPostDetail:
+        # コメント数に関係なく 2 クエリ（投稿+コメント / 閲覧者のリアクション）で組み立てる。
+        # 件数は各ノードのカウンタから読む
+        async with db.read_session() as session:
+            rec = await session.read_one(
                 """
-                MATCH (p:BoardPost {id: $id})-[:HAS_COMMENT]->(c:Comment)
-                RETURN c ORDER BY c.created_at ASC
+                MATCH (p:BoardPost {id: $id})
+                OPTIONAL MATCH (p)-[:HAS_COMMENT]->(c:Comment)
+                WITH p, c ORDER BY c.created_at ASC
+                RETURN p, collect(c) AS comments
                 """,
                 id=post_id,
             )
+            if not rec:
+                raise HTTPException(status_code=404, detail="Post not found.")
+            p = rec["p"]
+            comment_nodes = rec["comments"]
+
+            mine = await _my_reactions(
+                session, [post_id] + [c["id"] for c in comment_nodes], email
+            )
+
             comments = []
-            for crow in comments_res:
-                c = crow["c"]
+            for c in comment_nodes:
                 c_email = c.get("author_email")
                 comments.append(
                     CommentOut(
@@ -124,8 +185,8 @@ class BoardCRUD:
                         body=c["body"],
                         author_name=c.get("author_name") or "匿名",
                         created_at=_iso(c["created_at"]),
-                        reactions=_reactions_for(session, _COMMENT_LABEL, c["id"]),
-                        my_reactions=_my_reactions(session, _COMMENT_LABEL, c["id"], email),
+                        reactions=_reaction_counts(c),
+                        my_reactions=mine.get(c["id"], []),
                         can_delete=bool(is_admin or (email and c_email and email == c_email)),
                     )
                 )
@@ -137,30 +198,17 @@ class BoardCRUD:
                 body=p["body"],
                 author_name=p.get("author_name") or "匿名",
                 created_at=_iso(p["created_at"]),
-                reactions=_reactions_for(session, _POST_LABEL, post_id),
-                my_reactions=_my_reactions(session, _POST_LABEL, post_id, email),
+                reactions=_reaction_counts(p),
+                my_reactions=mine.get(post_id, []),
                 can_delete=bool(is_admin or (email and p_email and email == p_email)),
                 comments=comments,
             )
 
     @staticmethod
     async def delete_post(post_id: str, email: str, is_admin: bool) -> None:
-        with db.get_session() as session:
-            rec = session.run(
-                "MATCH (p:BoardPost {id: $id}) RETURN p.author_email AS owner", id=post_id
-            ).single()
-            if not rec:
-                raise HTTPException(status_code=404, detail="Post not found.")
-            if not (is_admin or rec["owner"] == email):
-                raise HTTPException(status_code=403, detail="Not allowed.")
-            session.run(
-                """
-                MATCH (p:BoardPost {id: $id})
-                OPTIONAL MATCH (p)-[:HAS_COMMENT]->(c:Comment)
-                DETACH DELETE c, p
-                """,
-                id=post_id,
-            )
+        async with db.write_session() as session:
+            # 権限チェックと削除を同じトランザクションで行う
+            await session.execute_write(_delete_post_tx, post_id, email, is_admin)
 
     # ===== Comments =====
     @staticmethod
@@ -168,13 +216,13 @@ class BoardCRUD:
         body = (body or "").strip()
         if not body:
             raise HTTPException(status_code=400, detail="Comment body is required.")
-        with db.get_session() as session:
-            if not session.run("MATCH (p:BoardPost {id: $id}) RETURN p", id=post_id).single():
-                raise HTTPException(status_code=404, detail="Post not found.")
+        async with db.write_session() as session:
             cid = str(uuid4())
-            rec = session.run(
+            # コメント作成と comment_count の更新を 1 文（= 1 トランザクション）で行う
+            rec = await session.write_one(
                 """
                 MATCH (p:BoardPost {id: $pid})
+                SET p.comment_count = coalesce(p.comment_count, 0) + 1
                 CREATE (c:Comment {
                     id: $id, post_id: $pid, body: $body,
                     author_name: $name, author_email: $email,
@@ -184,7 +232,9 @@ class BoardCRUD:
                 RETURN c
                 """,
                 pid=post_id, id=cid, body=body, name=author_name, email=author_email,
-            ).single()
+            )
+            if not rec:
+                raise HTTPException(status_code=404, detail="Post not found.")
             c = rec["c"]
             return CommentOut(
                 id=c["id"],
@@ -198,15 +248,8 @@ class BoardCRUD:
 
     @staticmethod
     async def delete_comment(comment_id: str, email: str, is_admin: bool) -> None:
-        with db.get_session() as session:
-            rec = session.run(
-                "MATCH (c:Comment {id: $id}) RETURN c.author_email AS owner", id=comment_id
-            ).single()
-            if not rec:
-                raise HTTPException(status_code=404, detail="Comment not found.")
-            if not (is_admin or rec["owner"] == email):
-                raise HTTPException(status_code=403, detail="Not allowed.")
-            session.run("MATCH (c:Comment {id: $id}) DETACH DELETE c", id=comment_id)
+        async with db.write_session() as session:
+            await session.execute_write(_delete_comment_tx, comment_id, email, is_admin)
 
     # ===== Reactions =====
     @staticmethod
@@ -215,35 +258,32 @@ class BoardCRUD:
             raise HTTPException(status_code=400, detail="Emoji not allowed.")
         if label not in (_POST_LABEL, _COMMENT_LABEL):
             raise HTTPException(status_code=400, detail="Invalid target.")
-        with db.get_session() as session:
-            if not session.run(
-                f"MATCH (t:{label} {{id: $id}}) RETURN t", id=target_id
-            ).single():
-                raise HTTPException(status_code=404, detail="Target not found.")
-
-            exists = session.run(
-                f"MATCH (:User {{email: $e}})-[r:REACTED {{emoji: $em}}]->(t:{label} {{id: $id}}) "
-                f"RETURN r LIMIT 1",
-                e=email, em=emoji, id=target_id,
-            ).single()
-
-            if exists:
-                session.run(
-                    f"MATCH (:User {{email: $e}})-[r:REACTED {{emoji: $em}}]->(t:{label} {{id: $id}}) "
-                    f"DELETE r",
-                    e=email, em=emoji, id=target_id,
-                )
-            else:
-                session.run(
-                    f"""
-                    MATCH (t:{label} {{id: $id}})
-                    MERGE (u:User {{email: $e}})
-                    MERGE (u)-[:REACTED {{emoji: $em}}]->(t)
-                    """,
-                    e=email, em=emoji, id=target_id,
-                )
-
-            return ReactionState(
-                reactions=_reactions_for(session, label, target_id),
-                my_reactions=_my_reactions(session, label, target_id, email),
+        async with db.write_session() as session:
+            # 1 文 = 1 トランザクションでトグルとカウンタ更新まで行う。最初に対象ノードへ
+            # 書き込んで排他ロックを取るので、同じ対象への同時トグルは直列化され、
+            # 連打しても REACTED やカウンタがずれない（過去の重複もここで掃除される）。
+            prop = reaction_prop(emoji)
+            rec = await session.write_one(
+                f"""
+                MATCH (t:{label} {{id: $id}})
+                SET t._lock = true
+                MERGE (u:User {{email: $e}})
+                WITH t, u
+                OPTIONAL MATCH (u)-[old:REACTED {{emoji: $em}}]->(t)
+                WITH t, u, collect(old) AS olds
+                WITH t, u, olds, CASE WHEN size(olds) = 0 THEN 1 ELSE -size(olds) END AS delta
+                FOREACH (r IN olds | DELETE r)
+                FOREACH (_ IN CASE WHEN delta > 0 THEN [1] ELSE [] END |
+                    CREATE (u)-[:REACTED {{emoji: $em}}]->(t))
+                SET t.`{prop}` = coalesce(t.`{prop}`, 0) + delta,
+                    t.reaction_total = coalesce(t.reaction_total, 0) + delta
+                REMOVE t._lock
+                WITH t, u
+                OPTIONAL MATCH (u)-[m:REACTED]->(t)
+                RETURN t, collect(m.emoji) AS mine
+                """,
+                id=target_id, e=email, em=emoji,
             )
+            if not rec:
+                raise HTTPException(status_code=404, detail="Target not found.")
+            return ReactionState(reactions=_reaction_counts(rec["t"]), my_reactions=rec["mine"])
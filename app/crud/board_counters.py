@@ -0,0 +1,94 @@
+"""
+掲示板の非正規化カウンタ。
+
+BoardPost.comment_count と、BoardPost / Comment の reaction_total・絵文字ごとの
+件数（プロパティ名は reaction_prop() を参照）は、add_comment / delete_comment /
+toggle_reaction が同じトランザクション内で更新する。一覧や詳細はこれを読むだけで、
+コメントや REACTED を数え直さない。
+
+ずれた場合（手でデータを触った、古いデータが残っている等）はグラフから数え直す:
+
+    python -m app.crud.board_counters          # 数え直して、値が違ったノードだけ書き換える
+    python -m app.crud.board_counters --check  # 書き換えずに、ずれているノード数だけ表示
+"""
+import asyncio
+import sys
+from typing import Dict, List
+
+from app.crud.database import db
+from app.models.board import ALLOWED_EMOJIS
+
+# カウンタを持つラベル（内部値のみ）
+_TARGET_LABELS = ("BoardPost", "Comment")
+
+
+def reaction_prop(emoji: str) -> str:
+    """絵文字ごとの件数を入れるプロパティ名。emoji は ALLOWED_EMOJIS のものに限る。"""
+    return f"reaction_{emoji}"
+
+
+def _reaction_statement(label: str, fix: bool) -> str:
+    # 絵文字は許可リストの固定値なので、バッククォートで囲んでプロパティ名に埋め込める
+    # （マイグレーションからパラメータ無しで流せるよう、比較値もリテラルで埋め込む）
+    expected = ["size(emojis)"] + [
+        f"size([e IN emojis WHERE e = '{emoji}'])" for emoji in ALLOWED_EMOJIS
+    ]
+    props = ["reaction_total"] + [reaction_prop(e) for e in ALLOWED_EMOJIS]
+    current = ", ".join(f"coalesce(t.`{p}`, 0)" for p in props)
+    statement = f"""
+        MATCH (t:{label})
+        OPTIONAL MATCH (t)<-[r:REACTED]-()
+        WITH t, collect(r.emoji) AS emojis
+        WITH t, [{", ".join(expected)}] AS expected
+        WHERE [{current}] <> expected
+        """
+    if fix:
+        sets = ", ".join(f"t.`{p}` = expected[{i}]" for i, p in enumerate(props))
+        statement += f"SET {sets}\n"
+    return statement + "RETURN count(t) AS n"
+
+
+def _comment_statement(fix: bool) -> str:
+    statement = """
+        MATCH (p:BoardPost)
+        OPTIONAL MATCH (p)-[:HAS_COMMENT]->(c:Comment)
+        WITH p, count(c) AS expected
+        WHERE coalesce(p.comment_count, 0) <> expected
+        """
+    if fix:
+        statement += "SET p.comment_count = expected\n"
+    return statement + "RETURN count(p) AS n"
+
+
+def repair_statements(fix: bool = True) -> List[str]:
+    return [_comment_statement(fix)] + [_reaction_statement(label, fix) for label in _TARGET_LABELS]
+
+
+async def repair_counters(fix: bool = True) -> Dict[str, int]:
+    """
+    カウンタをグラフから数え直し、値が違っていたノード数を返す。
+    fix=False なら数えるだけで書き換えない。
+    """
+    names = ["comment_count"] + [f"{label}.reactions" for label in _TARGET_LABELS]
+    out: Dict[str, int] = {}
+    async with db.write_session() as session:
+        for name, statement in zip(names, repair_statements(fix)):
+            result = await session.run(statement)
+            rec = await result.single()
+            out[name] = rec["n"] if rec else 0
+    return out
+
+
+async def _main(argv: List[str]) -> None:
+    fix = "--check" not in argv
+    try:
+        counts = await repair_counters(fix=fix)
+        verb = "repaired" if fix else "out of sync"
+        for name, n in counts.items():
+            print(f"[board:counters] {name}: {n} node(s) {verb}")
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv[1:]))
@@ -0,0 +1,63 @@
+"""
+作成者付きのノード作成（Event, Job, Product, Property, Store, News, Blog で共通）。
+
+以前は CREATE と、User を探して CREATED を張る MATCH ... CREATE の 2 往復だった。
+2 回目は別トランザクションなので途中で失敗するとリレーションの無いノードが残り、
+ノード側の id をもう一度引き直す分の読み取りもかかる。ここでは
+
+    [prelude]                                   -- 必要なら件数などを同じ文で読む
+    OPTIONAL MATCH (u:User {id: $creator_id})   -- user_id 制約のインデックスで引く
+    CREATE (x:Label $props) SET x.created_at = ..., ...
+    FOREACH (... | CREATE (u)-[:CREATED]->(x))   -- ユーザーがいれば張る
+    RETURN x
+
+を 1 文・1 トランザクションで流す。ユーザーが見つからない場合もノードは作る
+（以前の MATCH が何も張らなかったのと同じ振る舞い）。
+"""
+from typing import Any, Callable, Dict, Optional, TypeVar
+from uuid import uuid4
+
+from fastapi import HTTPException
+
+T = TypeVar("T")
+
+
+async def create_owned(
+    session,
+    label: str,
+    properties: Dict[str, Any],
+    creator_id: str,
+    to_model: Callable[[Any], T],
+    computed: Optional[Dict[str, str]] = None,
+    prelude: str = "",
+    **params,
+) -> T:
+    """
+    label のノードを properties（None の項目は書かない）で作り、creator_id のユーザーから
+    CREATED を張って to_model(ノード) を返す。id / creator_id / created_at / updated_at は
+    ここで入れる。computed は {プロパティ: Cypher 式}（式の中の $名前 は params で渡す）。
+    prelude は CREATE の前に同じ文の中で流す句（1 行を返すもの）で、そこで付けた変数は
+    computed の式から使える（Store の位置を既存件数から決める、など）。
+    """
+    props = {k: v for k, v in properties.items() if v is not None}
+    props["id"] = str(uuid4())
+    props["creator_id"] = creator_id
+    assignments = ["x.created_at = datetime()", "x.updated_at = datetime()"]
+    assignments += [f"x.{name} = {expr}" for name, expr in (computed or {}).items()]
+    record = await session.write_one(
+        f"""
+        {prelude}
+        OPTIONAL MATCH (u:User {{id: $creator_id}})
+        WITH * LIMIT 1
+        CREATE (x:{label} $props)
+        SET {', '.join(assignments)}
+        FOREACH (_ IN CASE WHEN u IS NULL THEN [] ELSE [1] END | CREATE (u)-[:CREATED]->(x))
+        RETURN x
+        """,
+        props=props,
+        creator_id=creator_id,
+        **params,
+    )
+    if not record:
+        raise HTTPException(status_code=500, detail=f"Failed to create {label.lower()}.")
+    return to_model(record["x"])
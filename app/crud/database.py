@@ -1,28 +1,397 @@
-from neo4j import GraphDatabase
+from neo4j import AsyncGraphDatabase, READ_ACCESS, WRITE_ACCESS, Record, unit_of_work
+import hashlib
 import os
+import re
+import time
+from functools import lru_cache
+from typing import List, Optional, Tuple
 from dotenv import load_dotenv
 
+from app.core.metrics import Counter, Gauge, Summary
+
 load_dotenv()
 
+# これより遅い文は [db:slow] として出力する（ミリ秒、0 で無効）
+NEO4J_SLOW_QUERY_MS = float(os.getenv("NEO4J_SLOW_QUERY_MS", "200"))
+
+# ドライバのコネクションプール（値はドライバ既定に合わせている）
+NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "100"))
+NEO4J_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "60"))
+NEO4J_MAX_CONNECTION_LIFETIME = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600"))
+# 接続先のデータベース名。明示すると Aura でのホームDB解決の往復が要らなくなる
+# （空にするとサーバーの既定データベース）
+NEO4J_DATABASE = os.getenv("NEO4J_DATABASE", "neo4j") or None
+# 起動時に開いておく接続数（0 で温めない）
+NEO4J_WARM_CONNECTIONS = int(os.getenv("NEO4J_WARM_CONNECTIONS", "2"))
+
+# execute_read / execute_write（マネージドトランザクション）
+#   NEO4J_TX_TIMEOUT ......... 1 トランザクションのサーバー側タイムアウト秒
+#   NEO4J_TX_MAX_ATTEMPTS .... 一時的なエラーでやり直す回数の上限（初回を含む）
+#   NEO4J_TX_MAX_RETRY_TIME .. やり直しを続ける時間の上限秒（ドライバの設定）
+NEO4J_TX_TIMEOUT = float(os.getenv("NEO4J_TX_TIMEOUT", "15"))
+NEO4J_TX_MAX_ATTEMPTS = int(os.getenv("NEO4J_TX_MAX_ATTEMPTS", "5"))
+NEO4J_TX_MAX_RETRY_TIME = float(os.getenv("NEO4J_TX_MAX_RETRY_TIME", "10"))
+
+# 文ごとのメトリクス。ラベルは正規化した Cypher のハッシュ（fingerprint）で、
+# 本文は neo4j_query_info の query ラベルで引ける
+_query_info = Gauge(
+    "neo4j_query_info", "Normalized Cypher text for each query fingerprint.",
+    labelnames=("fingerprint", "query"),
+)
+_query_duration = Summary(
+    "neo4j_query_duration_seconds",
+    "Wall time from run() until the result was consumed.", labelnames=("fingerprint",),
+)
+_query_available_after = Summary(
+    "neo4j_query_result_available_after_seconds",
+    "Server time until the first record was available.", labelnames=("fingerprint",),
+)
+_query_consumed_after = Summary(
+    "neo4j_query_result_consumed_after_seconds",
+    "Server time until the result was fully consumed.", labelnames=("fingerprint",),
+)
+_query_rows = Counter(
+    "neo4j_query_rows_total", "Records returned to the application.", labelnames=("fingerprint",),
+)
+_query_errors = Counter(
+    "neo4j_query_errors_total", "Queries that raised an error.", labelnames=("fingerprint",),
+)
+_slow_queries = Counter(
+    "neo4j_slow_queries_total", "Queries slower than NEO4J_SLOW_QUERY_MS.", labelnames=("fingerprint",),
+)
+
+_transactions = Counter(
+    "neo4j_transactions_total", "Managed transactions by final outcome.",
+    labelnames=("mode", "outcome"),
+)
+_tx_retries = Counter(
+    "neo4j_transaction_retries_total",
+    "Managed transaction attempts after the first (transient errors).", labelnames=("mode",),
+)
+
+
+class TransactionRetriesExhausted(Exception):
+    """一時的なエラーが続き、NEO4J_TX_MAX_ATTEMPTS 回やり直しても成功しなかった。"""
+
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(query: str) -> Tuple[str, str]:
+    """
+    Cypher を (fingerprint, 正規化した本文) にする。空白を詰め、文字列・数値の
+    リテラルを ? に置き換えるので、値だけ違う文は同じ fingerprint になる。
+    """
+    normalized = _WHITESPACE.sub(" ", query).strip()
+    normalized = _STRING_LITERAL.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    fp = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+    _query_info.set(1, fingerprint=fp, query=normalized)
+    return fp, normalized
+
+
+class _InstrumentedResult:
+    """
+    AsyncResult の薄いラッパー。返した件数を数え、結果を読み切った時点
+    （または次の run / セッション終了時）にサマリからサーバー側の時間を記録する。
+    """
+
+    def __init__(self, result, query: str, started: float):
+        self._result = result
+        self._fp, self._query = fingerprint(query)
+        self._started = started
+        self._rows = 0
+        self._done = False
+
+    def __getattr__(self, name):
+        return getattr(self._result, name)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        try:
+            async for record in self._result:
+                self._rows += 1
+                yield record
+        except Exception:
+            self._error()
+            raise
+        await self._finish()
+
+    async def _call(self, coro, rows):
+        try:
+            value = await coro
+        except Exception:
+            self._error()
+            raise
+        self._rows += rows(value)
+        await self._finish()
+        return value
+
+    async def single(self, strict: bool = False):
+        return await self._call(self._result.single(strict=strict), lambda r: 0 if r is None else 1)
+
+    async def data(self, *keys):
+        return await self._call(self._result.data(*keys), len)
+
+    async def values(self, *keys):
+        return await self._call(self._result.values(*keys), len)
+
+    async def value(self, key=0, default=None):
+        return await self._call(self._result.value(key, default), len)
+
+    async def fetch(self, n: int):
+        try:
+            records = await self._result.fetch(n)
+        except Exception:
+            self._error()
+            raise
+        self._rows += len(records)
+        return records
+
+    async def consume(self):
+        try:
+            summary = await self._result.consume()
+        except Exception:
+            self._error()
+            raise
+        self._record(summary)
+        return summary
+
+    async def _finish(self) -> None:
+        if not self._done:
+            self._record(await self._result.consume())
+
+    def _error(self) -> None:
+        if not self._done:
+            self._done = True
+            _query_errors.inc(fingerprint=self._fp)
+
+    def _record(self, summary) -> None:
+        if self._done:
+            return
+        self._done = True
+        elapsed = time.perf_counter() - self._started
+        _query_duration.observe(elapsed, fingerprint=self._fp)
+        _query_rows.inc(self._rows, fingerprint=self._fp)
+        if summary is not None and summary.result_available_after is not None:
+            _query_available_after.observe(summary.result_available_after / 1000, fingerprint=self._fp)
+        if summary is not None and summary.result_consumed_after is not None:
+            _query_consumed_after.observe(summary.result_consumed_after / 1000, fingerprint=self._fp)
+        if NEO4J_SLOW_QUERY_MS and elapsed * 1000 >= NEO4J_SLOW_QUERY_MS:
+            _slow_queries.inc(fingerprint=self._fp)
+            print(f"[db:slow] {elapsed * 1000:.0f}ms rows={self._rows} fp={self._fp} {self._query[:300]}")
+
+
+class _Instrumented:
+    """run() を計測するラッパーの共通部分（セッション・トランザクション用）。"""
+
+    def __init__(self, target):
+        self._target = target
+        self._pending: List[_InstrumentedResult] = []
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+    async def _flush(self) -> None:
+        pending, self._pending = self._pending, []
+        for result in pending:
+            if result._done:
+                continue
+            try:
+                await result._finish()
+            except Exception:  # noqa: BLE001
+                result._error()
+
+    async def run(self, query, parameters=None, **kwargs):
+        # 前の結果はドライバが次の run で読み切るので、その前に記録しておく
+        await self._flush()
+        text = getattr(query, "text", query)
+        started = time.perf_counter()
+        try:
+            raw = await self._target.run(query, parameters, **kwargs)
+        except Exception:
+            _query_errors.inc(fingerprint=fingerprint(text)[0])
+            raise
+        result = _InstrumentedResult(raw, text, started)
+        self._pending.append(result)
+        return result
+
+
+class _InstrumentedTransaction(_Instrumented):
+    """execute_read / execute_write の作業関数に渡すトランザクション。"""
+
+
+async def _fetch_all(tx, query, parameters, kwparameters):
+    result = await tx.run(query, parameters, **kwparameters)
+    return [record async for record in result]
+
+
+async def _fetch_one(tx, query, parameters, kwparameters):
+    result = await tx.run(query, parameters, **kwparameters)
+    return await result.single()
+
+
+class _InstrumentedSession(_Instrumented):
+    """
+    AsyncSession のラッパー。run() を計測し、execute_read / execute_write を
+    タイムアウト・試行回数の上限・リトライ数のメトリクス付きで提供する。
+    それ以外はそのまま委譲する。
+    """
+
+    async def __aenter__(self):
+        await self._target.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # 読まれなかった結果（書き込みだけの文など）もここでサマリを取って記録する
+        await self._flush()
+        return await self._target.__aexit__(exc_type, exc, tb)
+
+    async def close(self):
+        await self._flush()
+        await self._target.close()
+
+    async def _execute(self, mode: str, work, args, kwargs):
+        attempts = 0
+
+        @unit_of_work(timeout=NEO4J_TX_TIMEOUT)
+        async def _work(tx):
+            nonlocal attempts
+            attempts += 1
+            if attempts > NEO4J_TX_MAX_ATTEMPTS:
+                raise TransactionRetriesExhausted(
+                    f"{mode} transaction failed {NEO4J_TX_MAX_ATTEMPTS} times"
+                )
+            if attempts > 1:
+                _tx_retries.inc(mode=mode)
+            itx = _InstrumentedTransaction(tx)
+            try:
+                return await work(itx, *args, **kwargs)
+            finally:
+                await itx._flush()
+
+        runner = self._target.execute_read if mode == "read" else self._target.execute_write
+        try:
+            value = await runner(_work)
+        except Exception:
+            _transactions.inc(mode=mode, outcome="error")
+            raise
+        _transactions.inc(mode=mode, outcome="committed")
+        return value
+
+    async def execute_read(self, work, *args, **kwargs):
+        """
+        work(tx, *args, **kwargs) を読み取りトランザクションで実行する。一時的なエラー
+        （リーダー交代・デッドロック等）ならドライバがジッタ付きの指数バックオフで
+        work ごとやり直すので、work は副作用を DB 以外に持たないこと。
+        """
+        return await self._execute("read", work, args, kwargs)
+
+    async def execute_write(self, work, *args, **kwargs):
+        """execute_read の書き込み版。"""
+        return await self._execute("write", work, args, kwargs)
+
+    # 1 文だけのトランザクション用の近道（結果はコミット前に読み切る）
+    async def read(self, query, parameters=None, **kwparameters) -> List[Record]:
+        return await self.execute_read(_fetch_all, query, parameters, kwparameters)
+
+    async def read_one(self, query, parameters=None, **kwparameters) -> Optional[Record]:
+        return await self.execute_read(_fetch_one, query, parameters, kwparameters)
+
+    async def write(self, query, parameters=None, **kwparameters) -> List[Record]:
+        return await self.execute_write(_fetch_all, query, parameters, kwparameters)
+
+    async def write_one(self, query, parameters=None, **kwparameters) -> Optional[Record]:
+        return await self.execute_write(_fetch_one, query, parameters, kwparameters)
+
 
 class Neo4jDatabase:
+    """
+    AsyncGraphDatabase ベースの接続。CRUD は読み取りなら `async with db.read_session()`、
+    書き込みを含むなら `async with db.write_session()` でセッションを開く。
+    1 文なら `session.read(...)` / `session.write(...)`（1 件なら `*_one`）、
+    複数文をまとめるなら `session.execute_write(work, ...)` で問い合わせる。
+    どれもマネージドトランザクションなので、一時的なエラーは自動でやり直される。
+    読み取りはクラスタのセカンダリに振り分けられる。イベントループをブロックしないので、DB 待ちのリクエストが並行して進める。
+    セッションは計測用のラッパーで包まれ、文ごとの時間・件数が /metrics に出る。
+
+    全セッションがプロセス共通のブックマークマネージャを使うので、書き込みの
+    直後の読み取り（投稿・予約を作ってすぐ一覧を見る等）にもその書き込みが見える。
+
+    アプリでは起動時に start()（接続確認と接続の作り置き）、終了時に close() を呼ぶ。
+    スクリプトなどで start() を呼ばなくても、最初のセッションを開くときに接続する。
+    """
+
     def __init__(self):
         self.uri = os.getenv("NEO4J_URI", "bolt://neo4j:7687")
         self.user = os.getenv("NEO4J_USER", "neo4j")
         self.password = os.getenv("NEO4J_PASSWORD", "docker")
+        self.database = NEO4J_DATABASE
         self.driver = None
+        self.bookmarks = None
 
     def connect(self):
-        self.driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password))
+        self.driver = AsyncGraphDatabase.driver(
+            self.uri,
+            auth=(self.user, self.password),
+            max_connection_pool_size=NEO4J_MAX_POOL_SIZE,
+            connection_acquisition_timeout=NEO4J_ACQUISITION_TIMEOUT,
+            max_connection_lifetime=NEO4J_MAX_CONNECTION_LIFETIME,
+            max_transaction_retry_time=NEO4J_TX_MAX_RETRY_TIME,
+        )
+        self.bookmarks = AsyncGraphDatabase.bookmark_manager()
+
+    async def start(self, warm_connections: int = NEO4J_WARM_CONNECTIONS) -> None:
+        """
+        ドライバを作って接続を確認し、warm_connections 本の接続をプールに用意する。
+        TLS・ルーティング表の取得・接続確立を、最初のリクエストではなく起動時に済ませる。
+        """
+        if not self.driver:
+            self.connect()
+        await self.driver.verify_connectivity()
+        # 結果を読み切らずにおくとセッションが接続を握ったままになるので、
+        # 全部開いてから閉じれば別々の接続がプールに残る
+        sessions = [
+            self.driver.session(database=self.database)
+            for _ in range(max(warm_connections, 0))
+        ]
+        try:
+            results = [await s.run("RETURN 1") for s in sessions]
+            for result in results:
+                await result.consume()
+        finally:
+            for s in sessions:
+                await s.close()
 
-    def close(self):
+    async def close(self):
         if self.driver:
-            self.driver.close()
+            await self.driver.close()
+            self.driver = None
 
-    def get_session(self):
+    def _session(self, access_mode: str):
         if not self.driver:
             self.connect()
-        return self.driver.session()
+        return _InstrumentedSession(
+            self.driver.session(
+                database=self.database,
+                default_access_mode=access_mode,
+                bookmark_manager=self.bookmarks,
+            )
+        )
+
+    def read_session(self):
+        return self._session(READ_ACCESS)
+
+    def write_session(self):
+        return self._session(WRITE_ACCESS)
+
+    # 読み書きを区別しない既存スクリプト向け（書き込みとして開く）
+    get_session = write_session
 
 
 db = Neo4jDatabase()
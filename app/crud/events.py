@@ -1,148 +1,82 @@
 from app.crud.database import db
-from typing import Optional, List
-from fastapi import HTTPException, status
+from app.crud.pagination import fetch_page
+from app.crud.creation import create_owned
+from app.crud.versions import MARK_DELETED, content_changed
+from app.crud.suggest import index_listing, unindex_listing
+from typing import Optional, List, Tuple
 from app.models import Event, EventCreate, EventUpdate
-from uuid import uuid4
 
 
 class EventCRUD:
     @staticmethod
     async def create(event: EventCreate, creator_id: str) -> Event:
         """
-        Create a new event and link it to the creator user.
+        Create a new event and link it to the creator user in one statement.
         """
-        with db.get_session() as session:
-            # Generate event ID
-            event_id = str(uuid4())
-
-            # Create event in database
-            create_result = session.run(
-                """
-                CREATE (e:Event {
-                    id: $id,
-                    title: $title,
-                    description: $description,
-                    contactEmail: $contactEmail,
-                    contactPhone: $contactPhone,
-                    eventDate: $eventDate,
-                    eventTime: $eventTime,
-                    venue: $venue,
-                    organizer: $organizer,
-                    maxAttendees: $maxAttendees,
-                    creator_id: $creator_id,
-                    current_attendees: 0,
-                    status: 'upcoming',
-                    created_at: datetime(),
-                    updated_at: datetime()
-                })
-                RETURN e
-                """,
-                id=event_id,
-                title=event.title,
-                description=event.description,
-                contactEmail=event.contactEmail,
-                contactPhone=event.contactPhone,
-                eventDate=event.eventDate,
-                eventTime=event.eventTime,
-                venue=event.venue,
-                organizer=event.organizer,
-                maxAttendees=event.maxAttendees,
-                creator_id=creator_id,
-            )
-            record = create_result.single()
-            if not record:
-                raise HTTPException(status_code=500, detail="Failed to create event.")
-
-            # Create relationship between user and event
-            session.run(
-                """
-                MATCH (u:User {id: $user_id}), (e:Event {id: $event_id})
-                CREATE (u)-[:CREATED]->(e)
-                """,
-                user_id=creator_id,
-                event_id=event_id,
-            )
-
-            # Return created event
-            event_data = record["e"]
-            return Event(
-                id=event_data["id"],
-                title=event_data["title"],
-                description=event_data["description"],
-                contactEmail=event_data["contactEmail"],
-                contactPhone=event_data.get("contactPhone"),
-                eventDate=event_data["eventDate"],
-                eventTime=event_data["eventTime"],
-                venue=event_data["venue"],
-                organizer=event_data["organizer"],
-                maxAttendees=event_data.get("maxAttendees"),
-                creator_id=event_data["creator_id"],
-                current_attendees=event_data["current_attendees"],
-                status=event_data["status"],
-                created_at=event_data["created_at"].isoformat(),
-                updated_at=event_data["updated_at"].isoformat() if event_data.get("updated_at") else None,
+        async with db.write_session() as session:
+            created = await create_owned(
+                session, "Event",
+                {
+                    "title": event.title,
+                    "description": event.description,
+                    "contactEmail": event.contactEmail,
+                    "contactPhone": event.contactPhone,
+                    "eventDate": event.eventDate,
+                    "eventTime": event.eventTime,
+                    "venue": event.venue,
+                    "organizer": event.organizer,
+                    "maxAttendees": event.maxAttendees,
+                    "current_attendees": 0,
+                    "status": "upcoming",
+                },
+                creator_id, _row_to_event,
             )
+        content_changed("events")
+        index_listing("events", created)
+        return created
 
     @staticmethod
-    async def get_all() -> List[Event]:
+    async def get_all(
+        status: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Event], Optional[str]]:
         """
-        Retrieve all events from the database.
+        Retrieve events, newest first, one keyset page at a time.
+        date_from / date_to filter on eventDate (YYYY-MM-DD, inclusive).
+        Returns the events and the cursor of the next page (None at the end).
         """
-        with db.get_session() as session:
-            result = session.run("MATCH (e:Event) RETURN e ORDER BY e.created_at DESC")
-            events = []
-            for record in result:
-                event_data = record["e"]
-                events.append(
-                    Event(
-                        id=event_data["id"],
-                        title=event_data["title"],
-                        description=event_data["description"],
-                        contactEmail=event_data["contactEmail"],
-                        contactPhone=event_data.get("contactPhone"),
-                        eventDate=event_data["eventDate"],
-                        eventTime=event_data["eventTime"],
-                        venue=event_data["venue"],
-                        organizer=event_data["organizer"],
-                        maxAttendees=event_data.get("maxAttendees"),
-                        creator_id=event_data["creator_id"],
-                        current_attendees=event_data["current_attendees"],
-                        status=event_data["status"],
-                        created_at=event_data["created_at"].isoformat(),
-                        updated_at=event_data["updated_at"].isoformat() if event_data.get("updated_at") else None,
-                    )
-                )
-            return events
+        filters, params = [], {}
+        if status is not None:
+            filters.append("e.status = $status")
+            params["status"] = status
+        if date_from is not None:
+            filters.append("e.eventDate >= $date_from")
+            params["date_from"] = date_from
+        if date_to is not None:
+            filters.append("e.eventDate <= $date_to")
+            params["date_to"] = date_to
+
+        async with db.read_session() as session:
+            records, next_cursor = await fetch_page(
+                session, "MATCH (e:Event)", "e",
+                filters=filters, params=params, limit=limit, cursor=cursor,
+            )
+            return [_row_to_event(r["e"]) for r in records], next_cursor
 
     @staticmethod
     async def get_by_id(event_id: str) -> Optional[Event]:
         """
         Retrieve an event by its ID.
         """
-        with db.get_session() as session:
-            result = session.run(
+        async with db.read_session() as session:
+            record = await session.read_one(
                 "MATCH (e:Event {id: $id}) RETURN e", id=event_id
             )
-            record = result.single()
             if record:
-                event_data = record["e"]
-                return Event(
-                    id=event_data["id"],
-                    title=event_data["title"],
-                    description=event_data["description"],
-                    contactEmail=event_data["contactEmail"],
-                    contactPhone=event_data.get("contactPhone"),
-                    eventDate=event_data["eventDate"],
-                    eventTime=event_data["eventTime"],
-                    venue=event_data["venue"],
-                    organizer=event_data["organizer"],
-                    maxAttendees=event_data.get("maxAttendees"),
-                    creator_id=event_data["creator_id"],
-                    current_attendees=event_data["current_attendees"],
-                    status=event_data["status"],
-                    created_at=event_data["created_at"].isoformat(),
-                    updated_at=event_data["updated_at"].isoformat() if event_data.get("updated_at") else None,
-                )
+                return _row_to_event(record["e"])
             return None
 
     @staticmethod
@@ -150,7 +84,7 @@ class EventCRUD:
         """
         Update event details by ID.
         """
-        with db.get_session() as session:
+        async with db.write_session() as session:
             # Build update query dynamically based on provided fields
             update_fields = []
             params = {"id": event_id}
@@ -197,28 +131,13 @@ class EventCRUD:
                 RETURN e
             """
 
-            result = session.run(update_query, **params)
-            record = result.single()
+            record = await session.write_one(update_query, **params)
 
             if record:
-                event_data = record["e"]
-                return Event(
-                    id=event_data["id"],
-                    title=event_data["title"],
-                    description=event_data["description"],
-                    contactEmail=event_data["contactEmail"],
-                    contactPhone=event_data.get("contactPhone"),
-                    eventDate=event_data["eventDate"],
-                    eventTime=event_data["eventTime"],
-                    venue=event_data["venue"],
-                    organizer=event_data["organizer"],
-                    maxAttendees=event_data.get("maxAttendees"),
-                    creator_id=event_data["creator_id"],
-                    current_attendees=event_data["current_attendees"],
-                    status=event_data["status"],
-                    created_at=event_data["created_at"].isoformat(),
-                    updated_at=event_data["updated_at"].isoformat() if event_data.get("updated_at") else None,
-                )
+                content_changed("events")
+                updated = _row_to_event(record["e"])
+                index_listing("events", updated)
+                return updated
             return None
 
     @staticmethod
@@ -226,12 +145,40 @@ class EventCRUD:
         """
         Delete an event by ID.
         """
-        with db.get_session() as session:
-            result = session.run(
+        async with db.write_session() as session:
+            record = await session.write_one(
                 """
-                MATCH (e:Event {id: $id})
+                OPTIONAL MATCH (e:Event {id: $id})
+                WITH e, e IS NOT NULL AS found
                 DETACH DELETE e
+                WITH found WHERE found
+                """ + MARK_DELETED + """
+                RETURN count(*) AS deleted
                 """,
-                id=event_id
+                id=event_id,
+                resource="events",
             )
-            return bool(result.summary().counters.nodes_deleted)
\ No newline at end of file
+            if record["deleted"]:
+                content_changed("events")
+                unindex_listing("events", event_id)
+            return bool(record["deleted"])
+
+
+def _row_to_event(event_data) -> Event:
+    return Event(
+        id=event_data["id"],
+        title=event_data["title"],
+        description=event_data["description"],
+        contactEmail=event_data["contactEmail"],
+        contactPhone=event_data.get("contactPhone"),
+        eventDate=event_data["eventDate"],
+        eventTime=event_data["eventTime"],
+        venue=event_data["venue"],
+        organizer=event_data["organizer"],
+        maxAttendees=event_data.get("maxAttendees"),
+        creator_id=event_data["creator_id"],
+        current_attendees=event_data["current_attendees"],
+        status=event_data["status"],
+        created_at=event_data["created_at"].isoformat(),
+        updated_at=event_data["updated_at"].isoformat() if event_data.get("updated_at") else None,
+    )
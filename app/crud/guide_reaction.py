@@ -1,7 +1,93 @@
+import os
+from typing import Dict, List, Tuple
+
+from app.core.cache import TTLCache
+from app.core.metrics import Counter
 from app.crud.database import db
+from app.crud.write_behind import CounterBuffer, Deltas, rows
 from fastapi import HTTPException
 from app.models.guide_reaction import GuideReactionState, ALLOWED_TYPES
 
+# 票はメモリにためて、この秒数ごと、またはこの票数がたまったらまとめて書き込む
+GUIDE_REACTION_FLUSH_INTERVAL = float(os.getenv("GUIDE_REACTION_FLUSH_INTERVAL", "2"))
+GUIDE_REACTION_FLUSH_SIZE = int(os.getenv("GUIDE_REACTION_FLUSH_SIZE", "500"))
+# DB に反映済みのカウントを slug ごとにこの秒数だけ覚えておく（未反映の票は別途足す）
+GUIDE_REACTION_CACHE_TTL = float(os.getenv("GUIDE_REACTION_CACHE_TTL", "5"))
+# 一覧取得で 1 回に指定できる slug の上限
+GUIDE_REACTION_BATCH_MAX = 100
+
+_counts_cache = TTLCache(maxsize=4096, ttl=GUIDE_REACTION_CACHE_TTL)
+# flush のたびに進める。読み取り中に flush が始まった・終わった結果はキャッシュしない
+# （flush の commit 前に読んだ値を、flush が増分を手放した後に保存してしまうため）
+_flush_generation = 0
+_cache_hits = Counter("guide_reaction_cache_hits_total", "Guide reaction count cache hits (per slug).")
+_cache_misses = Counter("guide_reaction_cache_misses_total", "Guide reaction count cache misses (per slug).")
+
+
+async def _write_deltas(batch: Deltas) -> None:
+    global _flush_generation
+    _flush_generation += 1
+    async with db.write_session() as session:
+        await session.write(
+            """
+            UNWIND $rows AS r
+            MERGE (g:GuideReaction {slug: r.slug})
+            ON CREATE SET g.good = 0, g.bad = 0
+            SET g.good = coalesce(g.good, 0) + r.good,
+                g.bad = coalesce(g.bad, 0) + r.bad
+            """,
+            rows=rows(batch, ALLOWED_TYPES, key_name="slug"),
+        )
+    # 書き込んだ slug は次の読み取りで DB から取り直す
+    _flush_generation += 1
+    for slug in batch:
+        _counts_cache.pop(slug)
+
+
+reaction_buffer = CounterBuffer(
+    "guide_reactions", _write_deltas,
+    interval=GUIDE_REACTION_FLUSH_INTERVAL, max_pending=GUIDE_REACTION_FLUSH_SIZE,
+)
+
+
+async def _stored_counts(slugs: List[str]) -> Dict[str, Tuple[int, int]]:
+    """DB に反映済みの (good, bad)。キャッシュに無い slug だけ 1 回の UNWIND で引く。"""
+    out, missing = {}, []
+    for slug in slugs:
+        cached = _counts_cache.get(slug)
+        if cached is None:
+            missing.append(slug)
+        else:
+            out[slug] = cached
+    _cache_hits.inc(len(out))
+    if not missing:
+        return out
+    _cache_misses.inc(len(missing))
+    generation = _flush_generation
+    async with db.read_session() as session:
+        records = await session.read(
+            """
+            UNWIND $slugs AS slug
+            OPTIONAL MATCH (g:GuideReaction {slug: slug})
+            RETURN slug, coalesce(g.good, 0) AS good, coalesce(g.bad, 0) AS bad
+            """,
+            slugs=missing,
+        )
+    cacheable = generation == _flush_generation
+    for r in records:
+        counts = (r["good"], r["bad"])
+        if cacheable:
+            _counts_cache.set(r["slug"], counts)
+        out[r["slug"]] = counts
+    return out
+
+
+def _with_pending(slug: str, good: int, bad: int) -> GuideReactionState:
+    pending = reaction_buffer.pending(slug)
+    return GuideReactionState(
+        slug=slug, good=good + pending.get("good", 0), bad=bad + pending.get("bad", 0)
+    )
+
 
 class GuideReactionCRUD:
     """ガイド記事(slug)ごとの good/bad カウント。匿名・累計のみ。"""
@@ -11,17 +97,21 @@ class GuideReactionCRUD:
         slug = (slug or "").strip()
         if not slug:
             raise HTTPException(status_code=400, detail="slug is required.")
-        with db.get_session() as session:
-            rec = session.run(
-                """
-                MATCH (g:GuideReaction {slug: $slug})
-                RETURN coalesce(g.good, 0) AS good, coalesce(g.bad, 0) AS bad
-                """,
-                slug=slug,
-            ).single()
-            if not rec:
-                return GuideReactionState(slug=slug, good=0, bad=0)
-            return GuideReactionState(slug=slug, good=rec["good"], bad=rec["bad"])
+        return (await GuideReactionCRUD.get_counts_many([slug]))[0]
+
+    @staticmethod
+    async def get_counts_many(slugs: List[str]) -> List[GuideReactionState]:
+        """複数記事のカウントを指定順で返す（重複・空は除く）。"""
+        wanted = list(dict.fromkeys(s.strip() for s in slugs if s and s.strip()))
+        if not wanted:
+            raise HTTPException(status_code=400, detail="slugs is required.")
+        if len(wanted) > GUIDE_REACTION_BATCH_MAX:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {GUIDE_REACTION_BATCH_MAX} slugs per request.",
+            )
+        stored = await _stored_counts(wanted)
+        return [_with_pending(slug, *stored.get(slug, (0, 0))) for slug in wanted]
 
     @staticmethod
     async def react(slug: str, rtype: str) -> GuideReactionState:
@@ -30,17 +120,6 @@ class GuideReactionCRUD:
             raise HTTPException(status_code=400, detail="slug is required.")
         if rtype not in ALLOWED_TYPES:
             raise HTTPException(status_code=400, detail="type must be 'good' or 'bad'.")
-        field = "good" if rtype == "good" else "bad"
-        with db.get_session() as session:
-            rec = session.run(
-                f"""
-                MERGE (g:GuideReaction {{slug: $slug}})
-                ON CREATE SET g.good = 0, g.bad = 0
-                SET g.{field} = coalesce(g.{field}, 0) + 1
-                RETURN coalesce(g.good, 0) AS good, coalesce(g.bad, 0) AS bad
-                """,
-                slug=slug,
-            ).single()
-            if not rec:
-                raise HTTPException(status_code=500, detail="Failed to record reaction.")
-            return GuideReactionState(slug=slug, good=rec["good"], bad=rec["bad"])
+        # 書き込みはバッファ経由（reaction_buffer が間隔/件数ごとにまとめて反映する）
+        await reaction_buffer.add(slug, rtype)
+        return await GuideReactionCRUD.get_counts(slug)
@@ -1,112 +1,80 @@
 from app.crud.database import db
-from fastapi import HTTPException
+from app.crud.pagination import fetch_page
+from app.crud.creation import create_owned
+from app.crud.versions import content_changed
+from app.crud.suggest import index_listing
 from app.models.job import Job, JobCreate
-from typing import List
-from uuid import uuid4
+from typing import List, Optional, Tuple
 
 
 class JobCRUD:
     @staticmethod
     async def create(job: JobCreate, creator_id: str) -> Job:
         """
-        Create a new job and link it to the creator user.
+        Create a new job and link it to the creator user in one statement.
         """
-        with db.get_session() as session:
-            # Generate job ID
-            job_id = str(uuid4())
-
-            # Create job in database
-            create_result = session.run(
-                """
-                CREATE (j:Job {
-                    id: $id,
-                    title: $title,
-                    description: $description,
-                    contactEmail: $contactEmail,
-                    contactPhone: $contactPhone,
-                    company: $company,
-                    salary: $salary,
-                    location: $location,
-                    jobType: $jobType,
-                    requirements: $requirements,
-                    creator_id: $creator_id,
-                    status: 'open',
-                    created_at: datetime(),
-                    updated_at: datetime()
-                })
-                RETURN j
-                """,
-                id=job_id,
-                title=job.title,
-                description=job.description,
-                contactEmail=job.contactEmail,
-                contactPhone=job.contactPhone,
-                company=job.company,
-                salary=job.salary,
-                location=job.location,
-                jobType=job.jobType,
-                requirements=job.requirements,
-                creator_id=creator_id,
-            )
-            record = create_result.single()
-            if not record:
-                raise HTTPException(status_code=500, detail="Failed to create job.")
-
-            # Create relationship between user and job
-            session.run(
-                """
-                MATCH (u:User {id: $user_id}), (j:Job {id: $job_id})
-                CREATE (u)-[:CREATED]->(j)
-                """,
-                user_id=creator_id,
-                job_id=job_id,
-            )
-
-            # Return created job
-            job_data = record["j"]
-            return Job(
-                id=job_data["id"],
-                title=job_data["title"],
-                description=job_data["description"],
-                contactEmail=job_data["contactEmail"],
-                contactPhone=job_data.get("contactPhone"),
-                company=job_data["company"],
-                salary=job_data["salary"],
-                location=job_data["location"],
-                jobType=job_data["jobType"],
-                requirements=job_data.get("requirements"),
-                creator_id=job_data["creator_id"],
-                status=job_data["status"],
-                created_at=job_data["created_at"].isoformat(),
-                updated_at=job_data["updated_at"].isoformat() if job_data.get("updated_at") else None,
+        async with db.write_session() as session:
+            created = await create_owned(
+                session, "Job",
+                {
+                    "title": job.title,
+                    "description": job.description,
+                    "contactEmail": job.contactEmail,
+                    "contactPhone": job.contactPhone,
+                    "company": job.company,
+                    "salary": job.salary,
+                    "location": job.location,
+                    "jobType": job.jobType,
+                    "requirements": job.requirements,
+                    "status": "open",
+                },
+                creator_id, _row_to_job,
             )
+        content_changed("jobs")
+        index_listing("jobs", created)
+        return created
 
     @staticmethod
-    async def get_all() -> List[Job]:
+    async def get_all(
+        job_type: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Job], Optional[str]]:
         """
-        Retrieve all jobs from the database.
+        Retrieve jobs, newest first, one keyset page at a time.
+        Returns the jobs and the cursor of the next page (None at the end).
         """
-        with db.get_session() as session:
-            result = session.run("MATCH (j:Job) RETURN j ORDER BY j.created_at DESC")
-            jobs = []
-            for record in result:
-                job_data = record["j"]
-                jobs.append(
-                    Job(
-                        id=job_data["id"],
-                        title=job_data["title"],
-                        description=job_data["description"],
-                        contactEmail=job_data["contactEmail"],
-                        contactPhone=job_data.get("contactPhone"),
-                        company=job_data["company"],
-                        salary=job_data["salary"],
-                        location=job_data["location"],
-                        jobType=job_data["jobType"],
-                        requirements=job_data.get("requirements"),
-                        creator_id=job_data["creator_id"],
-                        status=job_data["status"],
-                        created_at=job_data["created_at"].isoformat(),
-                        updated_at=job_data["updated_at"].isoformat() if job_data.get("updated_at") else None,
-                    )
-                )
-            return jobs
\ No newline at end of file
+        filters, params = [], {}
+        if job_type is not None:
+            filters.append("j.jobType = $jobType")
+            params["jobType"] = job_type
+        if status is not None:
+            filters.append("j.status = $status")
+            params["status"] = status
+
+        async with db.read_session() as session:
+            records, next_cursor = await fetch_page(
+                session, "MATCH (j:Job)", "j",
+                filters=filters, params=params, limit=limit, cursor=cursor,
+            )
+            return [_row_to_job(r["j"]) for r in records], next_cursor
+
+
+def _row_to_job(job_data) -> Job:
+    return Job(
+        id=job_data["id"],
+        title=job_data["title"],
+        description=job_data["description"],
+        contactEmail=job_data["contactEmail"],
+        contactPhone=job_data.get("contactPhone"),
+        company=job_data["company"],
+        salary=job_data["salary"],
+        location=job_data["location"],
+        jobType=job_data["jobType"],
+        requirements=job_data.get("requirements"),
+        creator_id=job_data["creator_id"],
+        status=job_data["status"],
+        created_at=job_data["created_at"].isoformat(),
+        updated_at=job_data["updated_at"].isoformat() if job_data.get("updated_at") else None,
+    )
@@ -1,8 +1,12 @@
+from app.core.singleflight import single_flight
 from app.crud.database import db
-from fastapi import HTTPException
-from app.models.news import News, NewsCreate
-from typing import List, Optional
-from uuid import uuid4
+from app.crud.pagination import fetch_page, map_projection, publish_sort_at
+from app.crud.creation import create_owned
+from app.crud.sort_at import sort_at_complete
+from app.crud.versions import content_changed
+from app.crud.projection import to_json_values
+from app.models.news import News, NewsCreate, NewsSummary
+from typing import Any, Dict, List, Optional, Tuple
 
 
 def _row_to_news(news_data) -> News:
@@ -27,68 +31,109 @@ def _row_to_news(news_data) -> News:
     )
 
 
+# 一覧（サマリ）で読むプロパティ。本文の content は読まない
+_SUMMARY_FIELDS = (
+    "title", "excerpt", "category", "image", "author", "tags",
+    "publishDate", "status", "created_at",
+)
+
+
+def _row_to_summary(data) -> NewsSummary:
+    return NewsSummary(**{**to_json_values(dict(data)), "status": data.get("status") or "published"})
+
+
 class NewsCRUD:
     @staticmethod
     async def create(news: NewsCreate, creator_id: str) -> News:
-        with db.get_session() as session:
-            news_id = str(uuid4())
-            result = session.run(
-                """
-                CREATE (n:News {
-                    id: $id,
-                    title: $title,
-                    content: $content,
-                    excerpt: $excerpt,
-                    category: $category,
-                    image: $image,
-                    author: $author,
-                    tags: $tags,
-                    publishDate: $publishDate,
-                    creator_id: $creator_id,
-                    status: 'published',
-                    created_at: datetime(),
-                    updated_at: datetime()
-                })
-                RETURN n
-                """,
-                id=news_id,
-                title=news.title,
-                content=news.content,
-                excerpt=news.excerpt,
-                category=news.category,
-                image=news.image,
-                author=news.author,
-                tags=news.tags,
-                publishDate=news.publishDate,
-                creator_id=creator_id,
+        async with db.write_session() as session:
+            created = await create_owned(
+                session, "News",
+                {
+                    "title": news.title,
+                    "content": news.content,
+                    "excerpt": news.excerpt,
+                    "category": news.category,
+                    "image": news.image,
+                    "author": news.author,
+                    "tags": news.tags,
+                    "publishDate": news.publishDate,
+                    "status": "published",
+                },
+                creator_id, _row_to_news,
+                computed={"sort_at": "coalesce(datetime($sort_at), datetime())"},
+                sort_at=publish_sort_at(news.publishDate),
             )
-            record = result.single()
-            if not record:
-                raise HTTPException(status_code=500, detail="Failed to create news.")
+        content_changed("news")
+        return created
 
-            session.run(
-                """
-                MATCH (u:User {id: $user_id}), (n:News {id: $news_id})
-                CREATE (u)-[:CREATED]->(n)
-                """,
-                user_id=creator_id,
-                news_id=news_id,
-            )
-            return _row_to_news(record["n"])
+    @staticmethod
+    async def get_all(
+        category: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[News], Optional[str]]:
+        rows, next_cursor = await NewsCRUD._page(category, status, limit, cursor)
+        return [_row_to_news(row) for row in rows], next_cursor
 
     @staticmethod
-    async def get_all() -> List[News]:
-        with db.get_session() as session:
-            result = session.run(
-                "MATCH (n:News) RETURN n ORDER BY coalesce(n.publishDate, toString(n.created_at)) DESC"
+    async def get_summaries(
+        category: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[NewsSummary], Optional[str]]:
+        """get_all と同じ並び・絞り込みで、一覧表示に要るプロパティだけを読む。"""
+        rows, next_cursor = await NewsCRUD._page(
+            category, status, limit, cursor, projection=_SUMMARY_FIELDS
+        )
+        return [_row_to_summary(row) for row in rows], next_cursor
+
+    @staticmethod
+    async def _page(
+        category: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        projection: Tuple[str, ...] = (),
+    ) -> Tuple[List[Any], Optional[str]]:
+        filters, params = [], {}
+        if category is not None:
+            filters.append("n.category = $category")
+            params["category"] = category
+        if status is not None:
+            filters.append("n.status = $status")
+            params["status"] = status
+        async with db.read_session() as session:
+            if await sort_at_complete(session, "News"):
+                # sort_at のインデックスを順に読んで LIMIT で止められるよう、NULL を除く条件を付ける
+                filters.append("n.sort_at IS NOT NULL")
+                sort_key = "n.sort_at"
+            else:
+                # v5 の埋め戻しがまだなら、インデックスは使えないが行を落とさずに並べる
+                sort_key = "coalesce(n.sort_at, n.created_at)"
+            records, next_cursor = await fetch_page(
+                session, "MATCH (n:News)", "n",
+                filters=filters, params=params, limit=limit, cursor=cursor,
+                sort_key=sort_key, projection=projection,
             )
-            return [_row_to_news(r["n"]) for r in result]
+            return [r["n"] for r in records], next_cursor
 
     @staticmethod
+    @single_flight("news.get_by_id")
     async def get_by_id(news_id: str) -> Optional[News]:
-        with db.get_session() as session:
-            result = session.run(
+        async with db.read_session() as session:
+            record = await session.read_one(
                 "MATCH (n:News {id: $id}) RETURN n", id=news_id
             )
-            record = result.single()
             return _row_to_news(record["n"]) if record else None
+
+    @staticmethod
+    async def get_fields(news_id: str, fields: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        """?fields= 用。指定したプロパティだけを読む（fields は parse_fields 済みのもの）。"""
+        async with db.read_session() as session:
+            record = await session.read_one(
+                f"MATCH (n:News {{id: $id}}) RETURN {map_projection('n', fields)} AS n",
+                id=news_id,
+            )
+            return to_json_values(dict(record["n"])) if record else None
@@ -0,0 +1,172 @@
+from app.crud.database import db
+from app.crud.pagination import fetch_page
+from fastapi import HTTPException
+from app.models.outbox import OutboxMessage, OutboxStats, OUTBOX_STATUSES
+from typing import List, Optional, Tuple
+from uuid import uuid4
+
+# 送信可能なメッセージの条件。sending のまま lease を過ぎたもの（送信中に
+# プロセスが落ちた等）も再び拾う。
+_DUE = (
+    "((m.status = 'pending' AND m.next_attempt_at <= datetime()) OR "
+    "(m.status = 'sending' AND m.claimed_at < datetime() - duration({seconds: $lease})))"
+)
+
+
+def _iso(dt) -> Optional[str]:
+    return dt.isoformat() if dt is not None else None
+
+
+def _row_to_message(m) -> OutboxMessage:
+    return OutboxMessage(
+        id=m["id"],
+        to=list(m.get("to") or []),
+        subject=m["subject"],
+        reply_to=m.get("reply_to"),
+        status=m["status"],
+        attempts=m.get("attempts") or 0,
+        last_error=m.get("last_error"),
+        created_at=m["created_at"].isoformat(),
+        next_attempt_at=_iso(m.get("next_attempt_at")),
+        sent_at=_iso(m.get("sent_at")),
+    )
+
+
+class OutboxCRUD:
+    """送信待ちメール (:OutboxMessage) の永続化。送信自体は app.core.outbox が行う。"""
+
+    @staticmethod
+    async def enqueue(
+        to: List[str], subject: str, body: str, reply_to: Optional[str] = None
+    ) -> str:
+        async with db.write_session() as session:
+            message_id = str(uuid4())
+            rec = await session.write_one(
+                """
+                CREATE (m:OutboxMessage {
+                    id: $id, to: $to, subject: $subject, body: $body, reply_to: $reply_to,
+                    status: 'pending', attempts: 0,
+                    created_at: datetime(), next_attempt_at: datetime()
+                })
+                RETURN m.id AS id
+                """,
+                id=message_id, to=to, subject=subject, body=body, reply_to=reply_to,
+            )
+            if not rec:
+                raise HTTPException(status_code=500, detail="Failed to queue email.")
+            return message_id
+
+    @staticmethod
+    async def claim_next(lease_seconds: int):
+        """
+        送信期限の来たメッセージを 1 件 sending にして返す（無ければ None）。
+        先に書き込みロックを取ってから条件を読み直すので、複数ワーカーが
+        同じメッセージを二重に拾うことはない。
+        戻り値は送信に必要な生プロパティ（body を含む）。
+        """
+        async with db.write_session() as session:
+            rec = await session.write_one(
+                f"""
+                MATCH (m:OutboxMessage)
+                WHERE {_DUE}
+                WITH m ORDER BY m.next_attempt_at ASC LIMIT 1
+                SET m._lock = true
+                WITH m WHERE {_DUE}
+                SET m.status = 'sending', m.claimed_at = datetime(),
+                    m.attempts = coalesce(m.attempts, 0) + 1
+                REMOVE m._lock
+                RETURN m
+                """,
+                lease=lease_seconds,
+            )
+            return dict(rec["m"]) if rec else None
+
+    @staticmethod
+    async def mark_sent(message_id: str) -> None:
+        async with db.write_session() as session:
+            await session.write(
+                "MATCH (m:OutboxMessage {id: $id}) "
+                "SET m.status = 'sent', m.sent_at = datetime(), m.last_error = null",
+                id=message_id,
+            )
+
+    @staticmethod
+    async def mark_skipped(message_id: str) -> None:
+        async with db.write_session() as session:
+            await session.write(
+                "MATCH (m:OutboxMessage {id: $id}) SET m.status = 'skipped'",
+                id=message_id,
+            )
+
+    @staticmethod
+    async def mark_retry(message_id: str, error: str, delay_seconds: float) -> None:
+        async with db.write_session() as session:
+            await session.write(
+                """
+                MATCH (m:OutboxMessage {id: $id})
+                SET m.status = 'pending', m.last_error = $error,
+                    m.next_attempt_at = datetime() + duration({milliseconds: $delay_ms})
+                """,
+                id=message_id, error=error, delay_ms=int(delay_seconds * 1000),
+            )
+
+    @staticmethod
+    async def mark_failed(message_id: str, error: str) -> None:
+        async with db.write_session() as session:
+            await session.write(
+                "MATCH (m:OutboxMessage {id: $id}) "
+                "SET m.status = 'failed', m.last_error = $error",
+                id=message_id, error=error,
+            )
+
+    # ===== Admin =====
+    @staticmethod
+    async def list_messages(
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[OutboxMessage], Optional[str]]:
+        filters, params = [], {}
+        if status is not None:
+            if status not in OUTBOX_STATUSES:
+                raise HTTPException(status_code=400, detail="Unknown status.")
+            filters.append("m.status = $status")
+            params["status"] = status
+        async with db.read_session() as session:
+            records, next_cursor = await fetch_page(
+                session, "MATCH (m:OutboxMessage)", "m",
+                filters=filters, params=params, limit=limit, cursor=cursor,
+            )
+            return [_row_to_message(r["m"]) for r in records], next_cursor
+
+    @staticmethod
+    async def get(message_id: str) -> Optional[OutboxMessage]:
+        async with db.read_session() as session:
+            rec = await session.read_one(
+                "MATCH (m:OutboxMessage {id: $id}) RETURN m", id=message_id
+            )
+            return _row_to_message(rec["m"]) if rec else None
+
+    @staticmethod
+    async def stats() -> OutboxStats:
+        async with db.read_session() as session:
+            rows = await session.read(
+                "MATCH (m:OutboxMessage) RETURN m.status AS status, count(*) AS c"
+            )
+            counts = {row["status"]: row["c"] for row in rows}
+            return OutboxStats(**{s: counts.get(s, 0) for s in OUTBOX_STATUSES})
+
+    @staticmethod
+    async def requeue(message_id: str) -> Optional[OutboxMessage]:
+        """failed/skipped のメッセージを試行回数 0 から送り直す。"""
+        async with db.write_session() as session:
+            rec = await session.write_one(
+                """
+                MATCH (m:OutboxMessage {id: $id})
+                WHERE m.status IN ['failed', 'skipped']
+                SET m.status = 'pending', m.attempts = 0, m.next_attempt_at = datetime()
+                RETURN m
+                """,
+                id=message_id,
+            )
+            return _row_to_message(rec["m"]) if rec else None
@@ -0,0 +1,159 @@
+"""
+一覧系クエリのキーセット（シーク）ページング。
+
+並び順キー（既定は created_at）と id の組で「前ページの最後の行」より後ろだけを
+読むので、OFFSET と違ってページが深くなっても Neo4j 側の仕事量が増えない。
+カーソルは (キーの文字列表現, id) を base64url にした不透明な文字列で、
+一覧 API はレスポンスヘッダ X-Next-Cursor で次ページのカーソルを返す。
+limit も cursor も付けない一覧は従来どおり全件を返す（既存のクライアント向け）。
+"""
+import base64
+import json
+import os
+import re
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+
+DEFAULT_LIMIT = int(os.getenv("PAGE_DEFAULT_LIMIT", "100"))
+MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", "500"))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# toString(datetime) の形（年 月 日 時 分 秒 を取り出す。小数とゾーンは形だけ見る）
+_DATETIME_KEY = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2})(?::(\d{2})(?:\.\d{1,9})?)?"
+    r"(?:Z|[+-]\d{2}:\d{2}(?::\d{2})?)?(?:\[[A-Za-z0-9_+\-/]+\])?"
+)
+
+
+def encode_cursor(key: str, item_id: str) -> str:
+    raw = json.dumps([key, item_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return str(key), str(item_id)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+
+
+def _check_datetime_key(key: str) -> None:
+    """
+    datetime キーのカーソルを Cypher に渡す前に Python で読めるか確かめる
+    （読めない値を datetime() に渡すと ClientError になり 500 で返ってしまう）。
+    Neo4j の toString は秒の小数を 0〜9 桁（末尾の 0 は省く）で書き、末尾に Z・
+    +09:00・[Asia/Tokyo] のようなゾーンを付ける。Python 3.9 の fromisoformat は
+    小数 3 桁か 6 桁しか読めないので、形は正規表現で見て、日付と時刻の範囲だけを
+    datetime で確かめる。
+    """
+    m = _DATETIME_KEY.fullmatch(key)
+    try:
+        if m is None:
+            raise ValueError(key)
+        datetime(*(int(part or 0) for part in m.groups()))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+
+
+def publish_sort_at(publish_date: Optional[str]) -> Optional[str]:
+    """
+    publishDate（YYYY-MM-DD で始まる文字列）を sort_at 用の日付文字列にする。
+    読めなければ None で、その場合は created_at と同じ時刻を使う。
+    """
+    try:
+        return date.fromisoformat((publish_date or "")[:10]).isoformat()
+    except ValueError:
+        return None
+
+
+def map_projection(alias: str, fields: Sequence[str]) -> str:
+    """Cypher のマッププロジェクション（例: n {.id, .title}）。fields は内部で決めた名前のみ。"""
+    names = ["id"] + [f for f in fields if f != "id"]
+    return f"{alias} {{" + ", ".join(f".{name}" for name in names) + "}"
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+def next_cursor_headers(next_cursor: Optional[str]) -> Dict[str, str]:
+    """キャッシュしたレスポンスに付けるヘッダ（set_next_cursor のレスポンス無し版）。"""
+    return {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+
+
+async def fetch_page(
+    session,
+    match: str,
+    alias: str,
+    filters: Sequence[str] = (),
+    params: Optional[Dict[str, Any]] = None,
+    sort_key: Optional[str] = None,
+    key_type: str = "datetime",
+    descending: bool = True,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    tail: str = "",
+    returns: str = "",
+    projection: Sequence[str] = (),
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    `match` で対象を取り、filters（AND 結合）で絞り、sort_key と id の順に
+    limit 件だけ読む。limit=None なら全件（カーソルは返さない）。ただし cursor が
+    あるのに limit が無いときは DEFAULT_LIMIT 件ずつにする（カーソルはページングした
+    レスポンスにしか付かないので、続きも同じ件数で読む）。
+
+    tail / returns はページを切った後にだけ評価される句と RETURN 列で、
+    件数集計などをページ内の行に限定したいときに使う。
+    projection を渡すと {alias} はノードではなくそのプロパティだけのマップになる
+    （id は常に含む）。大きなプロパティを一覧で読まないために使う。
+    戻り値は (Record のリスト, 次ページのカーソル or None)。
+    """
+    params = dict(params or {})
+    if limit is None and cursor:
+        limit = DEFAULT_LIMIT
+    sort_key = sort_key or f"{alias}.created_at"
+    direction = "DESC" if descending else "ASC"
+    op = "<" if descending else ">"
+
+    filters = list(filters)
+    if cursor:
+        # 並び順キーそのものに条件を付けるので、キーにインデックスがあれば範囲スキャンになる
+        after_key, after_id = decode_cursor(cursor)
+        if key_type == "datetime":
+            _check_datetime_key(after_key)
+        after = "datetime($_after_key)" if key_type == "datetime" else "$_after_key"
+        filters.append(
+            f"({sort_key} {op} {after} OR ({sort_key} = {after} AND {alias}.id {op} $_after_id))"
+        )
+        params.update(_after_key=after_key, _after_id=after_id)
+
+    lines = [match]
+    if filters:
+        lines.append("WHERE " + " AND ".join(filters))
+    lines.append(f"WITH {alias}, {sort_key} AS _k")
+    if limit is not None:
+        # 1 件多く読んで次ページの有無を判定する
+        lines.append(f"WITH {alias}, _k ORDER BY _k {direction}, {alias}.id {direction} LIMIT $_limit")
+        params["_limit"] = limit + 1
+    if tail:
+        lines.append(tail)
+    extra = f", {returns}" if returns else ""
+    row = f"{map_projection(alias, projection)} AS {alias}" if projection else alias
+    lines.append(
+        f"RETURN {row}, _k, toString(_k) AS _cursor_key{extra} "
+        f"ORDER BY _k {direction}, {alias}.id {direction}"
+    )
+
+    records = await session.read("\n".join(lines), params)
+
+    next_cursor = None
+    if limit is not None and len(records) > limit:
+        records = records[:limit]
+        last = records[-1]
+        next_cursor = encode_cursor(last["_cursor_key"], last[alias]["id"])
+    return records, next_cursor
@@ -0,0 +1,35 @@
+"""
+詳細 API の ?fields= （返すプロパティの絞り込み）。
+
+    GET /news/{id}?fields=title,excerpt,publishDate
+
+指定できるのはレスポンスモデルのフィールド名だけで、id は常に返す。Cypher では
+マッププロジェクション（n {.id, .title, ...}）にするので、指定しなかった
+プロパティ（記事本文の HTML など）は Neo4j からも読まない。
+"""
+from typing import Any, Dict, Optional, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+    """カンマ区切りを検証してタプルに（未指定なら None = 全フィールド）。"""
+    if fields is None:
+        return None
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(names) - set(model.__fields__))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown field(s): {', '.join(unknown)}.",
+        )
+    return tuple(dict.fromkeys(["id"] + names))
+
+
+def to_json_values(row: Dict[str, Any]) -> Dict[str, Any]:
+    """プロジェクション結果の Neo4j の日時を ISO 文字列に（モデルでの変換と揃える）。"""
+    return {
+        key: value.isoformat() if hasattr(value, "isoformat") else value
+        for key, value in row.items()
+    }
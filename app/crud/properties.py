@@ -1,116 +1,78 @@
 from app.crud.database import db
-from fastapi import HTTPException
+from app.crud.pagination import fetch_page
+from app.crud.creation import create_owned
+from app.crud.versions import content_changed
 from app.models.property import Property, PropertyCreate
-from typing import List
-from uuid import uuid4
+from typing import List, Optional, Tuple
 
 
 class PropertyCRUD:
     @staticmethod
     async def create(prop: PropertyCreate, creator_id: str) -> Property:
         """
-        Create a new property and link it to the creator user.
+        Create a new property and link it to the creator user in one statement.
         """
-        with db.get_session() as session:
-            property_id = str(uuid4())
-
-            create_result = session.run(
-                """
-                CREATE (p:Property {
-                    id: $id,
-                    title: $title,
-                    description: $description,
-                    contactEmail: $contactEmail,
-                    contactPhone: $contactPhone,
-                    address: $address,
-                    rent: $rent,
-                    size: $size,
-                    rooms: $rooms,
-                    utilities: $utilities,
-                    parking: $parking,
-                    petPolicy: $petPolicy,
-                    creator_id: $creator_id,
-                    status: 'available',
-                    created_at: datetime(),
-                    updated_at: datetime()
-                })
-                RETURN p
-                """,
-                id=property_id,
-                title=prop.title,
-                description=prop.description,
-                contactEmail=prop.contactEmail,
-                contactPhone=prop.contactPhone,
-                address=prop.address,
-                rent=prop.rent,
-                size=prop.size,
-                rooms=prop.rooms,
-                utilities=prop.utilities,
-                parking=prop.parking,
-                petPolicy=prop.petPolicy,
-                creator_id=creator_id,
-            )
-            record = create_result.single()
-            if not record:
-                raise HTTPException(status_code=500, detail="Failed to create property.")
-
-            session.run(
-                """
-                MATCH (u:User {id: $user_id}), (p:Property {id: $property_id})
-                CREATE (u)-[:CREATED]->(p)
-                """,
-                user_id=creator_id,
-                property_id=property_id,
-            )
-
-            property_data = record["p"]
-            return Property(
-                id=property_data["id"],
-                title=property_data["title"],
-                description=property_data["description"],
-                contactEmail=property_data["contactEmail"],
-                contactPhone=property_data.get("contactPhone"),
-                address=property_data["address"],
-                rent=property_data["rent"],
-                size=property_data["size"],
-                rooms=property_data["rooms"],
-                utilities=property_data.get("utilities"),
-                parking=property_data.get("parking"),
-                petPolicy=property_data.get("petPolicy"),
-                creator_id=property_data["creator_id"],
-                status=property_data["status"],
-                created_at=property_data["created_at"].isoformat(),
-                updated_at=property_data["updated_at"].isoformat() if property_data.get("updated_at") else None,
+        async with db.write_session() as session:
+            created = await create_owned(
+                session, "Property",
+                {
+                    "title": prop.title,
+                    "description": prop.description,
+                    "contactEmail": prop.contactEmail,
+                    "contactPhone": prop.contactPhone,
+                    "address": prop.address,
+                    "rent": prop.rent,
+                    "size": prop.size,
+                    "rooms": prop.rooms,
+                    "utilities": prop.utilities,
+                    "parking": prop.parking,
+                    "petPolicy": prop.petPolicy,
+                    "status": "available",
+                },
+                creator_id, _row_to_property,
             )
+        content_changed("properties")
+        return created
 
     @staticmethod
-    async def get_all() -> List[Property]:
+    async def get_all(
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Property], Optional[str]]:
         """
-        Retrieve all properties from the database.
+        Retrieve properties, newest first, one keyset page at a time.
+        Returns the properties and the cursor of the next page (None at the end).
         """
-        with db.get_session() as session:
-            result = session.run("MATCH (p:Property) RETURN p ORDER BY p.created_at DESC")
-            properties = []
-            for record in result:
-                property_data = record["p"]
-                properties.append(
-                    Property(
-                        id=property_data["id"],
-                        title=property_data["title"],
-                        description=property_data["description"],
-                        contactEmail=property_data["contactEmail"],
-                        contactPhone=property_data.get("contactPhone"),
-                        address=property_data["address"],
-                        rent=property_data["rent"],
-                        size=property_data["size"],
-                        rooms=property_data["rooms"],
-                        utilities=property_data.get("utilities"),
-                        parking=property_data.get("parking"),
-                        petPolicy=property_data.get("petPolicy"),
-                        creator_id=property_data["creator_id"],
-                        status=property_data["status"],
-                        created_at=property_data["created_at"].isoformat(),
-                        updated_at=property_data["updated_at"].isoformat() if property_data.get("updated_at") else None,
-                    )
-                )
-            return properties
+        filters, params = [], {}
+        if status is not None:
+            filters.append("p.status = $status")
+            params["status"] = status
+
+        async with db.read_session() as session:
+            records, next_cursor = await fetch_page(
+                session, "MATCH (p:Property)", "p",
+                filters=filters, params=params, limit=limit, cursor=cursor,
+            )
+            return [_row_to_property(r["p"]) for r in records], next_cursor
+
+
+def _row_to_property(property_data) -> Property:
+    return Property(
+        id=property_data["id"],
+        title=property_data["title"],
+        description=property_data["description"],
+        contactEmail=property_data["contactEmail"],
+        contactPhone=property_data.get("contactPhone"),
+        address=property_data["address"],
+        rent=property_data["rent"],
+        size=property_data["size"],
+        rooms=property_data["rooms"],
+        utilities=property_data.get("utilities"),
+        parking=property_data.get("parking"),
+        petPolicy=property_data.get("petPolicy"),
+        creator_id=property_data["creator_id"],
+        status=property_data["status"],
+        created_at=property_data["created_at"].isoformat(),
+        updated_at=property_data["updated_at"].isoformat() if property_data.get("updated_at") else None,
+    )
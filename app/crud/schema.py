@@ -0,0 +1,202 @@
+"""
+Neo4j のスキーマ（制約・インデックス）を管理する冪等なマイグレーション。
+
+起動時（SCHEMA_AUTO_MIGRATE=true のとき）または CLI から実行する:
+
+    python -m app.crud.schema          # 未適用のマイグレーションを適用
+    python -m app.crud.schema --status # 適用済みバージョンを表示
+
+適用済みバージョンは (:SchemaMigration {id: 'app'}).version に記録するので、
+再起動のたびに同じ DDL を流し直すことはない。各文も IF NOT EXISTS 付きなので、
+途中で失敗して再実行しても安全。
+"""
+import asyncio
+import functools
+import sys
+from typing import Awaitable, Callable, List, Tuple, Union
+
+from app.crud.board_counters import repair_statements
+from app.crud.database import db
+from app.crud.sort_at import backfill_sort_at
+
+_MARKER_ID = "app"
+
+# 1 ステップは Cypher 文か、データの埋め戻しなど Python で値を作る async 関数 (session) -> Any
+Step = Union[str, Callable[..., Awaitable]]
+
+# (version, 説明, ステップのリスト)。追加は末尾に、番号は単調増加で。
+MIGRATIONS: List[Tuple[int, str, List[Step]]] = [
+    (
+        1,
+        "uniqueness constraints and lookup indexes",
+        [
+            # マーカー自身
+            "CREATE CONSTRAINT schema_migration_id IF NOT EXISTS "
+            "FOR (m:SchemaMigration) REQUIRE m.id IS UNIQUE",
+            # ユーザー
+            "CREATE CONSTRAINT user_email IF NOT EXISTS FOR (u:User) REQUIRE u.email IS UNIQUE",
+            "CREATE CONSTRAINT user_id IF NOT EXISTS FOR (u:User) REQUIRE u.id IS UNIQUE",
+            # 掲載系
+            "CREATE CONSTRAINT event_id IF NOT EXISTS FOR (e:Event) REQUIRE e.id IS UNIQUE",
+            "CREATE CONSTRAINT job_id IF NOT EXISTS FOR (j:Job) REQUIRE j.id IS UNIQUE",
+            "CREATE CONSTRAINT product_id IF NOT EXISTS FOR (p:Product) REQUIRE p.id IS UNIQUE",
+            "CREATE CONSTRAINT property_id IF NOT EXISTS FOR (p:Property) REQUIRE p.id IS UNIQUE",
+            "CREATE CONSTRAINT store_id IF NOT EXISTS FOR (s:Store) REQUIRE s.id IS UNIQUE",
+            "CREATE CONSTRAINT news_id IF NOT EXISTS FOR (n:News) REQUIRE n.id IS UNIQUE",
+            "CREATE CONSTRAINT blog_id IF NOT EXISTS FOR (b:Blog) REQUIRE b.id IS UNIQUE",
+            "CREATE INDEX store_sub_genre IF NOT EXISTS FOR (s:Store) ON (s.subGenre)",
+            # 掲示板
+            "CREATE CONSTRAINT board_post_id IF NOT EXISTS FOR (p:BoardPost) REQUIRE p.id IS UNIQUE",
+            "CREATE CONSTRAINT comment_id IF NOT EXISTS FOR (c:Comment) REQUIRE c.id IS UNIQUE",
+            # 内見予約
+            "CREATE CONSTRAINT availability_window_id IF NOT EXISTS "
+            "FOR (w:AvailabilityWindow) REQUIRE w.id IS UNIQUE",
+            "CREATE INDEX availability_window_starts_at IF NOT EXISTS "
+            "FOR (w:AvailabilityWindow) ON (w.starts_at)",
+            "CREATE INDEX availability_window_ends_at IF NOT EXISTS "
+            "FOR (w:AvailabilityWindow) ON (w.ends_at)",
+            "CREATE CONSTRAINT viewing_booking_id IF NOT EXISTS "
+            "FOR (b:ViewingBooking) REQUIRE b.id IS UNIQUE",
+            "CREATE CONSTRAINT viewing_booking_cancel_token IF NOT EXISTS "
+            "FOR (b:ViewingBooking) REQUIRE b.cancel_token IS UNIQUE",
+            "CREATE INDEX viewing_booking_status IF NOT EXISTS FOR (b:ViewingBooking) ON (b.status)",
+            "CREATE INDEX viewing_booking_email IF NOT EXISTS FOR (b:ViewingBooking) ON (b.email)",
+            "CREATE INDEX viewing_booking_starts_at IF NOT EXISTS "
+            "FOR (b:ViewingBooking) ON (b.starts_at)",
+            # ガイド記事リアクション
+            "CREATE CONSTRAINT guide_reaction_slug IF NOT EXISTS "
+            "FOR (g:GuideReaction) REQUIRE g.slug IS UNIQUE",
+        ],
+    ),
+    (
+        2,
+        "keyset pagination sort keys and list filters",
+        [
+            "CREATE INDEX event_created_at IF NOT EXISTS FOR (e:Event) ON (e.created_at)",
+            "CREATE INDEX event_status IF NOT EXISTS FOR (e:Event) ON (e.status)",
+            "CREATE INDEX event_event_date IF NOT EXISTS FOR (e:Event) ON (e.eventDate)",
+            "CREATE INDEX job_created_at IF NOT EXISTS FOR (j:Job) ON (j.created_at)",
+            "CREATE INDEX job_job_type IF NOT EXISTS FOR (j:Job) ON (j.jobType)",
+            "CREATE INDEX job_status IF NOT EXISTS FOR (j:Job) ON (j.status)",
+            "CREATE INDEX product_created_at IF NOT EXISTS FOR (p:Product) ON (p.created_at)",
+            "CREATE INDEX product_category IF NOT EXISTS FOR (p:Product) ON (p.category)",
+            "CREATE INDEX product_status IF NOT EXISTS FOR (p:Product) ON (p.status)",
+            "CREATE INDEX property_created_at IF NOT EXISTS FOR (p:Property) ON (p.created_at)",
+            "CREATE INDEX property_status IF NOT EXISTS FOR (p:Property) ON (p.status)",
+            "CREATE INDEX store_created_at IF NOT EXISTS FOR (s:Store) ON (s.created_at)",
+            "CREATE INDEX store_main_genre IF NOT EXISTS FOR (s:Store) ON (s.mainGenre)",
+            "CREATE INDEX store_status IF NOT EXISTS FOR (s:Store) ON (s.status)",
+            "CREATE INDEX news_category IF NOT EXISTS FOR (n:News) ON (n.category)",
+            "CREATE INDEX news_status IF NOT EXISTS FOR (n:News) ON (n.status)",
+            "CREATE INDEX blog_category IF NOT EXISTS FOR (b:Blog) ON (b.category)",
+            "CREATE INDEX blog_status IF NOT EXISTS FOR (b:Blog) ON (b.status)",
+            "CREATE INDEX user_created_at IF NOT EXISTS FOR (u:User) ON (u.created_at)",
+            "CREATE INDEX board_post_created_at IF NOT EXISTS FOR (p:BoardPost) ON (p.created_at)",
+        ],
+    ),
+    (
+        3,
+        "email outbox",
+        [
+            "CREATE CONSTRAINT outbox_message_id IF NOT EXISTS "
+            "FOR (m:OutboxMessage) REQUIRE m.id IS UNIQUE",
+            "CREATE INDEX outbox_message_status IF NOT EXISTS FOR (m:OutboxMessage) ON (m.status)",
+            "CREATE INDEX outbox_message_next_attempt_at IF NOT EXISTS "
+            "FOR (m:OutboxMessage) ON (m.next_attempt_at)",
+            "CREATE INDEX outbox_message_created_at IF NOT EXISTS "
+            "FOR (m:OutboxMessage) ON (m.created_at)",
+        ],
+    ),
+    (
+        4,
+        "backfill board comment/reaction counters",
+        # 以後は書き込み側が更新する。ずれたら python -m app.crud.board_counters
+        repair_statements(),
+    ),
+    (
+        5,
+        "news/blog sort_at (publishDate or created_at) for index-ordered lists",
+        [
+            "CREATE INDEX news_sort_at IF NOT EXISTS FOR (n:News) ON (n.sort_at)",
+            "CREATE INDEX blog_sort_at IF NOT EXISTS FOR (b:Blog) ON (b.sort_at)",
+            # 以後は create が書く。値は create と同じ publish_sort_at で決める（Python 側）
+            functools.partial(backfill_sort_at, label="News"),
+            functools.partial(backfill_sort_at, label="Blog"),
+        ],
+    ),
+    (
+        6,
+        "full-text search index over all listing types (cjk analyzer)",
+        [
+            # 日本語は空白で区切られないので cjk アナライザ（文字の bigram）で索引する
+            "CREATE FULLTEXT INDEX listing_search IF NOT EXISTS "
+            "FOR (n:Store|Job|Product|Property|Event|News|Blog) "
+            "ON EACH [n.title, n.description, n.excerpt, n.content, n.company] "
+            "OPTIONS {indexConfig: {`fulltext.analyzer`: 'cjk'}}",
+        ],
+    ),
+    (
+        7,
+        "per-resource deletion marker for catalog Last-Modified",
+        [
+            "CREATE CONSTRAINT content_version_resource IF NOT EXISTS "
+            "FOR (v:ContentVersion) REQUIRE v.resource IS UNIQUE",
+        ],
+    ),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+async def get_applied_version() -> int:
+    async with db.write_session() as session:
+        result = await session.run(
+            "MATCH (m:SchemaMigration {id: $id}) RETURN m.version AS v", id=_MARKER_ID
+        )
+        rec = await result.single()
+        return rec["v"] if rec and rec["v"] is not None else 0
+
+
+async def apply_migrations() -> int:
+    """
+    未適用のマイグレーションを順に適用し、適用後のバージョンを返す。
+    スキーマ変更はデータ更新と同じトランザクションに入れられないため、
+    1 文ずつ自動コミットで流し、各バージョンの完了後にマーカーを進める。
+    """
+    current = await get_applied_version()
+    for version, description, statements in MIGRATIONS:
+        if version <= current:
+            continue
+        print(f"[schema] applying v{version}: {description}")
+        async with db.write_session() as session:
+            for statement in statements:
+                if callable(statement):
+                    await statement(session)
+                    continue
+                result = await session.run(statement)
+                await result.consume()
+            await session.run(
+                """
+                MERGE (m:SchemaMigration {id: $id})
+                SET m.version = $v, m.applied_at = datetime()
+                """,
+                id=_MARKER_ID, v=version,
+            )
+        current = version
+    return current
+
+
+async def _main(argv: List[str]) -> None:
+    try:
+        if "--status" in argv:
+            current = await get_applied_version()
+            print(f"[schema] applied v{current} / latest v{LATEST_VERSION}")
+        else:
+            current = await apply_migrations()
+            print(f"[schema] up to date at v{current}")
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv[1:]))
@@ -0,0 +1,204 @@
+"""
+公開カタログ（stores, jobs, products, properties, events, news, blogs）の横断検索。
+
+全ラベルを 1 つの全文索引 listing_search（schema v6, cjk アナライザ）に載せているので、
+1 回の queryNodes で種類をまたいだスコア順の結果が得られる。
+
+  - 利用者の入力は Lucene の構文として解釈させない（記号はエスケープし、語は AND）
+  - スコア順はキーセットにできないので、カーソルは読み飛ばす件数（SEARCH_MAX_OFFSET まで）
+  - スニペットは返ってきたページ分だけ Python で作る。本文の HTML は除き、
+    エスケープしたうえで一致箇所を <mark> で囲む
+
+設定（環境変数）:
+  SEARCH_DEFAULT_LIMIT ... 1 ページの既定件数（既定 20）
+  SEARCH_MAX_LIMIT ....... 1 ページの最大件数（既定 50）
+  SEARCH_MAX_OFFSET ...... 読み飛ばせる最大件数（既定 1000。これより深いページは返さない）
+"""
+import html
+import os
+import re
+from typing import List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+
+from app.core.metrics import Counter, Summary
+from app.crud.database import db
+from app.crud.pagination import decode_cursor, encode_cursor
+from app.crud.versions import RESOURCE_LABELS
+from app.models.search import SearchHit
+
+SEARCH_DEFAULT_LIMIT = int(os.getenv("SEARCH_DEFAULT_LIMIT", "20"))
+SEARCH_MAX_LIMIT = int(os.getenv("SEARCH_MAX_LIMIT", "50"))
+SEARCH_MAX_OFFSET = int(os.getenv("SEARCH_MAX_OFFSET", "1000"))
+SEARCH_INDEX = "listing_search"
+# 入力の上限（長い入力は語が増えるだけで結果は良くならない）
+MAX_QUERY_LENGTH = 100
+MAX_TERMS = 8
+SNIPPET_LENGTH = 120
+
+_LABEL_RESOURCES = {label: resource for resource, label in RESOURCE_LABELS.items()}
+# スニペットを探す順（title は別に返すので最後）
+_SNIPPET_FIELDS = ("description", "excerpt", "content", "title")
+
+_LUCENE_SPECIAL = re.compile(r'([+\-!(){}\[\]^"~*?:\\/&|])')
+_TAG = re.compile(r"<[^>]*>")
+
+_searches = Counter(
+    "search_requests_total", "Full-text searches by outcome.",
+    labelnames=("outcome",),
+)
+_hits = Summary("search_hits_returned", "Hits returned per search page.")
+
+
+def _terms(q: str) -> List[str]:
+    """空白（全角を含む）で区切った語。重複は除き、MAX_TERMS 語まで。"""
+    words = (q or "").replace("　", " ").split()
+    return list(dict.fromkeys(w for w in words if w))[:MAX_TERMS]
+
+
+def lucene_query(terms: Sequence[str]) -> str:
+    """語ごとに記号をエスケープして AND でつなぐ（演算子やワイルドカードは使わせない）。"""
+    escaped = []
+    for term in terms:
+        term = _LUCENE_SPECIAL.sub(r"\\\1", term)
+        # AND / OR / NOT 単独の語は演算子として読まれるので引用する
+        escaped.append(f'"{term}"' if term in ("AND", "OR", "NOT") else term)
+    return " AND ".join(escaped)
+
+
+def _plain_text(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    return " ".join(html.unescape(_TAG.sub(" ", value)).split())
+
+
+def snippet(text: str, terms: Sequence[str], length: int = SNIPPET_LENGTH) -> Optional[str]:
+    """
+    text の最初の一致箇所の前後 length 文字を切り出し、HTML エスケープしてから一致した語を
+    <mark> で囲む。一致が無ければ None。
+    """
+    lowered = text.lower()
+    positions = [p for p in (lowered.find(t.lower()) for t in terms) if p >= 0]
+    if not positions:
+        return None
+    start = max(min(positions) - length // 3, 0)
+    piece = text[start:start + length]
+    # 一致はエスケープ前の文字列で探す（エスケープ後だと &amp; の中の "amp" などに当たる）
+    pattern = re.compile(
+        "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True)), re.IGNORECASE
+    )
+    parts, end = [], 0
+    for m in pattern.finditer(piece):
+        parts.append(html.escape(piece[end:m.start()]))
+        parts.append(f"<mark>{html.escape(m.group(0))}</mark>")
+        end = m.end()
+    parts.append(html.escape(piece[end:]))
+    marked = "".join(parts)
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + length < len(text) else ""
+    return prefix + marked + suffix
+
+
+def _best_snippet(row: dict, terms: Sequence[str]) -> Optional[str]:
+    texts = [_plain_text(row.get(field)) for field in _SNIPPET_FIELDS]
+    for text in texts:
+        found = snippet(text, terms)
+        if found:
+            return found
+    # cjk アナライザは bigram で一致するので、入力そのままが本文に無いこともある
+    fallback = next((t for t in texts[:-1] if t), "")
+    if not fallback:
+        return None
+    cut = fallback[:SNIPPET_LENGTH]
+    return html.escape(cut) + ("…" if len(fallback) > SNIPPET_LENGTH else "")
+
+
+def _parse_types(types: Optional[Sequence[str]]) -> List[str]:
+    if not types:
+        return list(RESOURCE_LABELS.values())
+    labels = []
+    for resource in types:
+        label = RESOURCE_LABELS.get(resource.strip())
+        if label is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown type: {resource.strip()}. "
+                f"Allowed: {', '.join(RESOURCE_LABELS)}.",
+            )
+        if label not in labels:
+            labels.append(label)
+    return labels
+
+
+def _offset(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    key, kind = decode_cursor(cursor)
+    if kind != "search" or not key.isdigit():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+    return int(key)
+
+
+class SearchCRUD:
+    @staticmethod
+    async def search(
+        q: str,
+        types: Optional[Sequence[str]] = None,
+        limit: int = SEARCH_DEFAULT_LIMIT,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[SearchHit], Optional[str]]:
+        """スコアの高い順に 1 ページ分のヒットと、次ページのカーソル（無ければ None）。"""
+        q = (q or "").strip()
+        if not q:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="q is required.")
+        if len(q) > MAX_QUERY_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"q must be at most {MAX_QUERY_LENGTH} characters.",
+            )
+        terms = _terms(q)
+        labels = _parse_types(types)
+        skip = _offset(cursor)
+        if skip >= SEARCH_MAX_OFFSET:
+            _searches.inc(outcome="too_deep")
+            return [], None
+
+        filtered = len(labels) < len(RESOURCE_LABELS)
+        label_filter = "WHERE any(l IN labels(node) WHERE l IN $labels)" if filtered else ""
+        async with db.read_session() as session:
+            records = await session.read(
+                f"""
+                CALL db.index.fulltext.queryNodes($index, $query) YIELD node, score
+                {label_filter}
+                RETURN [l IN labels(node) WHERE l IN $labels][0] AS label,
+                       node {{.id, .title, .status, .description, .excerpt, .content}} AS n,
+                       score
+                SKIP $skip LIMIT $limit
+                """,
+                index=SEARCH_INDEX,
+                query=lucene_query(terms),
+                labels=labels,
+                skip=skip,
+                limit=limit + 1,
+            )
+
+        hits = []
+        for r in records[:limit]:
+            row = r["n"]
+            hits.append(
+                SearchHit(
+                    type=_LABEL_RESOURCES.get(r["label"], (r["label"] or "").lower()),
+                    id=row["id"],
+                    title=row.get("title") or "",
+                    snippet=_best_snippet(row, terms),
+                    status=row.get("status"),
+                    score=r["score"],
+                )
+            )
+        next_skip = skip + limit
+        next_cursor = None
+        if len(records) > limit and next_skip < SEARCH_MAX_OFFSET:
+            next_cursor = encode_cursor(str(next_skip), "search")
+        _searches.inc(outcome="hit" if hits else "empty")
+        _hits.observe(len(hits))
+        return hits, next_cursor
@@ -0,0 +1,56 @@
+"""
+News / Blog の sort_at（一覧の並び順キー）の埋め戻し。
+
+一覧は sort_at のインデックスを順に読むため sort_at IS NOT NULL で絞っている。
+sort_at の無いノード（v5 より前に作られたもの）を埋めるのはスキーマ v5 の
+マイグレーション（python -m app.crud.schema でも流せる）だけで、一覧は読み取り専用の
+まま。埋め戻し前のノードが残っている間は sort_at_complete() が False を返し、一覧は
+coalesce(sort_at, created_at) で（インデックスは使えないが）行を落とさずに並べる。
+
+値は create と同じ publish_sort_at()（Python の date.fromisoformat）で決める。
+Cypher の正規表現で判定すると 2024-02-30 のような存在しない日付が通り、
+datetime() が例外を投げてしまうため。
+"""
+from typing import Dict, List
+
+from app.crud.pagination import publish_sort_at
+
+BACKFILL_BATCH = 1000
+
+_complete: Dict[str, bool] = {}
+
+
+async def backfill_sort_at(session, label: str) -> int:
+    """sort_at の無い label のノードに値を入れ、入れた件数を返す。"""
+    records = await session.read(
+        f"MATCH (x:{label}) WHERE x.sort_at IS NULL RETURN x.id AS id, x.publishDate AS publishDate"
+    )
+    rows: List[dict] = [
+        {"id": r["id"], "sort_at": publish_sort_at(r["publishDate"])} for r in records
+    ]
+    for start in range(0, len(rows), BACKFILL_BATCH):
+        # 読めない publishDate は create と同じく作成時刻（無ければ今）にする
+        await session.write(
+            f"""
+            UNWIND $rows AS r
+            MATCH (x:{label} {{id: r.id}})
+            WHERE x.sort_at IS NULL
+            SET x.sort_at = coalesce(datetime(r.sort_at), x.created_at, datetime())
+            """,
+            rows=rows[start:start + BACKFILL_BATCH],
+        )
+    return len(rows)
+
+
+async def sort_at_complete(session, label: str) -> bool:
+    """
+    label の全ノードに sort_at があれば True（読み取りのみ）。
+    一度 True になれば以後は create が必ず書くので、プロセス内で覚えて問い合わせない。
+    """
+    if _complete.get(label):
+        return True
+    record = await session.read_one(
+        f"MATCH (x:{label}) WHERE x.sort_at IS NULL RETURN x.id AS id LIMIT 1"
+    )
+    _complete[label] = record is None
+    return _complete[label]
@@ -1,8 +1,10 @@
 from app.crud.database import db
-from fastapi import HTTPException
+from app.crud.pagination import fetch_page
+from app.crud.creation import create_owned
+from app.crud.versions import content_changed
+from app.crud.suggest import index_listing
 from app.models.store import Store, StoreCreate
-from typing import List, Tuple
-from uuid import uuid4
+from typing import List, Optional, Tuple
 
 
 STORE_TYPE_TO_GENRE = {
@@ -31,26 +33,37 @@ _SAFE_MIN = 10.0
 _SAFE_MAX = 90.0
 
 
-def _compute_position(slot_index: int) -> Tuple[float, float]:
+def _clamp(expr: str) -> str:
+    return (
+        f"CASE WHEN {expr} < {_SAFE_MIN} THEN {_SAFE_MIN} "
+        f"WHEN {expr} > {_SAFE_MAX} THEN {_SAFE_MAX} ELSE {expr} END"
+    )
+
+
+def _position_query() -> str:
+    """
+    Cypher that counts existing stores in $sg and binds the next grid slot as
+    position_x / position_y, so the count and the CREATE run as one statement.
+    """
     cell = (_MAX_BOUND - _MIN_BOUND) / (_GRID_COLS - 1)
-    base = slot_index % (_GRID_COLS * _GRID_ROWS)
-    overflow_round = slot_index // (_GRID_COLS * _GRID_ROWS)
-    col = base % _GRID_COLS
-    row = base // _GRID_COLS
+    slots = _GRID_COLS * _GRID_ROWS
     # First 16 stores fill the clean grid; from the 17th onward, deterministic
     # jitter spreads pins so they don't stack exactly on earlier ones.
-    if overflow_round == 0:
-        jitter_x = 0.0
-        jitter_y = 0.0
-    else:
-        jitter_x = ((overflow_round * 7) % 11) - 5
-        jitter_y = ((overflow_round * 13) % 11) - 5
-    x = _MIN_BOUND + col * cell + jitter_x
-    y = _MIN_BOUND + row * cell + jitter_y
-    # Hard clamp so a pin never exits the map frame
-    x = max(_SAFE_MIN, min(_SAFE_MAX, x))
-    y = max(_SAFE_MIN, min(_SAFE_MAX, y))
-    return x, y
+    jitter_x = f"CASE WHEN n < {slots} THEN 0.0 ELSE toFloat((n / {slots} * 7) % 11 - 5) END"
+    jitter_y = f"CASE WHEN n < {slots} THEN 0.0 ELSE toFloat((n / {slots} * 13) % 11 - 5) END"
+    return f"""
+        CALL {{
+            MATCH (s:Store {{subGenre: $sg}})
+            RETURN count(s) AS n
+        }}
+        WITH {_MIN_BOUND} + (n % {slots}) % {_GRID_COLS} * {cell} + {jitter_x} AS raw_x,
+             {_MIN_BOUND} + (n % {slots}) / {_GRID_COLS} * {cell} + {jitter_y} AS raw_y
+        // Hard clamp so a pin never exits the map frame
+        WITH {_clamp("raw_x")} AS position_x, {_clamp("raw_y")} AS position_y
+    """
+
+
+_POSITION_QUERY = _position_query()
 
 
 class StoreCRUD:
@@ -64,80 +77,62 @@ class StoreCRUD:
             store.storeType, ("service", "other")
         )
 
-        with db.get_session() as session:
-            store_id = str(uuid4())
-
-            # Count existing stores in this subGenre to pick the next grid slot
-            count_result = session.run(
-                "MATCH (s:Store {subGenre: $sg}) RETURN count(s) AS n",
+        async with db.write_session() as session:
+            created = await create_owned(
+                session, "Store",
+                {
+                    "title": store.title,
+                    "description": store.description,
+                    "contactEmail": store.contactEmail,
+                    "contactPhone": store.contactPhone,
+                    "businessHours": store.businessHours,
+                    "website": store.website,
+                    "services": store.services,
+                    "storeAddress": store.storeAddress,
+                    "storeType": store.storeType,
+                    "mainGenre": main_genre,
+                    "subGenre": sub_genre,
+                    "status": "open",
+                },
+                creator_id, _row_to_store,
+                # Count existing stores in this subGenre to pick the next grid slot
+                prelude=_POSITION_QUERY,
+                computed={"position_x": "position_x", "position_y": "position_y"},
                 sg=sub_genre,
             )
-            existing = count_result.single()["n"] or 0
-            position_x, position_y = _compute_position(existing)
-
-            create_result = session.run(
-                """
-                CREATE (s:Store {
-                    id: $id,
-                    title: $title,
-                    description: $description,
-                    contactEmail: $contactEmail,
-                    contactPhone: $contactPhone,
-                    businessHours: $businessHours,
-                    website: $website,
-                    services: $services,
-                    storeAddress: $storeAddress,
-                    storeType: $storeType,
-                    mainGenre: $mainGenre,
-                    subGenre: $subGenre,
-                    position_x: $position_x,
-                    position_y: $position_y,
-                    creator_id: $creator_id,
-                    status: 'open',
-                    created_at: datetime(),
-                    updated_at: datetime()
-                })
-                RETURN s
-                """,
-                id=store_id,
-                title=store.title,
-                description=store.description,
-                contactEmail=store.contactEmail,
-                contactPhone=store.contactPhone,
-                businessHours=store.businessHours,
-                website=store.website,
-                services=store.services,
-                storeAddress=store.storeAddress,
-                storeType=store.storeType,
-                mainGenre=main_genre,
-                subGenre=sub_genre,
-                position_x=position_x,
-                position_y=position_y,
-                creator_id=creator_id,
-            )
-            record = create_result.single()
-            if not record:
-                raise HTTPException(status_code=500, detail="Failed to create store.")
-
-            session.run(
-                """
-                MATCH (u:User {id: $user_id}), (s:Store {id: $store_id})
-                CREATE (u)-[:CREATED]->(s)
-                """,
-                user_id=creator_id,
-                store_id=store_id,
-            )
-
-            return _row_to_store(record["s"])
+        content_changed("stores")
+        index_listing("stores", created)
+        return created
 
     @staticmethod
-    async def get_all() -> List[Store]:
+    async def get_all(
+        main_genre: Optional[str] = None,
+        sub_genre: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Store], Optional[str]]:
         """
-        Retrieve all stores from the database.
+        Retrieve stores, newest first, one keyset page at a time.
+        Returns the stores and the cursor of the next page (None at the end).
         """
-        with db.get_session() as session:
-            result = session.run("MATCH (s:Store) RETURN s ORDER BY s.created_at DESC")
-            return [_row_to_store(r["s"]) for r in result]
+        filters, params = [], {}
+        if main_genre is not None:
+            filters.append("s.mainGenre = $mainGenre")
+            params["mainGenre"] = main_genre
+        if sub_genre is not None:
+            filters.append("s.subGenre = $subGenre")
+            params["subGenre"] = sub_genre
+        if status is not None:
+            filters.append("s.status = $status")
+            params["status"] = status
+
+        async with db.read_session() as session:
+            records, next_cursor = await fetch_page(
+                session, "MATCH (s:Store)", "s",
+                filters=filters, params=params, limit=limit, cursor=cursor,
+            )
+            return [_row_to_store(r["s"]) for r in records], next_cursor
 
 
 def _row_to_store(store_data) -> Store:
@@ -0,0 +1,88 @@
+"""
+/suggest の入力補完用索引（app/core/typeahead.py）に何を載せるかと、その更新。
+
+  - 起動時に rebuild() で各 CRUD の get_all から全件を読み込む
+  - 以降は CRUD の create/update/delete が index_listing / unindex_listing を呼ぶ
+  - 読み込み中に来た書き込みは覚えておき、入れ替えた後にもう一度当てる
+    （読み込み前の状態で上書きしない）
+
+索引はプロセスごと。他プロセスでの作成は再起動（または rebuild）まで出てこない。
+
+設定（環境変数）:
+  SUGGEST_MEMORY_BUDGET_MB ... 索引のメモリの目安（既定 16）
+"""
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.typeahead import TypeaheadIndex
+
+SUGGEST_MEMORY_BUDGET_MB = float(os.getenv("SUGGEST_MEMORY_BUDGET_MB", "16"))
+
+# リソース名 → 索引に載せる項目
+SUGGEST_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "stores": ("title",),
+    "events": ("title",),
+    "jobs": ("title", "company"),
+    "products": ("title",),
+}
+
+typeahead = TypeaheadIndex("suggest", max_bytes=int(SUGGEST_MEMORY_BUDGET_MB * 1024 * 1024))
+
+# rebuild 中の書き込み（None なら rebuild 中ではない）
+_replay: Optional[List[Callable[[], None]]] = None
+
+
+def _put(resource: str, item) -> None:
+    typeahead.put(resource, item.id, {f: getattr(item, f, None) for f in SUGGEST_FIELDS[resource]})
+
+
+def index_listing(resource: str, item) -> None:
+    """作成・更新した項目（モデル）を索引に反映する。"""
+    _put(resource, item)
+    if _replay is not None:
+        _replay.append(lambda: _put(resource, item))
+
+
+def unindex_listing(resource: str, item_id: str) -> None:
+    typeahead.remove(resource, item_id)
+    if _replay is not None:
+        _replay.append(lambda: typeahead.remove(resource, item_id))
+
+
+async def _load_all() -> Dict[str, list]:
+    # CRUD モジュールがこのモジュールを import するので、ここで読み込む
+    from app.crud.events import EventCRUD
+    from app.crud.jobs import JobCRUD
+    from app.crud.products import ProductCRUD
+    from app.crud.stores import StoreCRUD
+
+    loaders = {
+        "stores": StoreCRUD.get_all,
+        "events": EventCRUD.get_all,
+        "jobs": JobCRUD.get_all,
+        "products": ProductCRUD.get_all,
+    }
+    out = {}
+    for resource, get_all in loaders.items():
+        items, _ = await get_all(limit=None)
+        out[resource] = items
+    return out
+
+
+async def rebuild() -> int:
+    """DB から全件を読み直して索引を作り直し、載せた項目数を返す。"""
+    global _replay
+    _replay = []
+    try:
+        loaded = await _load_all()
+        typeahead.clear()
+        for resource, items in loaded.items():
+            for item in items:
+                _put(resource, item)
+        for apply in _replay:
+            apply()
+    finally:
+        _replay = None
+    count = sum(len(items) for items in loaded.values())
+    print(f"[suggest] indexed {count} listings ({typeahead.approx_bytes // 1024} KiB)")
+    return count
@@ -1,8 +1,10 @@
 from app.crud.database import db
-from typing import Optional, List
+from app.crud.pagination import fetch_page
+from typing import Optional, List, Tuple
 from fastapi import HTTPException, status
 from app.models import User, UserCreate, UserUpdate
-from app.core.utils import get_password_hash, verify_password
+from app.core.utils import get_password_hash_async, verify_password_async
+from app.core.security import invalidate_user
 from uuid import uuid4
 
 
@@ -12,26 +14,26 @@ class UserCRUD:
         """
         Create a new user. If the id is provided, use it; otherwise, generate a random UUID.
         """
-        with db.get_session() as session:
+        async with db.write_session() as session:
             # Check for existing user by email
-            result = session.run(
+            existing = await session.write_one(
                 "MATCH (u:User {email: $email}) RETURN u",
                 email=user.email
             )
-            if result.single():
+            if existing:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Email is already registered."
                 )
 
             # Hash the user's password
-            hashed_password = get_password_hash(user.password)
+            hashed_password = await get_password_hash_async(user.password)
 
             # Set ID: Use provided id or generate a new random UUID
             provided_id = user.id if user.id else None
 
             # Create user in database
-            create_result = session.run(
+            record = await session.write_one(
                 """
                 CREATE (u:User {
                     id: COALESCE($id, randomUUID()),
@@ -47,7 +49,6 @@ class UserCRUD:
                 email=user.email,
                 hashed_password=hashed_password,
             )
-            record = create_result.single()
             if not record:
                 raise HTTPException(status_code=500, detail="Failed to create user.")
 
@@ -65,8 +66,8 @@ class UserCRUD:
         Get an existing user by email, or create one for an OAuth (Google) login.
         OAuth users have no password. Used by the /auth/google endpoint.
         """
-        with db.get_session() as session:
-            result = session.run(
+        async with db.write_session() as session:
+            record = await session.write_one(
                 """
                 MERGE (u:User {email: $email})
                 ON CREATE SET
@@ -81,7 +82,6 @@ class UserCRUD:
                 email=email,
                 name=name,
             )
-            record = result.single()
             if not record:
                 raise HTTPException(status_code=500, detail="Failed to upsert user.")
             user_data = record["u"]
@@ -93,12 +93,17 @@ class UserCRUD:
             )
 
     @staticmethod
-    async def get_all() -> List[User]:
+    async def get_all(
+        limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> Tuple[List[User], Optional[str]]:
         """
-        Retrieve all users from the database.
+        Retrieve users, newest first, one keyset page at a time.
+        Returns the users and the cursor of the next page (None at the end).
         """
-        with db.get_session() as session:
-            result = session.run("MATCH (u:User) RETURN u")  # ユーザー全件取得
+        async with db.read_session() as session:
+            records, next_cursor = await fetch_page(
+                session, "MATCH (u:User)", "u", limit=limit, cursor=cursor
+            )
             users = [
                 User(
                     id=record["u"].get("id") or str(uuid4()),  # idがない場合、UUIDを生成
@@ -106,9 +111,9 @@ class UserCRUD:
                     email=record["u"]["email"],
                     created_at=record["u"]["created_at"].isoformat(),
                 )
-                for record in result
+                for record in records
             ]
-            return users
+            return users, next_cursor
 
 
     @staticmethod
@@ -116,11 +121,10 @@ class UserCRUD:
         """
         Retrieve a user by their ID.
         """
-        with db.get_session() as session:
-            result = session.run(
+        async with db.read_session() as session:
+            record = await session.read_one(
                 "MATCH (u:User {id: $id}) RETURN u", id=user_id
             )
-            record = result.single()
             if record:
                 user_data = record["u"]
                 return User(
@@ -136,11 +140,10 @@ class UserCRUD:
         """
         Retrieve a user by their email address.
         """
-        with db.get_session() as session:
-            result = session.run(
+        async with db.read_session() as session:
+            record = await session.read_one(
                 "MATCH (u:User {email: $email}) RETURN u", email=email
             )
-            record = result.single()
             if record:
                 user_data = record["u"]
                 return User(
@@ -156,17 +159,20 @@ class UserCRUD:
         """
         Update user details by ID.
         """
-        with db.get_session() as session:
-            result = session.run(
+        async with db.write_session() as session:
+            record = await session.write_one(
                 """
                 MATCH (u:User {id: $id})
+                WITH u, u.email AS old_email
                 SET u.name = $name, u.email = $email
-                RETURN u
+                RETURN u, old_email
                 """,
                 id=user_id, name=user.name, email=user.email
             )
-            record = result.single()
             if record:
+                # 認証キャッシュに古い内容が残らないよう、旧/新 email の両方を破棄
+                invalidate_user(record["old_email"])
+                invalidate_user(user.email)
                 user_data = record["u"]
                 return User(
                     id=user_data["id"],
@@ -181,31 +187,32 @@ class UserCRUD:
         """
         Delete a user by ID.
         """
-        with db.get_session() as session:
-            result = session.run(
-                "MATCH (u:User {id: $id}) DELETE u",
+        async with db.write_session() as session:
+            record = await session.write_one(
+                "MATCH (u:User {id: $id}) WITH u, u.email AS email DELETE u RETURN email",
                 id=user_id
             )
-            return bool(result.summary().counters.nodes_deleted)
+            if record:
+                invalidate_user(record["email"])
+            return bool(record)
 
     @staticmethod
     async def authenticate_user(email: str, password: str) -> Optional[User]:
         """
         Verify user's email and password for authentication.
         """
-        with db.get_session() as session:
-            result = session.run(
+        async with db.read_session() as session:
+            record = await session.read_one(
                 "MATCH (u:User {email: $email}) RETURN u", email=email
             )
-            record = result.single()
-            if record:
-                user = record["u"]
-                # Verify the password with the hashed_password
-                if verify_password(password, user["hashed_password"]):
-                    return User(
-                        id=user["id"],
-                        name=user["name"],
-                        email=user["email"],
-                        created_at=user["created_at"].isoformat(),
-                    )
+        # Verify the password outside the session so the connection is not held during bcrypt
+        if record:
+            user = record["u"]
+            if await verify_password_async(password, user["hashed_password"]):
+                return User(
+                    id=user["id"],
+                    name=user["name"],
+                    email=user["email"],
+                    created_at=user["created_at"].isoformat(),
+                )
         return None
@@ -0,0 +1,161 @@
+"""
+公開カタログ（events, news, ...）のデータの「版」と、それを使った条件付き GET。
+
+版はラベルごとの (件数, max(coalesce(updated_at, created_at)), 最後の削除時刻) で、
+本文を作らずに ETag / Last-Modified を決められる。削除は max(updated_at) を動かさない
+ので、削除する側が (:ContentVersion {resource}).deleted_at を同じ文で書く
+（MARK_DELETED）。これで再起動後や別プロセスでも Last-Modified が削除より前に戻らない。
+CONTENT_VERSION_MEMO 秒だけプロセス内に覚えておき、このプロセスでの書き込み
+（content_changed）ではすぐ忘れる。他プロセスの書き込みは最大その秒数だけ遅れて
+反映される。
+
+ルーターでは依存関係として使う:
+
+    @router.get("/news/")
+    async def get_news(..., validators: Validators = Depends(conditional_get("news"))):
+
+クライアントの If-None-Match / If-Modified-Since が一致すれば、ハンドラ本体を
+実行する前に 304 が返る。
+"""
+import hashlib
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.core.http_cache import NotModified, Validators, check_not_modified
+from app.core.metrics import Counter
+from app.core.response_cache import invalidate_responses
+from app.crud.database import db
+
+CONTENT_VERSION_MEMO = float(os.getenv("CONTENT_VERSION_MEMO", "2"))
+
+# リソース名（URL とレスポンスキャッシュの名前）→ ノードのラベル
+RESOURCE_LABELS: Dict[str, str] = {
+    "events": "Event",
+    "stores": "Store",
+    "news": "News",
+    "blogs": "Blog",
+    "jobs": "Job",
+    "products": "Product",
+    "properties": "Property",
+}
+
+_lookups = Counter(
+    "content_version_lookups_total", "Content version lookups by resource and source.",
+    labelnames=("resource", "source"),
+)
+_not_modified = Counter(
+    "conditional_get_not_modified_total", "GET requests answered with 304.",
+    labelnames=("resource",),
+)
+
+
+class _Version:
+    __slots__ = ("count", "updated_at", "deleted_at", "changed_at", "expires_at")
+
+    def __init__(
+        self,
+        count: int,
+        updated_at: Optional[datetime],
+        deleted_at: Optional[datetime],
+        changed_at: Optional[datetime],
+    ):
+        self.count = count
+        self.updated_at = updated_at
+        # MARK_DELETED が書いた最後の削除時刻
+        self.deleted_at = deleted_at
+        # MARK_DELETED を通らない削除（手作業など）用に、このプロセスで件数が変わったのを見た時刻
+        self.changed_at = changed_at
+        self.expires_at = time.monotonic() + CONTENT_VERSION_MEMO
+
+    @property
+    def last_modified(self) -> Optional[datetime]:
+        stamps = [t for t in (self.updated_at, self.deleted_at, self.changed_at) if t is not None]
+        return max(stamps) if stamps else None
+
+    def token(self) -> Tuple:
+        return tuple(
+            [self.count] + [t.isoformat() if t else "" for t in (self.updated_at, self.deleted_at)]
+        )
+
+
+# 削除の Cypher の最後に付ける（$resource にリソース名を渡す）
+MARK_DELETED = (
+    "MERGE (cv:ContentVersion {resource: $resource}) SET cv.deleted_at = datetime()"
+)
+
+_versions: Dict[str, _Version] = {}
+_last_seen: Dict[str, _Version] = {}
+
+
+def content_changed(resource: str) -> None:
+    """CRUD の書き込み後に呼ぶ。レスポンスキャッシュと版の記憶を捨てる。"""
+    _versions.pop(resource, None)
+    invalidate_responses(resource)
+
+
+def _native(value) -> Optional[datetime]:
+    return value.to_native() if hasattr(value, "to_native") else None
+
+
+async def content_version(resource: str) -> _Version:
+    cached = _versions.get(resource)
+    if cached is not None and cached.expires_at > time.monotonic():
+        _lookups.inc(resource=resource, source="memo")
+        return cached
+    _lookups.inc(resource=resource, source="db")
+    label = RESOURCE_LABELS[resource]
+    async with db.read_session() as session:
+        rec = await session.read_one(
+            f"""
+            MATCH (n:{label})
+            WITH count(n) AS n, max(coalesce(n.updated_at, n.created_at)) AS ts
+            OPTIONAL MATCH (cv:ContentVersion {{resource: $resource}})
+            RETURN n, ts, cv.deleted_at AS deleted_at
+            """,
+            resource=resource,
+        )
+    updated_at = _native(rec["ts"]) if rec else None
+    deleted_at = _native(rec["deleted_at"]) if rec else None
+    count = rec["n"] if rec else 0
+
+    previous = _last_seen.get(resource)
+    changed_at = previous.changed_at if previous else None
+    if previous is not None and previous.count != count:
+        changed_at = datetime.now().astimezone()
+    version = _Version(count, updated_at, deleted_at, changed_at)
+    _versions[resource] = version
+    _last_seen[resource] = version
+    return version
+
+
+def validators_for(resource: str, version: _Version, request: Request) -> Validators:
+    """版 + パスとクエリ（ページや絞り込みごとに別の ETag）から検証子を作る。"""
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    seed = f"{resource}|{version.token()}|{request.url.path}?{query}"
+    etag = 'W/"' + hashlib.sha1(seed.encode("utf-8")).hexdigest()[:20] + '"'
+    return Validators(etag, version.last_modified)
+
+
+def conditional_get(resource: str):
+    """
+    依存関係を返す。検証子をレスポンスヘッダに付け、変わっていなければ NotModified を
+    投げる（本体・モデル組み立て・シリアライズは走らない）。
+    """
+    if resource not in RESOURCE_LABELS:
+        raise ValueError(f"unknown resource: {resource}")
+
+    async def dependency(request: Request, response: Response) -> Validators:
+        validators = validators_for(resource, await content_version(resource), request)
+        try:
+            check_not_modified(request, validators)
+        except NotModified:
+            _not_modified.inc(resource=resource)
+            raise
+        validators.apply(response)
+        return validators
+
+    return dependency
@@ -1,4 +1,7 @@
+from app.core.singleflight import single_flight
+from app.crud.availability import SlotEngine
 from app.crud.database import db
+from app.crud.pagination import fetch_page
 from fastapi import HTTPException, status
 from app.models.viewing import (
     AvailabilityWindow,
@@ -7,7 +10,7 @@ from app.models.viewing import (
     ViewingBooking,
     ViewingBookingCreate,
 )
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from uuid import uuid4
 from datetime import datetime, timedelta, timezone
 
@@ -31,6 +34,94 @@ def _native(neo_dt) -> datetime:
     return dt.astimezone(timezone.utc).replace(microsecond=0)
 
 
+async def _load_availability():
+    """スロットエンジン用: 今後の期間と、今後の有効予約の開始時刻。"""
+    async with db.read_session() as session:
+        res = await session.read(
+            "MATCH (w:AvailabilityWindow) WHERE w.ends_at >= datetime() "
+            "RETURN w.id AS id, w.starts_at AS s, w.ends_at AS e"
+        )
+        windows = [(r["id"], _native(r["s"]), _native(r["e"])) for r in res]
+        res = await session.read(
+            "MATCH (b:ViewingBooking {status: 'active'}) WHERE b.starts_at >= datetime() "
+            "RETURN b.starts_at AS s"
+        )
+        bookings = [_native(r["s"]) for r in res]
+    return windows, bookings
+
+
+# ----- トランザクションの作業関数（一時的なエラーではまるごとやり直される） -----
+async def _delete_window_tx(tx, window_id: str) -> bool:
+    result = await tx.run("MATCH (w:AvailabilityWindow {id: $id}) RETURN w", id=window_id)
+    rec = await result.single()
+    if not rec:
+        return False
+    w_ = rec["w"]
+    result = await tx.run(
+        """
+        MATCH (b:ViewingBooking {status: 'active'})
+        WHERE b.starts_at >= $s AND b.starts_at < $e
+        RETURN count(b) AS c
+        """,
+        s=w_["starts_at"], e=w_["ends_at"],
+    )
+    if (await result.single())["c"] > 0:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Cannot delete a window that has active bookings.",
+        )
+    await tx.run("MATCH (w:AvailabilityWindow {id: $id}) DETACH DELETE w", id=window_id)
+    return True
+
+
+async def _create_booking_tx(tx, booking_id: str, cancel_token: str, chosen: datetime, b):
+    # 重複チェックと作成を同じトランザクションで行う
+    result = await tx.run(
+        "MATCH (b:ViewingBooking {email: $email, status: 'active'}) RETURN b LIMIT 1",
+        email=b.email,
+    )
+    if await result.single():
+        raise HTTPException(
+            status_code=400,
+            detail="You already have an active booking. Please cancel it before booking another time.",
+        )
+    result = await tx.run(
+        """
+        CREATE (b:ViewingBooking {
+            id: $id,
+            starts_at: datetime($s),
+            name: $name,
+            email: $email,
+            phone: $phone,
+            status: 'active',
+            cancel_token: $token,
+            created_at: datetime()
+        })
+        RETURN b
+        """,
+        id=booking_id, s=chosen.isoformat(), name=b.name, email=b.email,
+        phone=b.phone, token=cancel_token,
+    )
+    return await result.single()
+
+
+async def _cancel_booking_tx(tx, token: str):
+    result = await tx.run(
+        """
+        MATCH (b:ViewingBooking {cancel_token: $t})
+        WITH b, b.status <> 'cancelled' AS was_active
+        FOREACH (_ IN CASE WHEN was_active THEN [1] ELSE [] END |
+            SET b.status = 'cancelled', b.cancelled_at = datetime())
+        RETURN b, was_active
+        """,
+        t=token,
+    )
+    return await result.single()
+
+
+slot_engine = SlotEngine(_load_availability, slot_minutes=SLOT_MINUTES)
+
+
 class ViewingCRUD:
     # ===== Availability windows (admin) =====
     @staticmethod
@@ -41,9 +132,9 @@ class ViewingCRUD:
             raise HTTPException(status_code=400, detail="End must be after start.")
         if (end - start) < timedelta(minutes=SLOT_MINUTES):
             raise HTTPException(status_code=400, detail="Window must be at least 30 minutes.")
-        with db.get_session() as session:
+        async with db.write_session() as session:
             wid = str(uuid4())
-            rec = session.run(
+            rec = await session.write_one(
                 """
                 CREATE (w:AvailabilityWindow {
                     id: $id,
@@ -54,10 +145,11 @@ class ViewingCRUD:
                 RETURN w
                 """,
                 id=wid, s=start.isoformat(), e=end.isoformat(),
-            ).single()
+            )
             if not rec:
                 raise HTTPException(status_code=500, detail="Failed to create window.")
             w_ = rec["w"]
+            slot_engine.add_window(wid, start, end)
             return AvailabilityWindow(
                 id=w_["id"],
                 starts_at=_native(w_["starts_at"]).isoformat(),
@@ -67,9 +159,9 @@ class ViewingCRUD:
 
     @staticmethod
     async def get_windows(upcoming_only: bool = True) -> List[AvailabilityWindow]:
-        with db.get_session() as session:
+        async with db.read_session() as session:
             where = "WHERE w.ends_at >= datetime()" if upcoming_only else ""
-            res = session.run(
+            res = await session.read(
                 f"MATCH (w:AvailabilityWindow) {where} RETURN w ORDER BY w.starts_at ASC"
             )
             out = []
@@ -88,110 +180,59 @@ class ViewingCRUD:
     @staticmethod
     async def delete_window(window_id: str) -> bool:
         """期間内に有効な予約があれば削除拒否(409)。存在しなければ False。"""
-        with db.get_session() as session:
-            rec = session.run(
-                "MATCH (w:AvailabilityWindow {id: $id}) RETURN w", id=window_id
-            ).single()
-            if not rec:
-                return False
-            w_ = rec["w"]
-            start = _native(w_["starts_at"])
-            end = _native(w_["ends_at"])
-            cnt = session.run(
-                """
-                MATCH (b:ViewingBooking {status: 'active'})
-                WHERE b.starts_at >= datetime($s) AND b.starts_at < datetime($e)
-                RETURN count(b) AS c
-                """,
-                s=start.isoformat(), e=end.isoformat(),
-            ).single()["c"]
-            if cnt > 0:
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail="Cannot delete a window that has active bookings.",
-                )
-            session.run(
-                "MATCH (w:AvailabilityWindow {id: $id}) DETACH DELETE w", id=window_id
-            )
-            return True
+        async with db.write_session() as session:
+            found = await session.execute_write(_delete_window_tx, window_id)
+        if found:
+            slot_engine.remove_window(window_id)
+        return found
 
     # ===== Derived 30-min slots (公開) =====
     @staticmethod
-    async def get_available_slots() -> List[AvailabilitySlot]:
-        windows = await ViewingCRUD.get_windows(upcoming_only=True)
-
-        # 有効予約の開始時刻ごとの件数
-        counts = {}
-        with db.get_session() as session:
-            res = session.run(
-                "MATCH (b:ViewingBooking {status: 'active'}) RETURN b.starts_at AS s"
-            )
-            for r in res:
-                if r["s"] is None:
-                    continue
-                key = _native(r["s"]).isoformat()
-                counts[key] = counts.get(key, 0) + 1
-
+    @single_flight("viewing.get_available_slots")
+    async def get_available_slots(
+        starts_from: Optional[str] = None, starts_to: Optional[str] = None
+    ) -> List[AvailabilitySlot]:
+        """
+        現在以降の 30 分枠（予約数つき・開始時刻の昇順）。
+        starts_from/starts_to は ISO 文字列で、枠の開始時刻で絞り込む（to は含まない）。
+        """
+        try:
+            lo = _parse_iso(starts_from) if starts_from else None
+            hi = _parse_iso(starts_to) if starts_to else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid date range.")
         now = datetime.now(timezone.utc).replace(microsecond=0)
-        step = timedelta(minutes=SLOT_MINUTES)
-        seen = set()
-        slots: List[AvailabilitySlot] = []
-        for w in windows:
-            start = _parse_iso(w.starts_at)
-            end = _parse_iso(w.ends_at)
-            cur = start
-            while cur + step <= end:
-                key = cur.isoformat()
-                if cur >= now and key not in seen:
-                    seen.add(key)
-                    slots.append(AvailabilitySlot(starts_at=key, booking_count=counts.get(key, 0)))
-                cur += step
-        slots.sort(key=lambda s: s.starts_at)
-        return slots
+        lo = max(lo, now) if lo else now
+
+        await slot_engine.ensure_loaded()
+        return [
+            AvailabilitySlot(starts_at=start.isoformat(), booking_count=count)
+            for start, count in slot_engine.slots(lo, hi)
+        ]
 
     # ===== Bookings =====
     @staticmethod
     async def create_booking(b: ViewingBookingCreate) -> Tuple[ViewingBooking, str]:
-        chosen = _parse_iso(b.starts_at)
+        try:
+            chosen = _parse_iso(b.starts_at)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Selected time is not available.")
 
         # 選択枠が「現在提示中の有効スロット」に含まれるか検証
-        valid = {s.starts_at for s in await ViewingCRUD.get_available_slots()}
-        if chosen.isoformat() not in valid:
+        await slot_engine.ensure_loaded()
+        if not slot_engine.is_available(chosen):
             raise HTTPException(status_code=400, detail="Selected time is not available.")
 
-        with db.get_session() as session:
-            existing = session.run(
-                "MATCH (b:ViewingBooking {email: $email, status: 'active'}) RETURN b LIMIT 1",
-                email=b.email,
-            ).single()
-            if existing:
-                raise HTTPException(
-                    status_code=400,
-                    detail="You already have an active booking. Please cancel it before booking another time.",
-                )
-
-            booking_id = str(uuid4())
-            cancel_token = str(uuid4())
-            rec = session.run(
-                """
-                CREATE (b:ViewingBooking {
-                    id: $id,
-                    starts_at: datetime($s),
-                    name: $name,
-                    email: $email,
-                    phone: $phone,
-                    status: 'active',
-                    cancel_token: $token,
-                    created_at: datetime()
-                })
-                RETURN b
-                """,
-                id=booking_id, s=chosen.isoformat(), name=b.name, email=b.email,
-                phone=b.phone, token=cancel_token,
-            ).single()
+        booking_id = str(uuid4())
+        cancel_token = str(uuid4())
+        async with db.write_session() as session:
+            rec = await session.execute_write(
+                _create_booking_tx, booking_id, cancel_token, chosen, b
+            )
             if not rec:
                 raise HTTPException(status_code=500, detail="Failed to create booking.")
             bd = rec["b"]
+            slot_engine.add_booking(chosen)
             booking = ViewingBooking(
                 id=bd["id"],
                 starts_at=_native(bd["starts_at"]).isoformat(),
@@ -204,17 +245,37 @@ class ViewingCRUD:
             return booking, cancel_token
 
     @staticmethod
-    async def get_bookings() -> List[ViewingBooking]:
-        with db.get_session() as session:
-            res = session.run(
-                """
-                MATCH (b:ViewingBooking)
-                RETURN b
-                ORDER BY b.starts_at ASC, b.created_at ASC
-                """
+    async def get_bookings(
+        status: Optional[str] = None,
+        starts_from: Optional[str] = None,
+        starts_to: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[ViewingBooking], Optional[str]]:
+        """内見日時の昇順。starts_from/starts_to は ISO 文字列（to は含まない）。"""
+        filters, params = [], {}
+        if status is not None:
+            filters.append("b.status = $status")
+            params["status"] = status
+        try:
+            if starts_from is not None:
+                filters.append("b.starts_at >= datetime($starts_from)")
+                params["starts_from"] = _parse_iso(starts_from).isoformat()
+            if starts_to is not None:
+                filters.append("b.starts_at < datetime($starts_to)")
+                params["starts_to"] = _parse_iso(starts_to).isoformat()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid date range.")
+
+        async with db.read_session() as session:
+            # starts_at が無い古い予約は作成日時で並べる
+            records, next_cursor = await fetch_page(
+                session, "MATCH (b:ViewingBooking)", "b",
+                filters=filters, params=params, limit=limit, cursor=cursor,
+                sort_key="coalesce(b.starts_at, b.created_at)", descending=False,
             )
             out = []
-            for r in res:
+            for r in records:
                 bd = r["b"]
                 starts_at = bd.get("starts_at")
                 out.append(
@@ -229,14 +290,14 @@ class ViewingCRUD:
                         address_sent=bool(bd.get("address_sent_at")),
                     )
                 )
-            return out
+            return out, next_cursor
 
     @staticmethod
     async def get_booking(booking_id: str) -> ViewingBooking:
-        with db.get_session() as session:
-            rec = session.run(
+        async with db.read_session() as session:
+            rec = await session.read_one(
                 "MATCH (b:ViewingBooking {id: $id}) RETURN b", id=booking_id
-            ).single()
+            )
             if not rec:
                 raise HTTPException(status_code=404, detail="Booking not found.")
             bd = rec["b"]
@@ -254,28 +315,22 @@ class ViewingCRUD:
 
     @staticmethod
     async def mark_address_sent(booking_id: str) -> None:
-        with db.get_session() as session:
-            session.run(
+        async with db.write_session() as session:
+            await session.write(
                 "MATCH (b:ViewingBooking {id: $id}) SET b.address_sent_at = datetime()",
                 id=booking_id,
             )
 
     @staticmethod
     async def cancel_by_token(token: str) -> ViewingBooking:
-        with db.get_session() as session:
-            rec = session.run(
-                "MATCH (b:ViewingBooking {cancel_token: $t}) RETURN b", t=token
-            ).single()
+        async with db.write_session() as session:
+            rec = await session.execute_write(_cancel_booking_tx, token)
             if not rec:
                 raise HTTPException(status_code=404, detail="Booking not found.")
             bd = rec["b"]
-            if bd["status"] != "cancelled":
-                session.run(
-                    "MATCH (b:ViewingBooking {cancel_token: $t}) "
-                    "SET b.status = 'cancelled', b.cancelled_at = datetime()",
-                    t=token,
-                )
             starts_at = bd.get("starts_at")
+            if rec["was_active"] and starts_at:
+                slot_engine.remove_booking(_native(starts_at))
             return ViewingBooking(
                 id=bd["id"],
                 starts_at=_native(starts_at).isoformat() if starts_at else None,
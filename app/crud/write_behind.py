@@ -0,0 +1,149 @@
+"""
+カウンタの書き込みをプロセス内にためて、まとめて DB に流すバッファ（write-behind）。
+
+人気の記事への票は 1 つのノードのロックを取り合うので、1 票ごとに書き込むと
+往復とロック待ちがそのまま効いてくる。ここでは (key, field) ごとの増分を
+メモリに足し込み、一定間隔か、たまった票数がしきい値を超えたときに
+flush 関数へ 1 回で渡す。
+
+  - 読み取り側は pending() で未反映の増分を足して返す
+  - 書き込みに失敗した増分は捨てずに戻し、次の flush でやり直す
+  - stop() は残りを flush してから止まるので、通常の終了では票は失われない
+    （プロセスが落ちた場合は最大で 1 間隔ぶんが失われる）
+  - start() していなければ add() のたびにその場で flush する（スクリプト等）
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.core.metrics import Counter, Gauge
+
+Deltas = Dict[str, Dict[str, int]]
+
+_flushes = Counter(
+    "write_behind_flushes_total", "Write-behind buffer flushes.",
+    labelnames=("buffer", "outcome"),
+)
+_flushed = Counter(
+    "write_behind_flushed_total", "Increments written by write-behind buffers.",
+    labelnames=("buffer",),
+)
+
+
+class CounterBuffer:
+    def __init__(
+        self,
+        name: str,
+        flush: Callable[[Deltas], Awaitable[None]],
+        interval: float,
+        max_pending: int,
+    ):
+        self.name = name
+        self._flush_fn = flush
+        self.interval = interval
+        self.max_pending = max_pending
+        # key -> field -> 増分。_in_flight は書き込み中のもの（読み取りにはまだ足す）
+        self._pending: Deltas = {}
+        self._in_flight: Deltas = {}
+        self._size = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+        Gauge(
+            f"{name}_buffered", f"Increments buffered in {name} and not yet written.",
+            function=lambda: self._size,
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._task:
+            return
+        self._stopping = False
+        # Event / Lock はループに紐づくので、起動したループ上で作り直す
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """ループを止め、残っている増分を書き切る。"""
+        if not self._task:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        # flush の途中で切らないよう cancel はしない
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        try:
+            await self.flush()
+        except Exception as ex:  # noqa: BLE001
+            print(f"[{self.name}:error] final flush failed, {self._size} increments lost: {ex}")
+
+    async def add(self, key: str, field: str, amount: int = 1) -> None:
+        fields = self._pending.setdefault(key, {})
+        fields[field] = fields.get(field, 0) + amount
+        self._size += amount
+        if not self.running:
+            await self.flush()
+        elif self._size >= self.max_pending:
+            self._wakeup.set()
+
+    def pending(self, key: str) -> Dict[str, int]:
+        """key のまだ DB に反映されていない増分（書き込み中のものを含む）。"""
+        out: Dict[str, int] = {}
+        for deltas in (self._in_flight, self._pending):
+            for field, amount in deltas.get(key, {}).items():
+                out[field] = out.get(field, 0) + amount
+        return out
+
+    async def flush(self) -> int:
+        """たまっている増分を 1 回で書き込み、書いた増分の合計を返す。"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            size, self._size = self._size, 0
+            self._in_flight = batch
+            try:
+                await self._flush_fn(batch)
+            except Exception:
+                _flushes.inc(buffer=self.name, outcome="error")
+                # 次の flush でやり直せるよう戻す（その間に来た増分と合算）
+                self._merge_back(batch)
+                self._size += size
+                raise
+            finally:
+                self._in_flight = {}
+        _flushes.inc(buffer=self.name, outcome="ok")
+        _flushed.inc(size, buffer=self.name)
+        return size
+
+    def _merge_back(self, batch: Deltas) -> None:
+        for key, fields in batch.items():
+            current = self._pending.setdefault(key, {})
+            for field, amount in fields.items():
+                current[field] = current.get(field, 0) + amount
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as ex:  # noqa: BLE001
+                print(f"[{self.name}:error] flush failed, will retry: {ex}")
+
+
+def rows(batch: Deltas, fields: List[str], key_name: str = "key") -> List[dict]:
+    """UNWIND 用に {key_name: key, field: 増分, ...} の行へ展開する。"""
+    return [
+        {key_name: key, **{f: deltas.get(f, 0) for f in fields}}
+        for key, deltas in batch.items()
+    ]
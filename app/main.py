@@ -1,6 +1,14 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import auth, users, events, jobs, products, properties, stores, news, blogs, viewing, board, contact, guide_reactions  # 必要に応じてモジュール名を変更
+from fastapi.responses import JSONResponse
+from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
+from app.routers import auth, users, events, jobs, products, properties, stores, news, blogs, viewing, board, contact, guide_reactions, metrics, outbox, search  # 必要に応じてモジュール名を変更
+from app.crud.database import TransactionRetriesExhausted, db
+from app.crud.schema import apply_migrations
+from app.core.http_cache import NotModified
+from app.crud.guide_reaction import reaction_buffer
+from app.crud import suggest
+from app.core.outbox import worker as outbox_worker
 from dotenv import load_dotenv
 import os
 
@@ -16,6 +24,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 一覧APIの次ページカーソルと、条件付き GET 用の ETag
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
 )
 
 # ルーターを登録
@@ -32,6 +42,90 @@ app.include_router(viewing.router)
 app.include_router(board.router)
 app.include_router(contact.router)
 app.include_router(guide_reactions.router)
+app.include_router(metrics.router)
+app.include_router(outbox.router)
+app.include_router(search.router)
+
+async def database_unavailable(request: Request, exc: Exception):
+    # リトライし尽くしても一時的なエラーのままなら 500 ではなく 503 で再試行を促す
+    print(f"[db:error] {request.method} {request.url.path}: {type(exc).__name__}: {exc}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database is temporarily unavailable. Please retry."},
+        headers={"Retry-After": "1"},
+    )
+
+
+async def not_modified(request: Request, exc: NotModified):
+    # 条件付き GET で変化なし。本文なしで検証子だけ返す
+    return Response(status_code=304, headers=exc.headers)
+
+
+app.add_exception_handler(NotModified, not_modified)
+
+for _exc in (TransactionRetriesExhausted, TransientError, ServiceUnavailable, SessionExpired):
+    app.add_exception_handler(_exc, database_unavailable)
+
+
+@app.on_event("startup")
+async def connect_database():
+    # 最初のユーザーに接続コストを払わせないよう、起動時に接続を確認してプールを温める。
+    # 失敗しても API は起動させる（最初のセッションを開くときに改めて接続する）。
+    try:
+        await db.start()
+    except Exception as ex:  # noqa: BLE001
+        print(f"[db:error] warm-up failed: {ex}")
+
+
+@app.on_event("startup")
+async def migrate_schema():
+    # 制約・インデックスを用意（適用済みならマーカーを見て何もしない）。
+    # DB に届かなくても API 自体は起動させ、次回起動時に再試行する。
+    if os.getenv("SCHEMA_AUTO_MIGRATE", "true").lower() != "true":
+        return
+    try:
+        await apply_migrations()
+    except Exception as ex:  # noqa: BLE001
+        print(f"[schema:error] migration failed: {ex}")
+
+
+@app.on_event("startup")
+async def build_suggest_index():
+    # /suggest の索引を DB の全件から作る。失敗しても API は起動させる（候補が出ないだけ）
+    try:
+        await suggest.rebuild()
+    except Exception as ex:  # noqa: BLE001
+        print(f"[suggest:error] index build failed: {ex}")
+
+
+@app.on_event("startup")
+async def start_outbox_worker():
+    # Outbox に積まれたメールを送るバックグラウンドワーカー
+    outbox_worker.start()
+
+
+@app.on_event("startup")
+async def start_reaction_buffer():
+    # ガイド記事の票をためてまとめて書き込むループ
+    reaction_buffer.start()
+
+
+@app.on_event("shutdown")
+async def stop_outbox_worker():
+    await outbox_worker.stop()
+
+
+@app.on_event("shutdown")
+async def flush_reaction_buffer():
+    # たまっている票を書き切ってから DB を閉じる
+    await reaction_buffer.stop()
+
+
+@app.on_event("shutdown")
+async def close_database():
+    # Outbox ワーカーと票のバッファを止めた後に閉じる（登録順に実行される）
+    await db.close()
+
 
 @app.get("/")
 async def root():
@@ -4,8 +4,9 @@ from .job import Job, JobCreate, JobUpdate
 from .product import Product, ProductCreate, ProductUpdate
 from .property import Property, PropertyCreate, PropertyUpdate
 from .store import Store, StoreCreate, StoreUpdate
-from .news import News, NewsCreate, NewsUpdate
-from .blog import Blog, BlogCreate, BlogUpdate
+from .news import News, NewsCreate, NewsSummary, NewsUpdate
+from .blog import Blog, BlogCreate, BlogSummary, BlogUpdate
+from .search import SearchHit, Suggestion
 
 __all__ = [
     "User", "UserCreate", "UserUpdate",
@@ -14,6 +15,7 @@ __all__ = [
     "Product", "ProductCreate", "ProductUpdate",
     "Property", "PropertyCreate", "PropertyUpdate",
     "Store", "StoreCreate", "StoreUpdate",
-    "News", "NewsCreate", "NewsUpdate",
-    "Blog", "BlogCreate", "BlogUpdate",
+    "News", "NewsCreate", "NewsSummary", "NewsUpdate",
+    "Blog", "BlogCreate", "BlogSummary", "BlogUpdate",
+    "SearchHit", "Suggestion",
 ]
@@ -26,6 +26,18 @@ class Blog(BlogBase):
         orm_mode = True
 
 
+class BlogSummary(BaseModel):
+    """一覧ページ用。本文（content）を含まない。"""
+    id: str
+    title: str
+    excerpt: Optional[str] = None
+    category: str
+    image: Optional[str] = None
+    publishDate: Optional[str] = None
+    status: str = "published"
+    created_at: str
+
+
 class BlogUpdate(BaseModel):
     title: Optional[str] = None
     content: Optional[str] = None
@@ -28,6 +28,20 @@ class News(NewsBase):
         orm_mode = True
 
 
+class NewsSummary(BaseModel):
+    """一覧ページ用。本文（content）を含まない。"""
+    id: str
+    title: str
+    excerpt: Optional[str] = None
+    category: str
+    image: Optional[str] = None
+    author: Optional[str] = None
+    tags: Optional[List[str]] = None
+    publishDate: Optional[str] = None
+    status: str = "published"
+    created_at: str
+
+
 class NewsUpdate(BaseModel):
     title: Optional[str] = None
     content: Optional[str] = None
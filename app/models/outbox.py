@@ -0,0 +1,30 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+# pending: 送信待ち / sending: ワーカーが処理中 / sent: 送信済み
+# failed: リトライ上限到達 / skipped: 送信経路が未設定
+OUTBOX_STATUSES = ["pending", "sending", "sent", "failed", "skipped"]
+
+
+class OutboxMessage(BaseModel):
+    id: str
+    to: List[str]
+    subject: str
+    reply_to: Optional[str] = None
+    status: str = "pending"
+    attempts: int = 0
+    last_error: Optional[str] = None
+    created_at: str
+    next_attempt_at: Optional[str] = None
+    sent_at: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+
+class OutboxStats(BaseModel):
+    pending: int = 0
+    sending: int = 0
+    sent: int = 0
+    failed: int = 0
+    skipped: int = 0
@@ -0,0 +1,18 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class SearchHit(BaseModel):
+    type: str  # events, stores, news, blogs, jobs, products, properties
+    id: str
+    title: str
+    snippet: Optional[str] = None  # HTML エスケープ済み。一致箇所は <mark> で囲む
+    status: Optional[str] = None
+    score: float
+
+
+class Suggestion(BaseModel):
+    type: str  # stores, events, jobs, products
+    id: str
+    field: str  # title、求人は company も
+    text: str
@@ -3,6 +3,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
 from ..core.security import create_access_token, get_current_user
 from ..core.email import admin_emails
+from ..core.google_auth import GoogleCertsUnavailable, google_verifier
 from ..crud.users import UserCRUD
 from ..models.auth import Token
 from pydantic import BaseModel
@@ -80,19 +81,19 @@ async def google_login(data: GoogleLoginRequest):
             detail="Google login is not configured (GOOGLE_CLIENT_ID missing).",
         )
 
-    # Imported lazily so the rest of the app works even before google-auth is installed.
+    # Certificates are cached per max-age and the signature is checked locally, off the event loop.
+    # google-auth is imported lazily so the rest of the app works even before it is installed.
     try:
-        from google.oauth2 import id_token as google_id_token
-        from google.auth.transport import requests as google_requests
+        idinfo = await google_verifier.verify_async(data.credential, GOOGLE_CLIENT_ID)
     except ImportError:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Server missing google-auth dependency.",
         )
-
-    try:
-        idinfo = google_id_token.verify_oauth2_token(
-            data.credential, google_requests.Request(), GOOGLE_CLIENT_ID
+    except GoogleCertsUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Google sign-in is temporarily unavailable.",
         )
     except Exception:
         raise HTTPException(
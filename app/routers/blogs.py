@@ -1,29 +1,84 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from ..models.blog import Blog, BlogCreate
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse
+from typing import List, Optional
+from ..models.blog import Blog, BlogCreate, BlogSummary
 from ..models import User
 from ..crud.blogs import BlogCRUD
+from ..crud.pagination import MAX_LIMIT, next_cursor_headers
+from ..crud.projection import parse_fields
+from ..core.http_cache import Validators
+from ..core.response_cache import CachedResponse, response_cache
+from ..crud.versions import conditional_get
 from app.core.security import get_current_user
 
 router = APIRouter()
 
 
 @router.get("/blogs/", response_model=List[Blog])
-async def get_blogs():
+async def get_blogs(
+    request: Request,
+    category: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    validators: Validators = Depends(conditional_get("blogs")),
+):
     """
-    Retrieve the list of all blog posts.
+    Retrieve blog posts, newest publish date first. Filter by category and status.
+    The next page cursor is returned in X-Next-Cursor.
     """
-    items = await BlogCRUD.get_all()
-    if not items:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No blogs found.")
-    return items
+    async def build():
+        items, next_cursor = await BlogCRUD.get_all(
+            category=category, status=status_filter, limit=limit, cursor=cursor
+        )
+        if not items:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No blogs found.")
+        return CachedResponse.json(items, next_cursor_headers(next_cursor))
+
+    return await response_cache("blogs").respond(request, build, validators)
+
+
+@router.get("/blogs/summary", response_model=List[BlogSummary])
+async def get_blogs_summary(
+    request: Request,
+    category: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    validators: Validators = Depends(conditional_get("blogs")),
+):
+    """
+    Same order and filters as /blogs/, but without the HTML content (for index pages).
+    Declared before /blogs/{blog_id} so "summary" is not taken as an ID.
+    """
+    async def build():
+        items, next_cursor = await BlogCRUD.get_summaries(
+            category=category, status=status_filter, limit=limit, cursor=cursor
+        )
+        if not items:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No blogs found.")
+        return CachedResponse.json(items, next_cursor_headers(next_cursor))
+
+    return await response_cache("blogs").respond(request, build, validators)
 
 
 @router.get("/blogs/{blog_id}", response_model=Blog)
-async def get_blog_by_id(blog_id: str):
+async def get_blog_by_id(
+    blog_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+    validators: Validators = Depends(conditional_get("blogs")),
+):
     """
-    Retrieve a specific blog post by ID.
+    Retrieve a specific blog post by ID. ?fields=title,excerpt returns only those fields.
     """
+    projected = parse_fields(fields, Blog)
+    if projected is not None:
+        row = await BlogCRUD.get_fields(blog_id, projected)
+        if not row:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Blog not found.")
+        response = JSONResponse(row)
+        validators.apply(response)
+        return response
     item = await BlogCRUD.get_by_id(blog_id)
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Blog not found.")
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from typing import List, Optional
 
 from ..models.board import (
@@ -11,8 +11,10 @@ from ..models.board import (
     ReactionState,
 )
 from ..crud.board import BoardCRUD
+from ..crud.pagination import MAX_LIMIT, next_cursor_headers
 from ..core.security import get_current_user, get_optional_user
 from ..core.email import admin_emails
+from ..core.http_cache import conditional_json
 
 router = APIRouter(prefix="/board", tags=["board"])
 
@@ -23,9 +25,14 @@ def _is_admin(user) -> bool:
 
 # ----- Posts -------------------------------------------------------------
 @router.get("/posts", response_model=List[BoardPostSummary])
-async def list_posts():
-    """公開: 投稿一覧（新着順・コメント数/リアクション数つき）。"""
-    return await BoardCRUD.list_posts()
+async def list_posts(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+):
+    """公開: 投稿一覧（新着順・コメント数/リアクション数つき）。次ページのカーソルは X-Next-Cursor。ETag 付き。"""
+    posts, next_cursor = await BoardCRUD.list_posts(limit=limit, cursor=cursor)
+    return conditional_json(request, posts, headers=next_cursor_headers(next_cursor))
 
 
 @router.post("/posts", response_model=BoardPostDetail, status_code=status.HTTP_201_CREATED)
@@ -39,10 +46,12 @@ async def create_post(post: BoardPostCreate, current_user=Depends(get_current_us
 
 
 @router.get("/posts/{post_id}", response_model=BoardPostDetail)
-async def get_post(post_id: str, current_user=Depends(get_optional_user)):
-    """公開: 投稿詳細（本文＋コメント＋リアクション）。ログイン時は自分の反応/削除可否も返す。"""
+async def get_post(request: Request, post_id: str, current_user=Depends(get_optional_user)):
+    """公開: 投稿詳細（本文＋コメント＋リアクション）。ログイン時は自分の反応/削除可否も返す。ETag 付き。"""
     email = current_user.email if current_user else None
-    return await BoardCRUD.get_post(post_id, email, _is_admin(current_user))
+    post = await BoardCRUD.get_post(post_id, email, _is_admin(current_user))
+    # 本文がユーザーごとに変わるので共有キャッシュには置かせない
+    return conditional_json(request, post, cache_control="private, no-cache")
 
 
 @router.delete("/posts/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException
 import os
 
 from ..models.contact import ContactRequest
-from ..core.email import send_email, admin_emails
+from ..core.email import admin_emails
+from ..core.outbox import enqueue_email
 
 router = APIRouter(prefix="/contact", tags=["contact"])
 
@@ -23,8 +24,9 @@ async def submit_contact(req: ContactRequest):
     if not name or not message:
         raise HTTPException(status_code=400, detail="お名前とお問い合わせ内容は必須です。")
 
-    # admin へ通知（ここが失敗したら問い合わせは届かないのでエラーを返す）
-    ok = send_email(
+    # admin へ通知。Outbox に保存できた時点で受付完了とし、送信・再試行はワーカーに任せる
+    # （保存に失敗した場合は例外がそのまま 500 になる）
+    await enqueue_email(
         admin_emails(),
         f"【お問い合わせ】{PROPERTY_NAME} に質問が届きました",
         (
@@ -38,14 +40,9 @@ async def submit_contact(req: ContactRequest):
         ),
         reply_to=req.email,
     )
-    if not ok:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail="メール送信に失敗しました。時間をおいて再度お試しください。",
-        )
-
-    # 送信者へ自動返信（ベストエフォート・失敗してもOK）
-    send_email(
+
+    # 送信者へ自動返信
+    await enqueue_email(
         [req.email],
         f"【{PROPERTY_NAME}】お問い合わせありがとうございます",
         (
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import List, Optional
 from ..models import Event, EventCreate, EventUpdate, User
 from ..crud.events import EventCRUD
+from ..crud.pagination import MAX_LIMIT, next_cursor_headers
+from ..core.http_cache import Validators
+from ..core.response_cache import CachedResponse, response_cache
+from ..crud.versions import conditional_get
 from app.core.security import get_current_user
 
 router = APIRouter()
@@ -28,18 +32,36 @@ async def create_event(
 
 
 @router.get("/events/", response_model=List[Event])
-async def get_events():
+async def get_events(
+    request: Request,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    validators: Validators = Depends(conditional_get("events")),
+):
     """
-    Retrieve the list of all events.
+    Retrieve events, newest first. Filter by status and eventDate range
+    (from/to, YYYY-MM-DD). The next page cursor is returned in X-Next-Cursor.
     """
-    events = await EventCRUD.get_all()
-    if not events:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No events found.")
-    return events
+    async def build():
+        events, next_cursor = await EventCRUD.get_all(
+            status=status_filter, date_from=date_from, date_to=date_to,
+            limit=limit, cursor=cursor,
+        )
+        if not events:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No events found.")
+        return CachedResponse.json(events, next_cursor_headers(next_cursor))
+
+    return await response_cache("events").respond(request, build, validators)
 
 
 @router.get("/events/{event_id}", response_model=Event)
-async def get_event(event_id: str):
+async def get_event(
+    event_id: str,
+    validators: Validators = Depends(conditional_get("events")),
+):
     """
     Retrieve a specific event by ID.
     """
@@ -1,15 +1,28 @@
-from fastapi import APIRouter
+from typing import List
+
+from fastapi import APIRouter, Query, Request
 
 from ..models.guide_reaction import GuideReactionState, GuideReactionRequest
 from ..crud.guide_reaction import GuideReactionCRUD
+from ..core.http_cache import conditional_json
 
 router = APIRouter(prefix="/guide-reactions", tags=["guide-reactions"])
 
 
+@router.get("", response_model=List[GuideReactionState])
+async def get_reactions_batch(
+    request: Request,
+    slugs: str = Query(..., description="カンマ区切りの slug（最大 100 件）"),
+):
+    """公開: 複数記事の good/bad 累計を指定順で返す（記事一覧ページ用）。ETag 付き。"""
+    states = await GuideReactionCRUD.get_counts_many(slugs.split(","))
+    return conditional_json(request, states)
+
+
 @router.get("/{slug}", response_model=GuideReactionState)
-async def get_reactions(slug: str):
-    """公開: 記事(slug)の good/bad 累計を返す。"""
-    return await GuideReactionCRUD.get_counts(slug)
+async def get_reactions(request: Request, slug: str):
+    """公開: 記事(slug)の good/bad 累計を返す。ETag 付き。"""
+    return conditional_json(request, await GuideReactionCRUD.get_counts(slug))
 
 
 @router.post("/{slug}", response_model=GuideReactionState)
@@ -1,22 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import List, Optional
 from ..models.job import Job, JobCreate
 from ..models import User
 from ..crud.jobs import JobCRUD
+from ..crud.pagination import MAX_LIMIT, next_cursor_headers
+from ..core.http_cache import Validators
+from ..core.response_cache import CachedResponse, response_cache
+from ..crud.versions import conditional_get
 from app.core.security import get_current_user
 
 router = APIRouter()
 
 
 @router.get("/jobs/", response_model=List[Job])
-async def get_jobs():
+async def get_jobs(
+    request: Request,
+    job_type: Optional[str] = Query(None, alias="jobType"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    validators: Validators = Depends(conditional_get("jobs")),
+):
     """
-    Retrieve the list of all jobs.
+    Retrieve jobs, newest first. Filter by jobType and status.
+    The next page cursor is returned in X-Next-Cursor.
     """
-    jobs = await JobCRUD.get_all()
-    if not jobs:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No jobs found.")
-    return jobs
+    async def build():
+        jobs, next_cursor = await JobCRUD.get_all(
+            job_type=job_type, status=status_filter, limit=limit, cursor=cursor
+        )
+        if not jobs:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No jobs found.")
+        return CachedResponse.json(jobs, next_cursor_headers(next_cursor))
+
+    return await response_cache("jobs").respond(request, build, validators)
 
 
 @router.post("/jobs/", response_model=Job, status_code=status.HTTP_201_CREATED)
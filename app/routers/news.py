@@ -1,29 +1,84 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from ..models.news import News, NewsCreate
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse
+from typing import List, Optional
+from ..models.news import News, NewsCreate, NewsSummary
 from ..models import User
 from ..crud.news import NewsCRUD
+from ..crud.pagination import MAX_LIMIT, next_cursor_headers
+from ..crud.projection import parse_fields
+from ..core.http_cache import Validators
+from ..core.response_cache import CachedResponse, response_cache
+from ..crud.versions import conditional_get
 from app.core.security import get_current_user
 
 router = APIRouter()
 
 
 @router.get("/news/", response_model=List[News])
-async def get_news():
+async def get_news(
+    request: Request,
+    category: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    validators: Validators = Depends(conditional_get("news")),
+):
     """
-    Retrieve the list of all news.
+    Retrieve news, newest publish date first. Filter by category and status.
+    The next page cursor is returned in X-Next-Cursor.
     """
-    items = await NewsCRUD.get_all()
-    if not items:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No news found.")
-    return items
+    async def build():
+        items, next_cursor = await NewsCRUD.get_all(
+            category=category, status=status_filter, limit=limit, cursor=cursor
+        )
+        if not items:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No news found.")
+        return CachedResponse.json(items, next_cursor_headers(next_cursor))
+
+    return await response_cache("news").respond(request, build, validators)
+
+
+@router.get("/news/summary", response_model=List[NewsSummary])
+async def get_news_summary(
+    request: Request,
+    category: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    validators: Validators = Depends(conditional_get("news")),
+):
+    """
+    Same order and filters as /news/, but without the HTML content (for index pages).
+    Declared before /news/{news_id} so "summary" is not taken as an ID.
+    """
+    async def build():
+        items, next_cursor = await NewsCRUD.get_summaries(
+            category=category, status=status_filter, limit=limit, cursor=cursor
+        )
+        if not items:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No news found.")
+        return CachedResponse.json(items, next_cursor_headers(next_cursor))
+
+    return await response_cache("news").respond(request, build, validators)
 
 
 @router.get("/news/{news_id}", response_model=News)
-async def get_news_by_id(news_id: str):
+async def get_news_by_id(
+    news_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+    validators: Validators = Depends(conditional_get("news")),
+):
     """
-    Retrieve a specific news article by ID.
+    Retrieve a specific news article by ID. ?fields=title,excerpt returns only those fields.
     """
+    projected = parse_fields(fields, News)
+    if projected is not None:
+        row = await NewsCRUD.get_fields(news_id, projected)
+        if not row:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="News not found.")
+        response = JSONResponse(row)
+        validators.apply(response)
+        return response
     item = await NewsCRUD.get_by_id(news_id)
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="News not found.")
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from typing import List, Optional
+
+from ..models.outbox import OutboxMessage, OutboxStats
+from ..crud.outbox import OutboxCRUD
+from ..crud.pagination import DEFAULT_LIMIT, MAX_LIMIT, set_next_cursor
+from ..core.outbox import worker
+from ..core.security import get_admin_user
+
+router = APIRouter(prefix="/admin/outbox", tags=["outbox"])
+
+
+@router.get("", response_model=List[OutboxMessage])
+async def list_messages(
+    response: Response,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    admin=Depends(get_admin_user),
+):
+    """Admin: 送信キューのメッセージ一覧（新しい順・status で絞り込み可）。"""
+    messages, next_cursor = await OutboxCRUD.list_messages(
+        status=status_filter, limit=limit, cursor=cursor
+    )
+    set_next_cursor(response, next_cursor)
+    return messages
+
+
+@router.get("/stats", response_model=OutboxStats)
+async def get_stats(admin=Depends(get_admin_user)):
+    """Admin: status ごとの件数。"""
+    return await OutboxCRUD.stats()
+
+
+@router.get("/{message_id}", response_model=OutboxMessage)
+async def get_message(message_id: str, admin=Depends(get_admin_user)):
+    """Admin: メッセージ 1 件の送信状況。"""
+    message = await OutboxCRUD.get(message_id)
+    if not message:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Message not found.")
+    return message
+
+
+@router.post("/{message_id}/retry", response_model=OutboxMessage)
+async def retry_message(message_id: str, admin=Depends(get_admin_user)):
+    """Admin: failed / skipped のメッセージを再送キューに戻す。"""
+    if not await OutboxCRUD.get(message_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Message not found.")
+    message = await OutboxCRUD.requeue(message_id)
+    if not message:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Only failed or skipped messages can be retried.",
+        )
+    worker.notify()
+    return message
@@ -1,22 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import List, Optional
 from ..models.product import Product, ProductCreate
 from ..models import User
 from ..crud.products import ProductCRUD
+from ..crud.pagination import MAX_LIMIT, next_cursor_headers
+from ..core.http_cache import Validators
+from ..core.response_cache import CachedResponse, response_cache
+from ..crud.versions import conditional_get
 from app.core.security import get_current_user
 
 router = APIRouter()
 
 
 @router.get("/products/", response_model=List[Product])
-async def get_products():
+async def get_products(
+    request: Request,
+    category: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    validators: Validators = Depends(conditional_get("products")),
+):
     """
-    Retrieve the list of all products.
+    Retrieve products, newest first. Filter by category and status.
+    The next page cursor is returned in X-Next-Cursor.
     """
-    products = await ProductCRUD.get_all()
-    if not products:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No products found.")
-    return products
+    async def build():
+        products, next_cursor = await ProductCRUD.get_all(
+            category=category, status=status_filter, limit=limit, cursor=cursor
+        )
+        if not products:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No products found.")
+        return CachedResponse.json(products, next_cursor_headers(next_cursor))
+
+    return await response_cache("products").respond(request, build, validators)
 
 
 @router.post("/products/", response_model=Product, status_code=status.HTTP_201_CREATED)
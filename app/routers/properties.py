@@ -1,22 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import List, Optional
 from ..models.property import Property, PropertyCreate
 from ..models import User
 from ..crud.properties import PropertyCRUD
+from ..crud.pagination import MAX_LIMIT, next_cursor_headers
+from ..core.http_cache import Validators
+from ..core.response_cache import CachedResponse, response_cache
+from ..crud.versions import conditional_get
 from app.core.security import get_current_user
 
 router = APIRouter()
 
 
 @router.get("/properties/", response_model=List[Property])
-async def get_properties():
+async def get_properties(
+    request: Request,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    validators: Validators = Depends(conditional_get("properties")),
+):
     """
-    Retrieve the list of all properties.
+    Retrieve properties, newest first. Filter by status.
+    The next page cursor is returned in X-Next-Cursor.
     """
-    properties = await PropertyCRUD.get_all()
-    if not properties:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No properties found.")
-    return properties
+    async def build():
+        properties, next_cursor = await PropertyCRUD.get_all(
+            status=status_filter, limit=limit, cursor=cursor
+        )
+        if not properties:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No properties found.")
+        return CachedResponse.json(properties, next_cursor_headers(next_cursor))
+
+    return await response_cache("properties").respond(request, build, validators)
 
 
 @router.post("/properties/", response_model=Property, status_code=status.HTTP_201_CREATED)
@@ -0,0 +1,55 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Response, status
+
+from ..models.search import SearchHit, Suggestion
+from ..crud.search import SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT, SearchCRUD
+from ..crud.pagination import set_next_cursor
+from ..crud.suggest import SUGGEST_FIELDS, typeahead
+
+router = APIRouter(tags=["search"])
+
+
+@router.get("/search", response_model=List[SearchHit])
+async def search(
+    response: Response,
+    q: str = Query(..., description="検索語（空白区切りはすべて含むものを返す）"),
+    types: Optional[str] = Query(
+        None, description="カンマ区切りの種類（stores, jobs, products, properties, events, news, blogs）"
+    ),
+    limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+    cursor: Optional[str] = None,
+):
+    """
+    Full-text search across all public listings, best match first.
+    Each hit carries its type and an HTML-escaped snippet with matches wrapped in <mark>.
+    The next page cursor is returned in X-Next-Cursor.
+    """
+    hits, next_cursor = await SearchCRUD.search(
+        q, types=types.split(",") if types else None, limit=limit, cursor=cursor
+    )
+    set_next_cursor(response, next_cursor)
+    return hits
+
+
+@router.get("/suggest", response_model=List[Suggestion])
+async def suggest(
+    q: str = Query(..., max_length=50, description="入力中の文字列"),
+    types: Optional[str] = Query(None, description="カンマ区切りの種類（stores, events, jobs, products）"),
+    limit: int = Query(8, ge=1, le=20),
+):
+    """
+    Typeahead suggestions for store, event, job (title and company) and product names,
+    answered from an in-memory index without touching the database.
+    """
+    kinds = [t.strip() for t in types.split(",")] if types else None
+    unknown = [k for k in kinds or () if k not in SUGGEST_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown type: {unknown[0]}. Allowed: {', '.join(SUGGEST_FIELDS)}.",
+        )
+    return [
+        Suggestion(type=m.kind, id=m.item_id, field=m.field, text=m.text)
+        for m in typeahead.suggest(q, kinds=kinds, limit=limit)
+    ]
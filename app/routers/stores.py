@@ -1,22 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import List, Optional
 from ..models.store import Store, StoreCreate
 from ..models import User
 from ..crud.stores import StoreCRUD
+from ..crud.pagination import MAX_LIMIT, next_cursor_headers
+from ..core.http_cache import Validators
+from ..core.response_cache import CachedResponse, response_cache
+from ..crud.versions import conditional_get
 from app.core.security import get_current_user
 
 router = APIRouter()
 
 
 @router.get("/stores/", response_model=List[Store])
-async def get_stores():
+async def get_stores(
+    request: Request,
+    main_genre: Optional[str] = Query(None, alias="mainGenre"),
+    sub_genre: Optional[str] = Query(None, alias="subGenre"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    validators: Validators = Depends(conditional_get("stores")),
+):
     """
-    Retrieve the list of all stores.
+    Retrieve stores, newest first. Filter by mainGenre, subGenre and status.
+    The next page cursor is returned in X-Next-Cursor.
     """
-    stores = await StoreCRUD.get_all()
-    if not stores:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No stores found.")
-    return stores
+    async def build():
+        stores, next_cursor = await StoreCRUD.get_all(
+            main_genre=main_genre, sub_genre=sub_genre, status=status_filter,
+            limit=limit, cursor=cursor,
+        )
+        if not stores:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No stores found.")
+        return CachedResponse.json(stores, next_cursor_headers(next_cursor))
+
+    return await response_cache("stores").respond(request, build, validators)
 
 
 @router.post("/stores/", response_model=Store, status_code=status.HTTP_201_CREATED)
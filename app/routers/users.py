@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import List, Optional
 from ..models import User, UserCreate, UserUpdate
 from ..crud.users import UserCRUD
+from ..crud.pagination import MAX_LIMIT, next_cursor_headers
+from ..core.http_cache import conditional_json
 from app.core.security import get_current_user
 
 router = APIRouter()
@@ -27,25 +29,34 @@ async def create_user(user: UserCreate):
 
 
 @router.get("/users/", response_model=List[User])
-async def get_users():
+async def get_users(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+):
     """
-    Retrieve the list of all users.
+    Retrieve users, newest first. The next page cursor is returned in X-Next-Cursor.
+    Responses carry an ETag and answer If-None-Match with 304.
     """
-    users = await UserCRUD.get_all()
+    users, next_cursor = await UserCRUD.get_all(limit=limit, cursor=cursor)
     if not users:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No users found.")
-    return users
+    return conditional_json(
+        request, users, cache_control="private, no-cache",
+        headers=next_cursor_headers(next_cursor),
+    )
 
 
 @router.get("/users/{user_id}", response_model=User)
-async def get_user(user_id: int):
+async def get_user(request: Request, user_id: int):
     """
     Retrieve a specific user by ID.
+    Responses carry an ETag and answer If-None-Match with 304.
     """
     user = await UserCRUD.get_by_id(user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found.")
-    return user
+    return conditional_json(request, user, cache_control="private, no-cache")
 
 
 @router.put("/users/{user_id}", response_model=User)
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from typing import List, Optional
 from datetime import datetime, timezone
+import asyncio
 import os
 
 try:
@@ -50,8 +51,11 @@ from ..models.viewing import (
     CancelRequest,
 )
 from ..crud.viewing import ViewingCRUD
+from ..crud.pagination import MAX_LIMIT, set_next_cursor
 from ..core.security import get_admin_user, get_current_user
 from ..core.email import send_email, admin_emails
+from ..core.http_cache import conditional_json
+from ..core.outbox import enqueue_email
 
 router = APIRouter(prefix="/viewing", tags=["viewing"])
 
@@ -72,9 +76,14 @@ def _admin_reply_to() -> str:
 
 # ----- Public ------------------------------------------------------------
 @router.get("/slots", response_model=List[AvailabilitySlot])
-async def list_slots():
-    """公開: 登録された期間から自動生成した30分スロット一覧（予約数つき）。"""
-    return await ViewingCRUD.get_available_slots()
+async def list_slots(
+    request: Request,
+    starts_from: Optional[str] = Query(None, alias="from"),
+    starts_to: Optional[str] = Query(None, alias="to"),
+):
+    """公開: 登録された期間から自動生成した30分スロット一覧（予約数つき）。from/to で開始時刻を絞り込み可。ETag 付き。"""
+    slots = await ViewingCRUD.get_available_slots(starts_from=starts_from, starts_to=starts_to)
+    return conditional_json(request, slots)
 
 
 @router.post("/bookings", response_model=ViewingBooking, status_code=status.HTTP_201_CREATED)
@@ -88,7 +97,8 @@ async def create_booking(
     cancel_url = f"{FRONTEND_URL}/viewing/cancel?token={cancel_token}"
     when = format_toronto(booking.starts_at)
 
-    send_email(
+    # メールは Outbox に積むだけ（送信・再試行はバックグラウンドのワーカー）
+    await enqueue_email(
         [booking.email],
         f"【内見予約】{PROPERTY_NAME} のご予約を受け付けました",
         (
@@ -107,7 +117,7 @@ async def create_booking(
         ),
         reply_to=_admin_reply_to(),
     )
-    send_email(
+    await enqueue_email(
         admin_emails(),
         "【内見予約】新しい予約が入りました",
         (
@@ -128,8 +138,8 @@ async def cancel_booking(req: CancelRequest):
     booking = await ViewingCRUD.cancel_by_token(req.token)
     when = format_toronto(booking.starts_at)
 
-    # 予約者本人へキャンセル確認
-    send_email(
+    # 予約者本人へキャンセル確認（Outbox 経由）
+    await enqueue_email(
         [booking.email],
         f"【内見予約】{PROPERTY_NAME} のご予約をキャンセルしました",
         (
@@ -145,7 +155,7 @@ async def cancel_booking(req: CancelRequest):
         reply_to=_admin_reply_to(),
     )
     # admin へ通知
-    send_email(
+    await enqueue_email(
         admin_emails(),
         "【内見予約】予約がキャンセルされました",
         (
@@ -182,9 +192,22 @@ async def delete_window(window_id: str, admin=Depends(get_admin_user)):
 
 
 @router.get("/bookings", response_model=List[ViewingBooking])
-async def list_bookings(admin=Depends(get_admin_user)):
-    """Admin: 予約一覧（誰がいつ来るか）。"""
-    return await ViewingCRUD.get_bookings()
+async def list_bookings(
+    response: Response,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    starts_from: Optional[str] = Query(None, alias="from"),
+    starts_to: Optional[str] = Query(None, alias="to"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    admin=Depends(get_admin_user),
+):
+    """Admin: 予約一覧（誰がいつ来るか）。status と内見日時の範囲(from/to)で絞り込み可。"""
+    bookings, next_cursor = await ViewingCRUD.get_bookings(
+        status=status_filter, starts_from=starts_from, starts_to=starts_to,
+        limit=limit, cursor=cursor,
+    )
+    set_next_cursor(response, next_cursor)
+    return bookings
 
 
 @router.post("/bookings/{booking_id}/send-address", response_model=ViewingBooking)
@@ -199,7 +222,10 @@ async def send_address(booking_id: str, admin=Depends(get_admin_user)):
     when = format_toronto(booking.starts_at)
     note = f"\n{PROPERTY_ADDRESS_NOTE}\n" if PROPERTY_ADDRESS_NOTE else ""
 
-    ok = send_email(
+    # 結果をその場で返したいので Outbox は通さないが、送信（HTTP / SMTP）はブロッキングなので
+    # イベントループを止めないようスレッドで実行する
+    ok = await asyncio.to_thread(
+        send_email,
         [booking.email],
         f"【内見のご案内】{PROPERTY_NAME} 内見場所のご案内",
         (
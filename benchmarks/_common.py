@@ -0,0 +1,23 @@
+"""
+ベンチマーク共通の計測と表示（bench_create / bench_login / bench_reactions で使う）。
+"""
+import statistics
+import time
+from typing import Sequence
+
+
+async def timed(fn, *args) -> float:
+    """fn(*args) を await した時間（ms）。"""
+    started = time.perf_counter()
+    await fn(*args)
+    return (time.perf_counter() - started) * 1000
+
+
+def report(name: str, samples: Sequence[float], extra: str = "") -> None:
+    """件数・平均・p50・p95（ms）を 1 行で出す。extra は行末に付け足す文字列。"""
+    samples = sorted(samples)
+    p95 = samples[max(int(len(samples) * 0.95) - 1, 0)]
+    print(
+        f"{name:<10} n={len(samples):<5} mean={statistics.mean(samples):7.2f}ms "
+        f"p50={statistics.median(samples):7.2f}ms p95={p95:7.2f}ms{extra}"
+    )
@@ -0,0 +1,109 @@
+"""
+作成 API のレイテンシを、旧実装（CREATE と CREATED を張る MATCH の 2 往復・
+別トランザクション）と create_owned（1 文・1 往復）で比べる。
+
+    python -m benchmarks.bench_create [回数] [同時実行数]
+
+接続先は通常どおり NEO4J_URI などの環境変数。一時的なユーザーを作って
+ProductCRUD.create と同じ内容の Product を作り、終わったら削除する。
+最後に、作ったノードすべてに CREATED が張られていることも確認する。
+"""
+import asyncio
+import sys
+import time
+from uuid import uuid4
+
+from app.crud.database import db
+from app.crud.products import ProductCRUD
+from app.models.product import ProductCreate
+from benchmarks._common import report, timed
+
+PRODUCT = ProductCreate(
+    title="bench",
+    description="bench",
+    contactEmail="bench@example.com",
+    price="1",
+    condition="new",
+    category="other",
+)
+
+
+async def legacy_create(product: ProductCreate, creator_id: str) -> None:
+    """変更前の ProductCRUD.create と同じ往復（CREATE → MATCH ... CREATE）。"""
+    async with db.write_session() as session:
+        product_id = str(uuid4())
+        await session.write_one(
+            """
+            CREATE (p:Product {
+                id: $id, title: $title, description: $description,
+                contactEmail: $contactEmail, contactPhone: $contactPhone,
+                price: $price, condition: $condition, category: $category,
+                images: $images, creator_id: $creator_id, status: 'available',
+                created_at: datetime(), updated_at: datetime()
+            })
+            RETURN p
+            """,
+            id=product_id,
+            title=product.title,
+            description=product.description,
+            contactEmail=product.contactEmail,
+            contactPhone=product.contactPhone,
+            price=product.price,
+            condition=product.condition,
+            category=product.category,
+            images=product.images,
+            creator_id=creator_id,
+        )
+        await session.write(
+            """
+            MATCH (u:User {id: $user_id}), (p:Product {id: $product_id})
+            CREATE (u)-[:CREATED]->(p)
+            """,
+            user_id=creator_id,
+            product_id=product_id,
+        )
+
+
+async def _unlinked(user_id: str) -> int:
+    async with db.read_session() as session:
+        record = await session.read_one(
+            """
+            MATCH (p:Product {creator_id: $id})
+            WHERE NOT (:User {id: $id})-[:CREATED]->(p)
+            RETURN count(p) AS n
+            """,
+            id=user_id,
+        )
+        return record["n"]
+
+
+async def main(rounds: int, concurrency: int) -> None:
+    user_id = str(uuid4())
+    async with db.write_session() as session:
+        await session.write(
+            "CREATE (:User {id: $id, email: $email, created_at: datetime()})",
+            id=user_id, email=f"bench-{user_id}@example.com",
+        )
+    try:
+        for name, fn in (("legacy", legacy_create), ("single", ProductCRUD.create)):
+            # 逐次: 1 回あたりのレイテンシ
+            samples = [await timed(fn, PRODUCT, user_id) for _ in range(rounds)]
+            report(name, samples)
+
+            # 同時: まとめて作ったときの経過時間
+            started = time.perf_counter()
+            await asyncio.gather(*(fn(PRODUCT, user_id) for _ in range(concurrency)))
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"{name:<10} {concurrency} concurrent creates in {elapsed:.1f}ms")
+        print(f"products without CREATED: {await _unlinked(user_id)}")
+    finally:
+        async with db.write_session() as session:
+            await session.write("MATCH (p:Product {creator_id: $id}) DETACH DELETE p", id=user_id)
+            await session.write("MATCH (u:User {id: $id}) DETACH DELETE u", id=user_id)
+        await db.close()
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    c = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    asyncio.run(main(n, c))
@@ -0,0 +1,72 @@
+"""
+同時ログイン時の bcrypt 検証を、イベントループ上で直接呼ぶ場合（変更前）と
+専用スレッドプール（verify_password_async）に逃がす場合で比べる。
+
+    python -m benchmarks.bench_login [同時ログイン数] [回数]
+
+DB は使わない。ログイン 1 件 = verify_password 1 回として、各ログインのレイテンシ
+（p50/p95）と、並行して 10ms ごとに起きるだけのタスクがどれだけ遅れたか
+（＝他のエンドポイントが止められる時間）を出す。プールの大きさは
+PASSWORD_HASH_WORKERS で変えられる。
+"""
+import asyncio
+import sys
+import time
+
+from app.core.utils import (
+    PASSWORD_HASH_WORKERS,
+    get_password_hash,
+    verify_password,
+    verify_password_async,
+)
+from benchmarks._common import report, timed
+
+PASSWORD = "correct horse battery staple"
+TICK = 0.01
+
+
+async def inline_login(hashed: str) -> None:
+    await asyncio.sleep(0)  # DB 問い合わせの代わり
+    verify_password(PASSWORD, hashed)
+
+
+async def pooled_login(hashed: str) -> None:
+    await asyncio.sleep(0)
+    await verify_password_async(PASSWORD, hashed)
+
+
+async def _ticker(stop: asyncio.Event, lags: list) -> None:
+    while not stop.is_set():
+        expected = time.perf_counter() + TICK
+        await asyncio.sleep(TICK)
+        lags.append(max(time.perf_counter() - expected, 0) * 1000)
+
+
+async def run(name: str, fn, hashed: str, concurrency: int, rounds: int) -> None:
+    samples, lags = [], []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(stop, lags))
+    started = time.perf_counter()
+    for _ in range(rounds):
+        samples += await asyncio.gather(*(timed(fn, hashed) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+
+    report(
+        name, samples,
+        f" {len(samples) / elapsed:6.1f}/s loop lag max={max(lags or [0]):7.1f}ms",
+    )
+
+
+async def main(concurrency: int, rounds: int) -> None:
+    hashed = get_password_hash(PASSWORD)
+    print(f"concurrency={concurrency} rounds={rounds} pool workers={PASSWORD_HASH_WORKERS}")
+    await run("inline", inline_login, hashed, concurrency, rounds)
+    await run("pooled", pooled_login, hashed, concurrency, rounds)
+
+
+if __name__ == "__main__":
+    c = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    asyncio.run(main(c, n))
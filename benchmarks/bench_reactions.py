@@ -0,0 +1,109 @@
+"""
+掲示板リアクションのトグルを、旧実装（5 往復・非アトミック）と
+BoardCRUD.toggle_reaction（1 往復・1 トランザクション）で比べる。
+
+    python -m benchmarks.bench_reactions [回数] [同時実行数]
+
+接続先は通常どおり NEO4J_URI などの環境変数。一時的な BoardPost とユーザーを作り、
+終わったら削除する。同時実行のあとで REACTED の重複が無いことも確認する。
+"""
+import asyncio
+import sys
+import time
+from uuid import uuid4
+
+from app.crud.board import BoardCRUD
+from app.crud.database import db
+from benchmarks._common import report, timed
+
+EMOJI = "👍"
+
+
+async def legacy_toggle(label: str, target_id: str, emoji: str, email: str) -> None:
+    """変更前の toggle_reaction と同じ往復（存在確認→既存確認→削除/作成→集計→自分の分）。"""
+    async with db.get_session() as session:
+        result = await session.run(f"MATCH (t:{label} {{id: $id}}) RETURN t", id=target_id)
+        await result.single()
+        result = await session.run(
+            f"MATCH (:User {{email: $e}})-[r:REACTED {{emoji: $em}}]->(t:{label} {{id: $id}}) "
+            f"RETURN r LIMIT 1",
+            e=email, em=emoji, id=target_id,
+        )
+        exists = await result.single()
+        if exists:
+            await session.run(
+                f"MATCH (:User {{email: $e}})-[r:REACTED {{emoji: $em}}]->(t:{label} {{id: $id}}) "
+                f"DELETE r",
+                e=email, em=emoji, id=target_id,
+            )
+        else:
+            await session.run(
+                f"""
+                MATCH (t:{label} {{id: $id}})
+                MERGE (u:User {{email: $e}})
+                MERGE (u)-[:REACTED {{emoji: $em}}]->(t)
+                """,
+                e=email, em=emoji, id=target_id,
+            )
+        result = await session.run(
+            f"MATCH (t:{label} {{id: $id}})<-[r:REACTED]-() "
+            f"RETURN r.emoji AS emoji, count(*) AS c ORDER BY c DESC",
+            id=target_id,
+        )
+        [row async for row in result]
+        result = await session.run(
+            f"MATCH (:User {{email: $e}})-[r:REACTED]->(t:{label} {{id: $id}}) "
+            f"RETURN collect(r.emoji) AS es",
+            e=email, id=target_id,
+        )
+        await result.single()
+
+
+async def _duplicate_edges(post_id: str) -> int:
+    async with db.get_session() as session:
+        result = await session.run(
+            """
+            MATCH (u:User)-[r:REACTED]->(:BoardPost {id: $id})
+            WITH u, r.emoji AS emoji, count(r) AS c
+            WHERE c > 1
+            RETURN count(*) AS dup
+            """,
+            id=post_id,
+        )
+        return (await result.single())["dup"]
+
+
+async def main(rounds: int, concurrency: int) -> None:
+    post_id = await BoardCRUD.create_post("bench", "bench", "bench", f"bench-{uuid4()}@example.com")
+    email = f"bench-{uuid4()}@example.com"
+    try:
+        for name, fn in (("legacy", legacy_toggle), ("single", BoardCRUD.toggle_reaction)):
+            # 逐次: 1 回あたりのレイテンシ
+            samples = [await timed(fn, "BoardPost", post_id, EMOJI, email) for _ in range(rounds)]
+            report(name, samples)
+
+            # 同時: 同じユーザーが同じ絵文字を連打したときの重複チェック
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(fn("BoardPost", post_id, EMOJI, email) for _ in range(concurrency))
+            )
+            elapsed = (time.perf_counter() - started) * 1000
+            dup = await _duplicate_edges(post_id)
+            print(f"{name:<10} {concurrency} concurrent toggles in {elapsed:.1f}ms, duplicate edges: {dup}")
+
+            # 次の計測のために状態を戻す
+            async with db.get_session() as session:
+                await session.run(
+                    "MATCH (:BoardPost {id: $id})<-[r:REACTED]-() DELETE r", id=post_id
+                )
+    finally:
+        async with db.get_session() as session:
+            await session.run("MATCH (p:BoardPost {id: $id}) DETACH DELETE p", id=post_id)
+            await session.run("MATCH (u:User {email: $e}) DETACH DELETE u", e=email)
+        await db.close()
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    c = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    asyncio.run(main(n, c))
@@ -1,10 +1,12 @@
+import asyncio
+
 from app.crud.database import db
 
-def check_nodes():
-    with db.get_session() as session:
+async def check_nodes():
+    async with db.get_session() as session:
         # すべてのノードを取得
-        result = session.run("MATCH (n) RETURN n LIMIT 25")
-        nodes = list(result)
+        result = await session.run("MATCH (n) RETURN n LIMIT 25")
+        nodes = [record async for record in result]
 
         print(f"\n=== データベース内のノード数: {len(nodes)} ===\n")
 
@@ -15,15 +17,17 @@ def check_nodes():
             print()
 
         # ラベルの一覧を取得
-        label_result = session.run("CALL db.labels()")
-        labels = [record[0] for record in label_result]
+        label_result = await session.run("CALL db.labels()")
+        labels = [record[0] async for record in label_result]
         print(f"=== 使用されているラベル: {labels} ===\n")
 
         # 各ラベルのノード数をカウント
         for label in labels:
-            count_result = session.run(f"MATCH (n:{label}) RETURN count(n) as count")
-            count = count_result.single()["count"]
+            count_result = await session.run(f"MATCH (n:{label}) RETURN count(n) as count")
+            count = (await count_result.single())["count"]
             print(f"{label}: {count}個のノード")
 
+    await db.close()
+
 if __name__ == "__main__":
-    check_nodes()
\ No newline at end of file
+    asyncio.run(check_nodes())
\ No newline at end of file
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.crud.availability import SlotEngine
+
+STEP = timedelta(minutes=30)
+BASE = datetime(2030, 5, 1, tzinfo=timezone.utc)
+
+
+def at(hour: int, minute: int = 0) -> datetime:
+    return BASE + timedelta(hours=hour, minutes=minute)
+
+
+def expand(windows, starts_from, starts_to):
+    """期間ごとに 30 分枠を切り出した和集合（SlotEngine の併合結果と一致するはず）。"""
+    found = set()
+    for _, s, e in windows:
+        cur = s
+        while cur + STEP <= e:
+            if starts_from <= cur < starts_to:
+                found.add(cur)
+            cur += STEP
+    return sorted(found)
+
+
+async def loaded(windows, bookings=()):
+    async def loader():
+        return list(windows), list(bookings)
+
+    engine = SlotEngine(loader)
+    await engine.ensure_loaded()
+    return engine
+
+
+WINDOWS = [
+    # 同じ位相で重なる
+    ("overlap-a", at(10), at(11, 30)),
+    ("overlap-b", at(11), at(12, 30)),
+    # 同じ位相で接する
+    ("touch-a", at(13), at(14)),
+    ("touch-b", at(14), at(15)),
+    # 位相のずれた期間（:15 始まり）が上と重なる
+    ("offset", at(10, 15), at(11, 45)),
+    # 1 枠に満たない
+    ("short", at(16), at(16, 20)),
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "starts_from, starts_to",
+    [
+        (at(0), at(23)),
+        (at(10, 10), at(14, 30)),  # 位相の途中から
+        (at(11), at(11, 1)),
+        (at(15), at(23)),
+    ],
+)
+async def test_slots_match_per_window_expansion(starts_from, starts_to):
+    engine = await loaded(WINDOWS)
+    got = [s for s, _ in engine.slots(starts_from, starts_to)]
+    assert got == expand(WINDOWS, starts_from, starts_to)
+
+
+@pytest.mark.asyncio
+async def test_slots_follow_incremental_window_changes():
+    engine = await loaded(WINDOWS)
+    engine.remove_window("overlap-a")
+    engine.add_window("late", at(18, 15), at(19, 15))
+    windows = [w for w in WINDOWS if w[0] != "overlap-a"] + [("late", at(18, 15), at(19, 15))]
+    got = [s for s, _ in engine.slots(at(0), at(23))]
+    assert got == expand(windows, at(0), at(23))
+
+
+@pytest.mark.asyncio
+async def test_is_available_at_window_edges():
+    engine = await loaded(WINDOWS)
+    now = at(0)
+    assert engine.is_available(at(10), now=now)  # 期間の開始
+    assert engine.is_available(at(12), now=now)  # 併合後の最後の枠（12:00-12:30）
+    assert not engine.is_available(at(12, 30), now=now)  # 終わりちょうどに始まる枠
+    assert engine.is_available(at(13, 30), now=now)
+    assert engine.is_available(at(14), now=now)  # 接した期間の継ぎ目
+    assert engine.is_available(at(11, 15), now=now)  # ずれた位相の枠
+    assert not engine.is_available(at(11, 45), now=now)  # ずれた位相の終わり
+    assert not engine.is_available(at(10, 10), now=now)  # どの位相にも乗らない
+    assert not engine.is_available(at(16), now=now)  # 1 枠に満たない期間
+    assert not engine.is_available(at(10), now=at(10, 1))  # 過去
+
+
+@pytest.mark.asyncio
+async def test_booking_counts():
+    engine = await loaded(WINDOWS, bookings=[at(10), at(10)])
+    engine.add_booking(at(10, 30))
+    engine.remove_booking(at(10))
+    counts = dict(engine.slots(at(10), at(11)))
+    assert counts[at(10)] == 1
+    assert counts[at(10, 30)] == 1
+    assert counts[at(10, 15)] == 0
+    assert engine.booking_count(at(10)) == 1
@@ -0,0 +1,77 @@
+"""GOOGLE_CERTS_URL をローカルの偽エンドポイントに向けて、証明書のキャッシュを確かめる。"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from app.core.google_auth import GoogleCertsUnavailable, GoogleTokenVerifier
+
+CERTS = {"kid-1": "-----BEGIN CERTIFICATE-----\nfake\n-----END CERTIFICATE-----\n"}
+
+
+@pytest.fixture
+def certs_server():
+    state = {"requests": 0, "status": 200, "max_age": 3600}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802
+            state["requests"] += 1
+            body = json.dumps(CERTS).encode()
+            self.send_response(state["status"])
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Cache-Control", f"public, max-age={state['max_age']}")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state["url"] = f"http://127.0.0.1:{server.server_port}/oauth2/v1/certs"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def test_certs_are_cached_for_max_age(certs_server):
+    verifier = GoogleTokenVerifier(certs_url=certs_server["url"])
+    assert verifier.certs() == CERTS
+    assert verifier.certs("kid-1") == CERTS
+    assert certs_server["requests"] == 1
+
+    verifier.invalidate()
+    verifier.certs()
+    assert certs_server["requests"] == 2
+
+
+def test_unknown_kid_does_not_refetch_immediately(certs_server):
+    verifier = GoogleTokenVerifier(certs_url=certs_server["url"])
+    verifier.certs()
+    verifier.certs("kid-unknown")
+    assert certs_server["requests"] == 1
+
+
+def test_expired_certs_are_refetched(certs_server):
+    certs_server["max_age"] = 0
+    verifier = GoogleTokenVerifier(certs_url=certs_server["url"])
+    verifier.certs()
+    verifier.certs()
+    assert certs_server["requests"] == 2
+
+
+def test_failed_fetch_keeps_cached_certs(certs_server):
+    verifier = GoogleTokenVerifier(certs_url=certs_server["url"])
+    verifier.certs()
+    certs_server["status"] = 500
+    verifier.invalidate()
+    assert verifier.certs() == CERTS
+
+
+def test_failed_first_fetch_raises(certs_server):
+    certs_server["status"] = 503
+    with pytest.raises(GoogleCertsUnavailable):
+        GoogleTokenVerifier(certs_url=certs_server["url"]).certs()
@@ -0,0 +1,35 @@
+from starlette.requests import Request
+
+from app.core.http_cache import conditional_json
+
+
+def _request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_conditional_json_sets_etag_and_extra_headers():
+    response = conditional_json(_request(), [{"id": "1"}], headers={"X-Next-Cursor": "abc"})
+    assert response.status_code == 200
+    assert response.body == b'[{"id":"1"}]'
+    assert response.headers["ETag"].startswith('"')
+    assert response.headers["X-Next-Cursor"] == "abc"
+    assert response.headers["Cache-Control"] == "no-cache"
+
+
+def test_conditional_json_answers_matching_etag_with_304():
+    etag = conditional_json(_request(), {"n": 1}).headers["ETag"]
+    response = conditional_json(
+        _request(f"W/{etag}"), {"n": 1}, cache_control="private, no-cache"
+    )
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["ETag"] == etag
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+
+def test_conditional_json_changes_etag_with_body():
+    first = conditional_json(_request(), {"n": 1}).headers["ETag"]
+    response = conditional_json(_request(first), {"n": 2})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != first
@@ -0,0 +1,65 @@
+import pytest
+
+from app.core import outbox
+from app.core.email import FakeTransport
+from app.crud.outbox import OutboxCRUD
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """OutboxCRUD をメモリ上の記録に差し替える（Neo4j なしでワーカーを動かす）。"""
+    state = {"queue": [], "calls": []}
+
+    async def claim_next(lease_seconds):
+        return state["queue"].pop(0) if state["queue"] else None
+
+    def record(name):
+        async def mark(message_id, *args):
+            state["calls"].append((name, message_id) + args)
+        return staticmethod(mark)
+
+    monkeypatch.setattr(OutboxCRUD, "claim_next", staticmethod(claim_next))
+    for name in ("mark_sent", "mark_skipped", "mark_retry", "mark_failed"):
+        monkeypatch.setattr(OutboxCRUD, name, record(name))
+    monkeypatch.setattr(outbox, "backoff_delay", lambda attempt: 30.0)
+    return state
+
+
+def message(attempts: int = 1) -> dict:
+    return {
+        "id": "m1", "to": ["a@example.com"], "subject": "件名", "body": "本文",
+        "reply_to": None, "attempts": attempts,
+    }
+
+
+@pytest.mark.asyncio
+async def test_sends_through_transport(store):
+    transport = FakeTransport()
+    store["queue"].append(message())
+    assert await outbox.OutboxWorker(transport).process_one()
+    assert transport.sent == [
+        {"to": ["a@example.com"], "subject": "件名", "body": "本文", "reply_to": None}
+    ]
+    assert store["calls"] == [("mark_sent", "m1")]
+
+
+@pytest.mark.asyncio
+async def test_failed_send_is_retried_with_backoff(store):
+    transport = FakeTransport(fail_times=1)
+    store["queue"].append(message(attempts=1))
+    await outbox.OutboxWorker(transport).process_one()
+    assert transport.sent == []
+    assert store["calls"] == [("mark_retry", "m1", "transport returned failure", 30.0)]
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_attempts(store):
+    transport = FakeTransport(fail_times=1)
+    store["queue"].append(message(attempts=outbox.OUTBOX_MAX_ATTEMPTS))
+    await outbox.OutboxWorker(transport).process_one()
+    assert store["calls"] == [("mark_failed", "m1", "transport returned failure")]
+
+
+@pytest.mark.asyncio
+async def test_nothing_to_do(store):
+    assert not await outbox.OutboxWorker(FakeTransport()).process_one()
@@ -0,0 +1,83 @@
+import pytest
+from fastapi import HTTPException
+
+from app.crud.pagination import (
+    DEFAULT_LIMIT,
+    _check_datetime_key,
+    decode_cursor,
+    encode_cursor,
+    fetch_page,
+)
+
+
+@pytest.mark.parametrize(
+    "key",
+    [
+        "2024-01-01T00:00:00Z",
+        "2024-01-01T00:00Z",
+        "2024-01-01T00:00:00.1Z",
+        "2024-01-01T00:00:00.12345+00:00",
+        "2024-01-01T00:00:00.123456789Z",
+        "2024-01-01T09:00:00.5+09:00[Asia/Tokyo]",
+        "2024-01-01T00:00:00.123-05:00",
+        "2024-02-29T23:59:59.999999999Z",
+    ],
+)
+def test_accepts_neo4j_datetime_strings(key):
+    _check_datetime_key(key)
+
+
+@pytest.mark.parametrize(
+    "key",
+    [
+        "",
+        "not a date",
+        "2024-02-30T00:00:00Z",
+        "2024-01-01T24:00:00Z",
+        "2024-01-01T00:00:00.1234567890Z",
+        "2024-01-01T00:00:00Z' OR 1=1",
+        "2024-01-01",
+    ],
+)
+def test_rejects_other_keys_with_400(key):
+    with pytest.raises(HTTPException) as exc:
+        _check_datetime_key(key)
+    assert exc.value.status_code == 400
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("2024-01-01T00:00:00.12345Z", "abc")
+    assert decode_cursor(cursor) == ("2024-01-01T00:00:00.12345Z", "abc")
+
+
+class _Session:
+    def __init__(self, rows):
+        self.rows = rows
+        self.params = None
+
+    async def read(self, query, params):
+        self.params = params
+        return self.rows[: params.get("_limit", len(self.rows))]
+
+
+def _rows(n):
+    return [{"n": {"id": str(i)}, "_cursor_key": f"2024-01-01T00:00:{i:02d}Z"} for i in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_fetch_page_without_limit_or_cursor_returns_every_row():
+    session = _Session(_rows(150))
+    records, next_cursor = await fetch_page(session, "MATCH (n:Store)", "n")
+    assert len(records) == 150
+    assert next_cursor is None
+    assert "_limit" not in session.params
+
+
+@pytest.mark.asyncio
+async def test_fetch_page_with_cursor_and_no_limit_pages_by_default_limit():
+    session = _Session(_rows(DEFAULT_LIMIT + 10))
+    cursor = encode_cursor("2024-01-01T00:00:00Z", "x")
+    records, next_cursor = await fetch_page(session, "MATCH (n:Store)", "n", cursor=cursor)
+    assert session.params["_limit"] == DEFAULT_LIMIT + 1
+    assert len(records) == DEFAULT_LIMIT
+    assert next_cursor is not None
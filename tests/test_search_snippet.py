@@ -0,0 +1,30 @@
+from app.crud.search import lucene_query, snippet
+
+
+def test_snippet_does_not_match_inside_entities():
+    assert snippet("Tom & Jerry amp", ["amp"]) == "Tom &amp; Jerry <mark>amp</mark>"
+    assert snippet('a <b> "t" t', ["t"]) == "a &lt;b&gt; &quot;<mark>t</mark>&quot; <mark>t</mark>"
+
+
+def test_snippet_escapes_matched_text():
+    assert snippet("x <script> y", ["<script>"]) == "x <mark>&lt;script&gt;</mark> y"
+
+
+def test_snippet_marks_japanese_terms_case_insensitively():
+    text = "トロントの ラーメン と Sushi"
+    assert snippet(text, ["ラーメン", "sushi"]) == "トロントの <mark>ラーメン</mark> と <mark>Sushi</mark>"
+
+
+def test_snippet_without_match():
+    assert snippet("nothing here", ["ramen"]) is None
+
+
+def test_snippet_cuts_long_text_around_match():
+    text = "あ" * 200 + "ラーメン" + "い" * 200
+    out = snippet(text, ["ラーメン"], length=40)
+    assert out.startswith("…") and out.endswith("…")
+    assert "<mark>ラーメン</mark>" in out
+
+
+def test_lucene_query_escapes_syntax():
+    assert lucene_query(["a:b", "OR", "(c*"]) == 'a\\:b AND "OR" AND \\(c\\*'
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_run():
+    group = SingleFlight("test_shared")
+    calls = []
+    release = asyncio.Event()
+
+    async def load(key):
+        calls.append(key)
+        await release.wait()
+        return {"key": key}
+
+    waiters = [asyncio.create_task(group.do("k", load, "k")) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+    assert calls == ["k"]
+    assert all(r is results[0] for r in results)
+
+
+@pytest.mark.asyncio
+async def test_exception_is_shared_and_not_remembered():
+    group = SingleFlight("test_errors")
+    calls = []
+    release = asyncio.Event()
+
+    async def boom():
+        calls.append(1)
+        await release.wait()
+        raise ValueError("db error")
+
+    waiters = [asyncio.create_task(group.do("k", boom)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert len(calls) == 1
+    assert all(isinstance(r, ValueError) for r in results)
+
+    # 終わった後の呼び出しはまた走る（キャッシュではない）
+    release.set()
+    with pytest.raises(ValueError):
+        await group.do("k", boom)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_waiter_does_not_cancel_others():
+    group = SingleFlight("test_cancel")
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        return 42
+
+    first = asyncio.create_task(group.do("k", load))
+    second = asyncio.create_task(group.do("k", load))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+    assert await second == 42
+    with pytest.raises(asyncio.CancelledError):
+        await first
@@ -0,0 +1,59 @@
+from app.core.typeahead import TypeaheadIndex, normalize
+
+_count = 0
+
+
+def index(max_bytes: int = 1 << 20) -> TypeaheadIndex:
+    # ゲージ名が重ならないよう、テストごとに別の名前にする
+    global _count
+    _count += 1
+    return TypeaheadIndex(f"test_typeahead_{_count}", max_bytes=max_bytes)
+
+
+def test_normalize_folds_width_case_and_kana():
+    assert normalize("ﾗｰﾒﾝ") == normalize("らーめん") == normalize("ラーメン")
+    assert normalize("  Sushi   BAR ") == "sushi bar"
+
+
+def test_suggest_ranks_prefix_before_word_and_infix():
+    idx = index()
+    idx.add("stores", "1", "title", "Tokyo Sushi")
+    idx.add("stores", "2", "title", "Sushi Bar")
+    idx.add("stores", "3", "title", "Kasushi")
+    assert [m.item_id for m in idx.suggest("sushi")] == ["2", "1", "3"]
+
+
+def test_suggest_matches_japanese_substrings():
+    idx = index()
+    idx.add("events", "e1", "title", "夏祭り")
+    idx.add("stores", "s1", "title", "ラーメン一番")
+    assert [m.item_id for m in idx.suggest("祭")] == ["e1"]
+    assert [m.item_id for m in idx.suggest("らーめん")] == ["s1"]
+    assert idx.suggest("祭", kinds=["stores"]) == []
+
+
+def test_same_text_is_suggested_once_per_kind_and_field():
+    idx = index()
+    idx.add("jobs", "j1", "company", "Sushi Bar")
+    idx.add("jobs", "j2", "company", "Sushi Bar")
+    idx.add("stores", "s1", "title", "Sushi Bar")
+    got = [(m.kind, m.field) for m in idx.suggest("sushi")]
+    assert sorted(got) == [("jobs", "company"), ("stores", "title")]
+
+
+def test_put_and_remove_update_postings_and_bytes():
+    idx = index()
+    idx.put("events", "e1", {"title": "Summer Festival"})
+    used = idx.approx_bytes
+    idx.put("events", "e1", {"title": "Winter Market"})
+    assert idx.suggest("summer") == []
+    assert [m.text for m in idx.suggest("market")] == ["Winter Market"]
+    idx.remove("events", "e1")
+    assert len(idx) == 0 and idx.approx_bytes == 0
+    assert used > 0
+
+
+def test_memory_budget_rejects_entries():
+    idx = index(max_bytes=1)
+    assert not idx.add("stores", "1", "title", "anything")
+    assert len(idx) == 0
@@ -0,0 +1,70 @@
+import pytest
+
+from app.crud.write_behind import CounterBuffer, rows
+
+_count = 0
+
+
+def buffer(flush) -> CounterBuffer:
+    global _count
+    _count += 1
+    return CounterBuffer(f"test_buffer_{_count}", flush, interval=60, max_pending=1000)
+
+
+@pytest.mark.asyncio
+async def test_flush_failure_merges_batch_back():
+    written = []
+    fail = [True]
+
+    async def flush(batch):
+        if fail[0]:
+            raise RuntimeError("db down")
+        written.append(batch)
+
+    buf = buffer(flush)
+    buf._pending = {"a": {"good": 2}}
+    buf._size = 2
+    with pytest.raises(RuntimeError):
+        await buf.flush()
+    # 失敗した分は戻り、その後の増分と合算される
+    buf._pending.setdefault("a", {})["good"] += 1
+    buf._size += 1
+    assert buf.pending("a") == {"good": 3}
+
+    fail[0] = False
+    assert await buf.flush() == 3
+    assert written == [{"a": {"good": 3}}]
+    assert buf.pending("a") == {}
+
+
+@pytest.mark.asyncio
+async def test_add_flushes_inline_when_not_running():
+    written = []
+
+    async def flush(batch):
+        written.append(batch)
+
+    buf = buffer(flush)
+    await buf.add("a", "bad")
+    assert written == [{"a": {"bad": 1}}]
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_pending_increments():
+    written = []
+
+    async def flush(batch):
+        written.append(batch)
+
+    buf = buffer(flush)
+    buf.start()
+    await buf.add("a", "good")
+    await buf.add("b", "good", 2)
+    await buf.stop()
+    assert written == [{"a": {"good": 1}, "b": {"good": 2}}]
+
+
+def test_rows_fill_missing_fields_with_zero():
+    assert rows({"s": {"good": 1}}, ["good", "bad"], key_name="slug") == [
+        {"slug": "s", "good": 1, "bad": 0}
+    ]